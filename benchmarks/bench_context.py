@@ -0,0 +1,79 @@
+"""Benchmark: dotted key access and save/load of the ScriptEngine Context
+
+Measures get, set and contains operations with dotted keys at different
+nesting depths, for plain contexts and for child contexts (new_child()), as
+well as saving and loading a large context in the available formats.
+Run with
+
+    python benchmarks/bench_context.py
+"""
+
+import io
+import tempfile
+import timeit
+
+from scriptengine.context import FORMATS, Context
+
+DEPTHS = (1, 2, 4, 8)
+
+
+def nested_context(depth):
+    """Returns a context with some filler keys on every level and the dotted
+    key of the deepest value"""
+    keys = [f"level{i}" for i in range(depth)]
+    context = Context({f"filler{i}": i for i in range(50)})
+    context[".".join(keys)] = 42
+    return context, ".".join(keys)
+
+
+def bench(name, func, number):
+    t = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{name:<32} {t * 1e6:8.3f} us")
+
+
+def bench_save_load():
+    context = Context(
+        {
+            "files": [f"/scratch/exp/output/file_{i:05d}.nc" for i in range(20000)],
+            "stdout": [f"line {i} of some command output" for i in range(20000)],
+            "timers": {f"task_{i}": i * 0.1 for i in range(2000)},
+        }
+    )
+    for format in FORMATS:
+        mode = "b" if format == "pickle" else ""
+        with tempfile.TemporaryFile("w" + mode + "+") as f:
+            context.save(f, format=format)
+            size = f.tell()
+
+            def load():
+                f.seek(0)
+                Context().load(f, format=format)
+
+            print(f"{format} ({size / 1e6:.1f} MB)")
+            bench(
+                "  save",
+                lambda: context.save(io.BytesIO() if mode else io.StringIO(), format),
+                3,
+            )
+            bench("  load", load, 3)
+
+
+def main():
+    number = 100000
+    for depth in DEPTHS:
+        context, key = nested_context(depth)
+        missing = key.rpartition(".")[0] + ".missing"
+        child = context.new_child({"item": 1})
+        print(f"depth {depth}: {key}")
+        bench("  get", lambda: context[key], number)
+        bench("  get (child)", lambda: child[key], number)
+        bench("  get missing, default", lambda: context.get(missing), number)
+        bench("  contains", lambda: key in context, number)
+        bench("  contains missing", lambda: missing in context, number)
+        bench("  set", lambda: context.__setitem__(key, 1), number // 10)
+        bench("  set (child)", lambda: child.__setitem__(key, 1), number // 10)
+    bench_save_load()
+
+
+if __name__ == "__main__":
+    main()
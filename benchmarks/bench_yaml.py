@@ -0,0 +1,71 @@
+"""Benchmark: pure Python vs. LibYAML (C) YAML backends
+
+Compares loading and dumping of typical ScriptEngine YAML data (task
+arguments, scripts, saved contexts) with the pure Python PyYAML classes and
+with the backend chosen by scriptengine.yaml.backend. Run with
+
+    python benchmarks/bench_yaml.py
+"""
+
+import io
+import timeit
+
+import yaml
+
+from scriptengine.yaml import backend
+
+ARGUMENT = "[1, 2, 3]"
+
+SCRIPT = "\n".join(
+    f"- base.copy:\n    src: 'file_{i}.nc'\n    dst: '{{{{ rundir }}}}/file_{i}.nc'"
+    for i in range(500)
+)
+
+CONTEXT = {
+    "files": [f"/scratch/exp/output/file_{i:05d}.nc" for i in range(5000)],
+    "stdout": [f"line {i} of some command output" for i in range(5000)],
+    "leg": {"start": "2000-01-01", "end": "2001-01-01", "number": 42},
+}
+CONTEXT_YAML = yaml.dump(CONTEXT, sort_keys=False)
+
+
+def bench(name, python_func, backend_func, number):
+    t_python = min(timeit.repeat(python_func, number=number, repeat=3)) / number
+    t_backend = min(timeit.repeat(backend_func, number=number, repeat=3)) / number
+    print(
+        f"{name:<24} python: {t_python * 1e3:9.3f} ms   "
+        f"backend: {t_backend * 1e3:9.3f} ms   "
+        f"speedup: {t_python / t_backend:5.1f}x"
+    )
+
+
+def main():
+    print(f"LibYAML available: {backend.LIBYAML}")
+    bench(
+        "load task argument",
+        lambda: yaml.load(ARGUMENT, Loader=yaml.FullLoader),
+        lambda: backend.load(ARGUMENT),
+        number=2000,
+    )
+    bench(
+        "load script",
+        lambda: yaml.load(SCRIPT, Loader=yaml.FullLoader),
+        lambda: backend.load(SCRIPT),
+        number=5,
+    )
+    bench(
+        "load context",
+        lambda: yaml.load(CONTEXT_YAML, Loader=yaml.SafeLoader),
+        lambda: backend.safe_load(CONTEXT_YAML),
+        number=3,
+    )
+    bench(
+        "dump context",
+        lambda: yaml.dump(CONTEXT, io.StringIO(), sort_keys=False),
+        lambda: backend.dump(CONTEXT, io.StringIO(), sort_keys=False),
+        number=3,
+    )
+
+
+if __name__ == "__main__":
+    main()
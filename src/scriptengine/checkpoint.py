@@ -0,0 +1,94 @@
+"""ScriptEngine context checkpoints
+
+A Checkpoint writes the state of a Context to an append-only log file. The
+first checkpoint (and every compaction) writes the full context data, all
+other checkpoints append only the changes since the previous checkpoint, as
+recorded by the change journal of the Context (see Context.mark()). Thus, the
+cost of a checkpoint is proportional to the size of the changes, not to the
+size of the context.
+
+The log file is read with Context.load(), which replays the changes on top
+of the full data:
+
+    checkpoint = Checkpoint("context.pickle", format="pickle")
+    ...
+    checkpoint.write(context)  # e.g. after every leg of a chained run
+    ...
+    context = Context()
+    with open("context.pickle", "rb") as f:
+        context.load(f, format="pickle")
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+from scriptengine.context import FORMATS, PICKLE_PROTOCOL
+from scriptengine.yaml import backend as yaml_backend
+
+
+class Checkpoint:
+    """Append-only checkpoint log of a Context.
+
+    Parameters
+    ----------
+    path
+        The checkpoint log file
+    format
+        "yaml" or "pickle", see Context.save()
+    compact
+        Number of records (full data plus changes) after which the log is
+        compacted, i.e. rewritten with the full context data
+    """
+
+    def __init__(self, path, format="yaml", compact=10):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown context format '{format}', use one of {FORMATS}")
+        if compact < 1:
+            raise ValueError("Checkpoint compaction interval must be positive")
+        self.path = Path(path)
+        self.format = format
+        self.compact = compact
+        self._context = None
+        self._mark = None
+        self._records = 0
+
+    def _mode(self, mode):
+        return mode + "b" if self.format == "pickle" else mode
+
+    def write(self, context):
+        """Writes a checkpoint of context. Only the changes since the last
+        checkpoint are appended to the log, unless the log must be compacted,
+        or context is not the context of the previous checkpoint, or it has
+        been reset or reloaded since then."""
+        records = None
+        if context is self._context and self._records < self.compact:
+            try:
+                records = context.records_since(self._mark)
+            except ValueError:  # reset or reloaded since the last checkpoint
+                pass
+        if records is None:
+            self._write_full(context)
+        elif records:
+            self._append(records)
+        self._context = context
+        # The new mark starts a new journal segment, the records written so
+        # far can be freed (unless older marks are still in use)
+        self._mark = context.mark()
+
+    def _write_full(self, context):
+        # Write to a temporary file first, so that the previous checkpoint log
+        # remains intact if anything goes wrong
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, self._mode("w")) as f:
+            context.save(f, format=self.format)
+        os.replace(tmp_path, self.path)
+        self._records = 1
+
+    def _append(self, records):
+        with open(self.path, self._mode("a")) as f:
+            if self.format == "pickle":
+                pickle.dump(records, f, protocol=PICKLE_PROTOCOL)
+            else:
+                yaml_backend.dump(records, f, sort_keys=False, explicit_start=True)
+        self._records += 1
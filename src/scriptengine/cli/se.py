@@ -33,8 +33,18 @@ import os
 
 import scriptengine.helpers.terminal_colors
 import scriptengine.logging
-from scriptengine.engines import SimpleScriptEngine
+from scriptengine.context import Context, memory_limits
+from scriptengine.engines import (
+    AsyncScriptEngine,
+    DAGScriptEngine,
+    ResumableScriptEngine,
+    SimpleScriptEngine,
+)
 from scriptengine.exceptions import ScriptEngineParseError, ScriptEngineParseFileError
+from scriptengine.helpers.content_store import DEFAULT_MAX_SIZE as DEFAULT_CACHE_SIZE
+from scriptengine.helpers.content_store import DEFAULT_PATH as DEFAULT_CACHE_PATH
+from scriptengine.helpers.memory import format_size, parse_size
+from scriptengine.tasks.core.incremental import STATE_FILE
 from scriptengine.tasks.core.loader import load as load_tasks
 from scriptengine.yaml.parser import parse_file as parse_yaml_file
 
@@ -65,17 +75,91 @@ def parse_cmd_line_args():
     arg_parser.add_argument(
         "--nocolor", help="do not use colored terminal output", action="store_true"
     )
+    arg_parser.add_argument(
+        "--precompile",
+        help="compile all Jinja2 templates in the scripts before running them",
+        action="store_true",
+    )
+    arg_parser.add_argument(
+        "--incremental",
+        help="skip tasks whose outputs are up to date (state is kept in "
+        f"{STATE_FILE})",
+        action="store_true",
+    )
+    arg_parser.add_argument(
+        "--cache-dir",
+        help="directory of the result cache of base.command (default: "
+        f"{DEFAULT_CACHE_PATH})",
+        default=str(DEFAULT_CACHE_PATH),
+        metavar="DIR",
+    )
+    arg_parser.add_argument(
+        "--cache-size",
+        help="maximum size of the result cache, least recently used results "
+        f"are evicted (default: {format_size(DEFAULT_CACHE_SIZE)})",
+        type=parse_size,
+        default=DEFAULT_CACHE_SIZE,
+        metavar="SIZE",
+    )
+    arg_parser.add_argument(
+        "--engine",
+        help="the ScriptEngine instance that runs the scripts: simple (sequential, "
+        'the default), dag (concurrent, following "id:"/"needs:" dependencies) '
+        "or async (like dag, but on an asyncio event loop)",
+        choices=["simple", "dag", "async"],
+        default="simple",
+    )
+    arg_parser.add_argument(
+        "--workers",
+        help="maximum number of concurrent tasks/jobs for --engine dag/async",
+        type=int,
+        metavar="N",
+    )
+    arg_parser.add_argument(
+        "--processes",
+        help="run tasks/jobs in worker processes for --engine dag/async",
+        action="store_true",
+    )
+    arg_parser.add_argument(
+        "--progress",
+        help="record the completed tasks/jobs in a progress log file, "
+        "for --resume (--engine simple only)",
+        metavar="FILE",
+    )
+    arg_parser.add_argument(
+        "--resume",
+        help="skip the tasks/jobs that were completed in a previous run, "
+        "according to the --progress log file",
+        action="store_true",
+    )
+    arg_parser.add_argument(
+        "--context-soft-limit",
+        help="warn if the context grows beyond this size (e.g. 500M, 2G)",
+        type=parse_size,
+        metavar="SIZE",
+    )
+    arg_parser.add_argument(
+        "--context-hard-limit",
+        help="stop if the context would grow beyond this size (e.g. 500M, 2G)",
+        type=parse_size,
+        metavar="SIZE",
+    )
     arg_parser.add_argument("files", help="YAML file(s) to read", nargs="+")
 
-    return arg_parser.parse_args()
+    parsed_args = arg_parser.parse_args()
+    if parsed_args.resume and not parsed_args.progress:
+        arg_parser.error("--resume requires --progress")
+    if parsed_args.progress and parsed_args.engine != "simple":
+        arg_parser.error("--progress is only supported with --engine simple")
+    return parsed_args
 
 
-def parse_files(logger, files):
+def parse_files(logger, files, precompile=False):
     """Parses files and returns a script (list of tasks/jobs)."""
     script = []
     for fname in files:
         # next_script is a Task or Job or list of either
-        next_script = parse_yaml_file(fname)
+        next_script = parse_yaml_file(fname, precompile=precompile)
         if isinstance(next_script, list):
             script.extend(next_script)
         else:
@@ -95,10 +179,11 @@ def main():
                                             given at the command line (used
                                             as search path for includes, for
                                             example)
-      context['se']['instance']           - a reference to the ScriptEngine
-                                            instance that executes the task
       context['se']['tasks']['timing']    - task timing information
                                             (defaults to no timing)
+      context['se']['tasks']['incremental'] - incremental mode and state
+                                            database (see --incremental)
+      context['se']['tasks']['cache']     - result cache of base.command
     """
 
     # Parse command line arguments
@@ -128,7 +213,7 @@ def main():
 
     # Create script by parsing the files given on the command line
     try:
-        script = parse_files(logger, parsed_args.files)
+        script = parse_files(logger, parsed_args.files, parsed_args.precompile)
     except ScriptEngineParseFileError:
         logger.critical("Could not read all script files")
         return os.EX_NOINPUT
@@ -153,12 +238,45 @@ def main():
                     "logging": None,
                     "timers": {},
                 },
+                "incremental": {
+                    "mode": parsed_args.incremental,
+                    "state": os.path.join(os.getcwd(), STATE_FILE),
+                },
+                "cache": {
+                    "path": os.path.abspath(os.path.expanduser(parsed_args.cache_dir)),
+                    "size": parsed_args.cache_size,
+                },
             },
-            "instance": SimpleScriptEngine(),
         }
     }
 
+    # Set context memory limits
+    memory_limits.set(parsed_args.context_soft_limit, parsed_args.context_hard_limit)
+
     # Call ScriptEngine instance to run the script
-    context["se"]["instance"].run(script, context)
+    # (the instance is available to tasks via scriptengine.runtime.instance())
+    mode = "process" if parsed_args.processes else "thread"
+    if parsed_args.engine == "dag":
+        instance = DAGScriptEngine(max_workers=parsed_args.workers, mode=mode)
+    elif parsed_args.engine == "async":
+        instance = AsyncScriptEngine(max_workers=parsed_args.workers, mode=mode)
+    elif parsed_args.progress:
+        instance = ResumableScriptEngine(
+            parsed_args.progress, resume=parsed_args.resume
+        )
+    else:
+        instance = SimpleScriptEngine()
+    try:
+        context_update = instance.run(script, context)
+    except ScriptEngineParseError:
+        logger.critical("Could not run the script, see errors above")
+        return os.EX_DATAERR
+
+    # Report context memory usage if debugging
+    if logger.getEffectiveLevel() <= logging.DEBUG:
+        final_context = Context(context) + (context_update or {})
+        logger.debug(f"Context memory size: {format_size(final_context.sizeof())}")
+        for key, size in final_context.memory_report(depth=2).items():
+            logger.debug(f"  {key}: {format_size(size)}")
 
     return os.EX_OK
@@ -1,12 +1,262 @@
+import functools
+import itertools
+import logging
+import mmap
+import pickle
+import sys
 from collections import UserDict
 from collections.abc import Mapping
 from typing import Any
 
-import yaml
-from deepmerge import always_merger
+from scriptengine.exceptions import ScriptEngineContextError
+from scriptengine.helpers.memory import deep_sizeof, format_size
+from scriptengine.yaml import backend as yaml_backend
 
 KEY_SEP = "."
 
+# Source of Context generation numbers, shared by all Context objects, so that
+# a generation number identifies both the Context and the state of its data
+_generations = itertools.count()
+
+# Serialisation formats for Context.save() and Context.load()
+FORMATS = ("yaml", "pickle")
+PICKLE_PROTOCOL = 5
+
+
+class MemoryLimits:
+    """Soft and hard limits (in bytes) for the memory size of contexts. Merges
+    that let a context grow beyond the soft limit log a warning (once), merges
+    that would exceed the hard limit raise a ScriptEngineContextError. Sizes
+    are approximate, see scriptengine.helpers.memory.deep_sizeof()."""
+
+    def __init__(self, soft=None, hard=None):
+        self.set(soft, hard)
+
+    def set(self, soft=None, hard=None):
+        self.soft = soft
+        self.hard = hard
+        self.warned = False
+
+    @property
+    def lowest(self):
+        """The lowest active limit, or None if no limit is set"""
+        return min((limit for limit in (self.soft, self.hard) if limit), default=None)
+
+
+# The limits for all contexts
+memory_limits = MemoryLimits()
+
+# Marks missing values in lookups
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=4096)
+def _key_steps(key):
+    """Returns the lookup steps for a dotted key, as (subkey, first) pairs.
+
+    At every level of the nested data, the remaining subkey is tried as a
+    whole first (keys can contain dots), before descending into the value of
+    its first component. For "a.b.c", the steps are ("a.b.c", "a"),
+    ("b.c", "b") and ("c", "c"). The (interned) steps are cached, because
+    the same keys are looked up over and over again.
+    """
+    steps = []
+    subkey = sys.intern(str(key))
+    while True:
+        first, _, remain = subkey.partition(KEY_SEP)
+        steps.append((subkey, sys.intern(first)))
+        if first == subkey:
+            return tuple(steps)
+        subkey = sys.intern(remain)
+
+
+@functools.lru_cache(maxsize=4096)
+def _key_path(key):
+    """Returns the (interned) components of a dotted key"""
+    return tuple(sys.intern(k) for k in str(key).split(KEY_SEP))
+
+
+class _NotFound:
+    """Result of a failed lookup, holds the subkey that was not found"""
+
+    __slots__ = ("subkey",)
+
+    def __init__(self, subkey):
+        self.subkey = subkey
+
+
+def _lookup(node, key):
+    """Returns the value for a (possibly dotted) key in node, or a _NotFound
+    object. Dicts (the common case) are searched without raising and catching
+    exceptions, other nested objects are indexed with node[subkey]."""
+    if not isinstance(key, str):
+        try:
+            return node[key]
+        except (KeyError, TypeError):
+            return _NotFound(key)
+    if type(node) is dict:  # fast path for non-dotted keys
+        value = node.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    for subkey, first in _key_steps(key):
+        if type(node) is dict or type(node) is _Layers:
+            value = node.get(subkey, _MISSING)
+            if value is not _MISSING:
+                return value
+            node = node.get(first, _MISSING)
+            if node is _MISSING:
+                return _NotFound(first)
+        else:
+            try:
+                return node[subkey]
+            except TypeError:  # dotted key with too many components
+                return _NotFound(subkey)
+            except KeyError:
+                pass
+            try:
+                node = node[first]
+            except KeyError:
+                return _NotFound(first)
+    return _NotFound(key)  # not reached, the last step never matches first
+
+
+def _contains(node, key):
+    """Returns True if the (possibly dotted) key is found in node"""
+    if not isinstance(key, str):
+        return key in node
+    for subkey, first in _key_steps(key):
+        if subkey in node:
+            return True
+        if first not in node:
+            return False
+        node = node[first]
+    return False
+
+
+def _unpickle(stream):
+    """Unpickles a context from a binary stream, via a memory map if possible.
+    The first record holds the context data, directly following records that
+    are lists hold changes to the data (see Context.replay()). Returns the
+    data and the list of changes. The stream is left positioned after the
+    last record that was read."""
+    try:
+        mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError):  # no (regular) file
+        return _unpickle_records(stream)
+    with mapped:
+        mapped.seek(stream.tell())
+        data, changes = _unpickle_records(mapped)
+        stream.seek(mapped.tell())
+    return data, changes
+
+
+def _unpickle_records(reader):
+    data = pickle.load(reader)
+    changes = []
+    while True:
+        position = reader.tell()
+        try:
+            record = pickle.load(reader)
+        except EOFError:
+            break
+        if not isinstance(record, list):
+            reader.seek(position)
+            break
+        changes.append(record)
+    return data, changes
+
+
+class _Journal(list):
+    """A segment of the change journal of a Context (see Context.mark()). The
+    segments are linked, a Context refers to the last one only. Thus, records
+    in older segments are freed as soon as no mark refers to them."""
+
+    def __init__(self):
+        super().__init__()
+        self.next = None
+
+
+class _Mark:
+    """A position in the change journal of a Context (see Context.mark())"""
+
+    __slots__ = ("journal",)
+
+    def __init__(self, journal):
+        self.journal = journal  # the segment that starts at the mark
+
+
+def _expanded(mapping):
+    """Returns a dict of the data in mapping, with all dotted keys (in nested
+    mappings as well) expanded into nested dicts"""
+    data = {}
+    for key, value in mapping.items():
+        if isinstance(value, Mapping):
+            value = _expanded(value)
+        if isinstance(key, str) and KEY_SEP in key:
+            first, *keys = _key_path(key)
+            data[first] = _assoc(data.get(first), keys, value)
+        else:
+            data[key] = value
+    return data
+
+
+def _merged(base, other):
+    """Returns the deep merge of other into base, without modifying base or
+    other. Dicts are merged recursively, lists are concatenated, sets are
+    joined and any other value in base is replaced by the one from other.
+    Only the dicts along the merged paths are copied, all unchanged data is
+    shared with the arguments."""
+    if isinstance(base, dict) and isinstance(other, dict):
+        merged = dict(base)
+        for key, value in other.items():
+            merged[key] = _merged(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(base, list) and isinstance(other, list):
+        return base + other
+    if isinstance(base, set) and isinstance(other, set):
+        return base | other
+    return other
+
+
+def _replaces(base, other):
+    """Returns True if merging other into base (see _merged()) replaces a dict,
+    list or set in base (at any depth) by a value it can not be merged with"""
+    if isinstance(base, dict) and isinstance(other, dict):
+        return any(k in base and _replaces(base[k], v) for k, v in other.items())
+    if isinstance(base, list) and isinstance(other, list):
+        return False
+    if isinstance(base, set) and isinstance(other, set):
+        return False
+    return isinstance(base, (dict, list, set))
+
+
+def _assoc(node, keys, item):
+    """Returns a copy of node with item set at the path given by keys. Only
+    the dicts along the path are copied, everything else is shared."""
+    if not keys:
+        return item
+    node = dict(node) if isinstance(node, Mapping) else {}
+    node[keys[0]] = _assoc(node.get(keys[0]), keys[1:], item)
+    return node
+
+
+class _Layers:
+    """Top-level view of a layered (child) Context, used for key lookups"""
+
+    __slots__ = ("context",)
+
+    def __init__(self, context):
+        self.context = context
+
+    def __getitem__(self, key):
+        return self.context._top(key)
+
+    def get(self, key, default=None):
+        return self.context._get_top(key, default)
+
+    def __contains__(self, key):
+        return self.context._has_top(key)
+
 
 class Context(UserDict):
     """
@@ -15,79 +265,228 @@ class Context(UserDict):
     https://scriptengine.readthedocs.io/en/latest/concepts.html#task-context
     The Context is a special dict that allows
     * dotted keys, i.e. c["foo.bar"] is equivalent to c["foo"]["bar"]
-    * deep merges of other Mappings (via deepmerge.always_merger)
+    * deep merges of other Mappings
     * save and load the data to/from a file-like object
+    * copy-on-write layering of contexts (see new_child())
 
     Methods
     -------
     merge(other)
         Deep merges other into the context
 
+    new_child(m=None)
+        Returns a new context layered on top of this one
+
+    overlay()
+        Returns the data that has been set in, or merged into, a child context
+
+    snapshot()
+        Returns a copy of the context, sharing all nested data
+
+    mark()
+        Starts the change journal (if needed) and returns the current position
+
+    changes_since(mark)
+        Returns the changes since mark as a (compact) context update
+
+    records_since(mark), replay(records)
+        Returns the journal records since mark, applies journal records
+
+    sizeof(key=None), memory_report(depth=1)
+        Returns approximate memory sizes of the context or its items
+
     reset(keep=None)
         Deletes all data from the context, except for the keys listed in 'keep'
 
-    save(stream)
-        ...
+    save(stream, format="yaml")
+        Writes the context data to stream, as YAML or pickle
+
+    load(stream, format="yaml")
+        Replaces the context data with the data read from stream
+
+    Nested data is never modified in place by the Context methods: merges and
+    setting of (dotted) keys copy only the dicts along the changed paths and
+    share all other data (persistent data structure with path copying). The
+    cost of merges and snapshots is therefore proportional to the size of the
+    change, not to the size of the context. Consequently, data obtained from
+    the context must not be modified in place, since it may be shared.
 
-    load(stream)
-        ...
+    Attributes
+    ----------
+    generation
+        A number that changes whenever the context is modified
     """
 
-    def __getitem__(self, key: Any) -> Any:
-        """Return x[key] where key is possibly a dotted key"""
+    # The parent of a child context (see new_child()) and the top-level keys
+    # of the overlay that hide the parent's values, rather than being merged
+    _parent = None
+    _shadowed = frozenset()
 
-        def iter_getitem(data, subkey):
-            try:
-                return data[subkey]
-            except TypeError:  # dotted key with too many components
-                raise KeyError(subkey)
-            except KeyError:
-                pass
-            try:
-                first, _, remain = subkey.partition(KEY_SEP)
-            except AttributeError:
-                raise KeyError(subkey)
-            return iter_getitem(data[first], remain)
+    # The change journal (see mark()), a list of ("set", key, item) and
+    # ("merge", mapping) records, or None when changes are not recorded
+    _journal = None
 
-        try:
-            return iter_getitem(self.data, key)
-        except KeyError as e:
+    # Estimated memory size, valid for the generation it was computed for
+    _size_estimate = (None, 0)
+
+    def __init__(self, *args, **kwargs):
+        self._generation = next(_generations)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def generation(self):
+        """A number that changes with every modification of the context, via
+        setting or deleting items, merge(), reset() or load(). It can be used
+        to cache values derived from the context. Note that changes made
+        directly to nested data (e.g. c["foo"]["bar"] = 1) are not tracked!
+        For child contexts, the generation is a tuple that also reflects the
+        generation of the parent."""
+        if self._parent is None:
+            return self._generation
+        return (self._generation, self._parent.generation)
+
+    def _touch(self):
+        self._generation = next(_generations)
+
+    def new_child(self, m=None):
+        """Returns a new context that is layered on top of this one.
+
+        The child reads through to this (parent) context, but all changes go
+        into a private overlay of the child, leaving the parent untouched.
+        Nothing is copied from the parent: when the same top-level key is
+        present in the parent and the overlay, the child presents the deep
+        merge of both, computed without modifying either. Items set in the
+        child (x[key] = item) replace the parent's value, as do the items of
+        the (optional) mapping m, which is typically used for loop variables.
+
+        Note that the parent must not be modified while the child is in use
+        (other than through merge() or setting items), and that data nested
+        in the child must not be modified in place, since it may be shared
+        with the parent.
+        """
+        child = Context()
+        child._parent = self
+        child._shadowed = set()
+        for key, value in (m or {}).items():
+            child[key] = value
+        return child
+
+    def overlay(self):
+        """Returns the overlay of a child context, i.e. everything that has been
+        set in, or merged into, the child since it was created, as a new
+        Context. Merging the overlay into the parent gives the same result as
+        the changes applied to the child, as long as no values of the parent
+        have been replaced, i.e. by setting items or by merges that replace a
+        dict, list or set with a value of another type. For replaced
+        top-level keys, the overlay holds the complete new value (which hides
+        the parent's value in the child). For contexts without parent, this
+        returns a (shallow) copy of the context."""
+        overlay = Context()
+        overlay.data = dict(self.data)
+        return overlay
+
+    def _get_top(self, key, default=None):
+        """Returns the value of a top-level (non-dotted) key, merged from all
+        layers if needed, or default if the key is not found"""
+        if self._parent is None:
+            return self.data.get(key, default)
+        own = self.data.get(key, _MISSING)
+        if own is _MISSING:
+            return self._parent._get_top(key, default)
+        if key in self._shadowed:
+            return own
+        inherited = self._parent._get_top(key, _MISSING)
+        return own if inherited is _MISSING else _merged(inherited, own)
+
+    def _top(self, key):
+        value = self._get_top(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def _has_top(self, key):
+        if self._parent is None:
+            return key in self.data
+        return key in self.data or self._parent._has_top(key)
+
+    def _top_keys(self):
+        if self._parent is None:
+            return self.data.keys()
+        return dict.fromkeys(itertools.chain(self._parent._top_keys(), self.data))
+
+    def _flat(self):
+        """Returns the (merged) data of all layers as a single dict"""
+        if self._parent is None:
+            return self.data
+        return {key: self._get_top(key) for key in self._top_keys()}
+
+    def __iter__(self):
+        return iter(self._top_keys())
+
+    def __len__(self):
+        return len(self._top_keys())
+
+    def __getitem__(self, key: Any) -> Any:
+        """Return x[key] where key is possibly a dotted key"""
+        value = _lookup(self.data if self._parent is None else _Layers(self), key)
+        if type(value) is _NotFound:
+            e = KeyError(value.subkey)
             raise KeyError(
                 f"{key} (subkey {e} not found)" if str(key) != str(e) else key
-            ) from None
+            )
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return x[key] if key (possibly a dotted key) is found, else default"""
+        value = _lookup(self.data if self._parent is None else _Layers(self), key)
+        return default if type(value) is _NotFound else value
 
     def __setitem__(self, key: Any, item: Any) -> None:
         """Set x[key]=item where key is possibly a dotted key"""
-        try:
-            keys = key.split(KEY_SEP)
-        except AttributeError:
+        self._touch()
+        if not isinstance(key, str):
+            if self._journal is not None:
+                self._journal.append(("set", key, item))
             self.data[key] = item
-        else:
-            d = self.data
-            for k in keys[:-1]:
-                #             allow overwriting of non-mapping keys
-                if k not in d or not isinstance(d[k], Mapping):
-                    d[k] = {}
-                d = d[k]
-            # Make sure that nested dotted keys are resolved!
-            d[keys[-1]] = Context(item).data if isinstance(item, Mapping) else item
+            if self._parent is not None:
+                self._shadowed.add(key)
+            return
+        first, *keys = _key_path(key)
+        # Make sure that nested dotted keys are resolved!
+        if isinstance(item, Mapping):
+            item = _expanded(item)  # a copy, not the caller's mapping
+        if self._journal is not None:
+            self._journal.append(("set", key, item))
+        # Copy only the dicts along the (dotted) path, non-mapping values
+        # along the path are overwritten
+        self.data[first] = _assoc(self._get_top(first), keys, item) if keys else item
+        if self._parent is not None:
+            self._shadowed.add(first)
 
-    def __contains__(self, key: object) -> bool:
-        def iter_contains(data, subkey):
-            if subkey in data:
-                return True
-            try:
-                first, _, remain = subkey.partition(KEY_SEP)
-            except AttributeError:
-                return False
-            if first in data:
-                return iter_contains(data[first], remain)
-            return False
+    def __delitem__(self, key: Any) -> None:
+        """Delete x[key]. For child contexts, only the overlay is affected, i.e.
+        values inherited from the parent become visible again."""
+        self._touch()
+        self._journal = None
+        del self.data[key]
+        if self._parent is not None:
+            self._shadowed.discard(key)
 
-        return iter_contains(self.data, key)
+    def __contains__(self, key: object) -> bool:
+        return _contains(self.data if self._parent is None else _Layers(self), key)
 
     def __str__(self) -> str:
-        return f"Context({self.data})"
+        return f"Context({self._flat()})"
+
+    def __repr__(self) -> str:
+        return repr(self._flat())
+
+    def copy(self):
+        """Returns a (shallow) copy of the context, see snapshot(). The copy has
+        its own generation, no parent and no change journal."""
+        return self.snapshot()
+
+    __copy__ = copy
 
     def __add__(self, other):
         if isinstance(other, Mapping):
@@ -97,11 +496,172 @@ class Context(UserDict):
 
     def merge(self, other):
         if isinstance(other, Context):
-            always_merger.merge(self.data, other.data)
-        elif isinstance(other, Mapping):
-            always_merger.merge(self.data, other)
-        else:
+            other = other._flat()
+        elif not isinstance(other, Mapping):
             raise TypeError(f"can not merge Context and {type(other).__name__}")
+        if memory_limits.lowest:
+            size = self._check_size(other)
+        self._touch()
+        if memory_limits.lowest:
+            self._size_estimate = (self.generation, size)
+        if self._journal is not None:
+            # A (shallow) copy, the caller may modify the mapping later
+            self._journal.append(("merge", dict(other)))
+        # For child contexts, this merges into the overlay
+        for key, value in other.items():
+            if self._parent is not None and key not in self._shadowed:
+                own = self.data.get(key, _MISSING)
+                inherited = self._parent._get_top(key, _MISSING)
+                if _replaces(own, value) or _replaces(inherited, value):
+                    # The replaced data of the parent must not reappear when
+                    # other values are merged later, hence the merged value
+                    # hides the parent's value from now on
+                    self.data[key] = _merged(self._get_top(key), value)
+                    self._shadowed.add(key)
+                    continue
+            if key in self.data:
+                self.data[key] = _merged(self.data[key], value)
+            else:
+                self.data[key] = value
+
+    def _estimated_size(self):
+        """Returns the estimated memory size of the context. The estimate is
+        computed once per generation, and child contexts add their overlay to
+        the (cached) estimate of the parent."""
+        generation, size = self._size_estimate
+        if generation != self.generation:
+            size = deep_sizeof(self.data)
+            if self._parent is not None:
+                size += self._parent._estimated_size()
+            self._size_estimate = (self.generation, size)
+        return size
+
+    def _check_size(self, other):
+        """Checks the memory size of the context after merging other against the
+        memory limits, and returns the size. The cheap estimate (size before
+        the merge plus size of other) only ever grows, therefore the size of
+        the merge result is computed exactly if the estimate exceeds a
+        limit. Once the soft limit warning has been logged, only the hard
+        limit is checked, so that merges into a context above the soft limit
+        stay cheap."""
+        size = self._estimated_size() + deep_sizeof(other)
+        limit = memory_limits.hard if memory_limits.warned else memory_limits.lowest
+        if not limit or size <= limit:
+            return size
+        size = deep_sizeof(_merged(self._flat(), dict(other)))
+        if memory_limits.hard and size > memory_limits.hard:
+            largest = sorted(
+                ((k, deep_sizeof(v)) for k, v in other.items()),
+                key=lambda item: item[1],
+                reverse=True,
+            )
+            raise ScriptEngineContextError(
+                f"Context size ({format_size(size)}) would exceed the hard limit "
+                f"({format_size(memory_limits.hard)}), largest items of the "
+                "update: "
+                + ", ".join(f"{k} ({format_size(v)})" for k, v in largest[:3])
+            )
+        if memory_limits.soft and size > memory_limits.soft:
+            if not memory_limits.warned:
+                memory_limits.warned = True
+                logging.getLogger("se.context").warning(
+                    f"Context size ({format_size(size)}) exceeds the soft limit "
+                    f"({format_size(memory_limits.soft)})"
+                )
+        return size
+
+    def sizeof(self, key=None):
+        """Returns the approximate memory size (in bytes) of the value for key
+        (possibly a dotted key), or of the whole context if key is None. Data
+        that is shared, e.g. between a child context and its parent, is
+        counted only once."""
+        return deep_sizeof(self._flat() if key is None else self[key])
+
+    def memory_report(self, depth=1):
+        """Returns the approximate memory sizes of all items in the context, down
+        to the given nesting depth, as a dict of (dotted) keys and sizes,
+        largest first"""
+        report = {}
+
+        def walk(data, prefix, level):
+            for key, value in data.items():
+                path = f"{prefix}{key}"
+                report[path] = deep_sizeof(value)
+                if level < depth and isinstance(value, dict):
+                    walk(value, f"{path}{KEY_SEP}", level + 1)
+
+        walk(self._flat(), "", 1)
+        return dict(sorted(report.items(), key=lambda item: item[1], reverse=True))
+
+    def mark(self):
+        """Returns a mark for the current state of the context, to be used with
+        changes_since(). The first call starts the change journal, which
+        records all items set in, and all mappings merged into, the context
+        from then on. Recording is cheap, since the journal keeps shallow
+        copies of the merged mappings only and shares all nested data (which
+        must not be modified in place, see Context).
+
+        Every mark starts a new segment of the journal, so that the records
+        before the oldest mark that is still in use can be freed (e.g. for
+        long-lived contexts that are checkpointed regularly, see
+        scriptengine.checkpoint)."""
+        if self._journal is None:
+            self._journal = _Journal()
+        elif self._journal:
+            segment = _Journal()
+            self._journal.next = segment
+            self._journal = segment
+        return _Mark(self._journal)
+
+    def _records_since(self, mark):
+        """Returns the journal records since mark, raises ValueError if mark is
+        not valid any more"""
+        segments = [mark.journal]
+        while segments[-1].next is not None:
+            segments.append(segments[-1].next)
+        if segments[-1] is not self._journal:
+            raise ValueError("Context has been reset or reloaded since mark")
+        return [record for segment in segments for record in segment]
+
+    def changes_since(self, mark):
+        """Returns everything that has been set or merged into the context since
+        mark (see mark()), composed into a single new Context. Merging it into
+        a snapshot taken at mark gives the current state, as long as no items
+        have been replaced (x[key] = item is recorded like a merge of
+        {key: item}). Deleting items, reset() and load() end the journal,
+        after which older marks are no longer valid (ValueError)."""
+        changes = Context()
+        for record in self._records_since(mark):
+            if record[0] == "set":
+                changes[record[1]] = record[2]
+            else:
+                changes.merge(record[1])
+        return changes
+
+    def records_since(self, mark):
+        """Returns the journal records (see mark()) since mark, as a list of
+        ["set", key, item] and ["merge", mapping] lists. Unlike changes_since(),
+        the records reproduce the current state exactly when they are replayed
+        (see replay()) on a snapshot taken at mark."""
+        return [list(record) for record in self._records_since(mark)]
+
+    def replay(self, records):
+        """Applies journal records, as returned by records_since()"""
+        for operation, *args in records:
+            if operation == "set":
+                self.__setitem__(*args)
+            elif operation == "merge":
+                self.merge(*args)
+            else:
+                raise ValueError(f"Unknown context journal operation '{operation}'")
+
+    def snapshot(self):
+        """Returns a copy of the context, which is not affected by subsequent
+        changes to the context (and vice versa). Since nested data is shared,
+        the cost is proportional to the number of top-level keys only."""
+        snapshot = Context()
+        snapshot.data = dict(self._flat())
+        return snapshot
 
     def reset(self, keep=None):
         save_copy = Context()
@@ -109,14 +669,49 @@ class Context(UserDict):
             if k in self:
                 save_copy[k] = self[k]
         self.data.clear()
+        self._detach()
         for k in save_copy:
             self[k] = save_copy[k]
 
-    def load(self, stream):
-        self.data = yaml.safe_load(stream)
+    def load(self, stream, format="yaml"):
+        """Replaces the context data with data read from stream. The format is
+        either "yaml" (text stream) or "pickle" (binary stream). Pickled data
+        is read from a memory map, if the stream is a regular file. Note that
+        loading pickled data can execute arbitrary code: only load trusted
+        files!
+
+        Streams written by scriptengine.checkpoint.Checkpoint hold the context
+        data followed by lists of change records, which are replayed on top of
+        the data to rebuild the latest state."""
+        if format == "yaml":
+            data, *changes = list(yaml_backend.safe_load_all(stream)) or [None]
+        elif format == "pickle":
+            data, changes = _unpickle(stream)
+        else:
+            raise ValueError(f"Unknown context format '{format}', use one of {FORMATS}")
+        self.data = data
+        self._detach()
+        for records in changes:
+            self.replay(records)
+
+    def save(self, stream, format="yaml"):
+        """Writes the context data to stream. The format is either "yaml" (text
+        stream, human readable, the default) or "pickle" (binary stream). The
+        pickle format is much faster for large contexts and round-trips all
+        picklable Python objects, such as dates and rrules."""
+        if format == "yaml":
+            yaml_backend.dump(self._flat(), stream, sort_keys=False)
+        elif format == "pickle":
+            pickle.dump(self._flat(), stream, protocol=PICKLE_PROTOCOL)
+        else:
+            raise ValueError(f"Unknown context format '{format}', use one of {FORMATS}")
 
-    def save(self, stream):
-        yaml.dump(self.data, stream, sort_keys=False)
+    def _detach(self):
+        # Remove the parent (after the data has been replaced)
+        self._parent = None
+        self._shadowed = frozenset()
+        self._journal = None
+        self._touch()
 
 
 # from dotty_dict import Dotty
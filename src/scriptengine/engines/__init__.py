@@ -3,4 +3,7 @@
 This module provides script engines, which can run lists of jobs.
 """
 
+from .async_script_engine import AsyncScriptEngine as AsyncScriptEngine
+from .dag_script_engine import DAGScriptEngine as DAGScriptEngine
+from .resumable_script_engine import ResumableScriptEngine as ResumableScriptEngine
 from .simple_script_engine import SimpleScriptEngine as SimpleScriptEngine
@@ -0,0 +1,89 @@
+""" AsyncScriptEngine for ScriptEngine.
+
+AsyncScriptEngine runs scripts on an asyncio event loop. Like the
+DAGScriptEngine, it follows the 'id:'/'needs:' dependencies of the script
+(items without 'needs:' depend on all preceding items) and merges the context
+updates in script order. However, the items run as asyncio tasks, using the
+arun() coroutine of tasks and jobs rather than a thread pool:
+
+    - Tasks that implement arun() natively (e.g. base.command, which uses
+      asyncio subprocesses) wait on the event loop, so that many external
+      commands can run concurrently without threads.
+    - For all other tasks, Task.arun() runs the blocking run() in the default
+      executor of the event loop.
+    - The iterations of parallel loops (thread mode) run as asyncio tasks.
+
+With mode="process", items run in a process pool, with the same policy as for
+the DAGScriptEngine.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import os
+
+from scriptengine import runtime
+from scriptengine.engines.dag_script_engine import (
+    DAGScriptEngine,
+    _run_in_process,
+    _Schedule,
+)
+
+
+class AsyncScriptEngine(DAGScriptEngine):
+    def run(self, script, context):
+        return asyncio.run(self.arun(script, context))
+
+    async def arun(self, script, context):
+        script = script if isinstance(script, list) else [script]
+        schedule = _Schedule(self.dependencies(script), context, script)
+        running = {}
+        semaphore = asyncio.Semaphore(self.max_workers or len(script) or 1)
+
+        async def run_item(todo, item_context):
+            async with semaphore:
+                pickled = None
+                if processes is not None:
+                    pickled = self._pickled(todo)
+                if pickled is not None:
+                    return await asyncio.get_running_loop().run_in_executor(
+                        processes,
+                        _run_in_process,
+                        pickled,
+                        item_context,
+                        os.getcwd(),
+                        dict(os.environ),
+                    )
+                return await todo.arun(item_context)
+
+        with runtime.bind(instance=self), contextlib.ExitStack() as stack:
+            processes = (
+                stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(self.max_workers)
+                )
+                if self.mode == "process"
+                else None
+            )
+            while schedule.pending or running:
+                for index in schedule.ready(busy=bool(running)):
+                    item_context = schedule.context(index)
+                    task = asyncio.ensure_future(run_item(script[index], item_context))
+                    running[task] = (index, item_context)
+                completed, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(completed, key=lambda t: running[t][0]):
+                    index, item_context = running.pop(task)
+                    try:
+                        # Merging the update may fail as well (context limits)
+                        schedule.complete(index, task.result())
+                    except Exception as error:
+                        # Do not start further items, wait for running ones
+                        schedule.pending.clear()
+                        if running:
+                            await asyncio.wait(running)
+                        if isinstance(error, self._stopping_errors):
+                            self._stop(script[index], item_context, error)
+                        raise
+
+        return schedule.changes()
@@ -0,0 +1,287 @@
+""" DAGScriptEngine for ScriptEngine.
+
+DAGScriptEngine runs the jobs and tasks of a script as a dependency graph
+(directed acyclic graph, DAG). Dependencies are given in the script with
+'id:' and 'needs:' annotations:
+
+    - base.copy:
+        src: restart.nc
+        dst: '{{rundir}}'
+      id: restart
+      needs: []
+    - base.template:
+        src: namelist.j2
+        dst: '{{rundir}}/namelist'
+      id: namelist
+      needs: []
+    - base.command:
+        name: model
+      needs: [restart, namelist]
+
+Items with 'needs:' depend only on the listed items, items without 'needs:'
+depend on all preceding items (as in SimpleScriptEngine). Items whose
+dependencies are complete run concurrently in a thread pool.
+
+With mode="process", items run in a process pool instead, so that CPU-bound
+Python tasks are not serialized by the GIL. Items are sent to the worker
+processes (pickled) together with their context, and the context updates are
+sent back and merged in the ScriptEngine process. The worker process runs an
+item in the working directory and environment of the ScriptEngine process at
+the time the item is started. Items that must run in the ScriptEngine process
+itself (see Task.parent_process_only, e.g. base.chdir, base.setenv or
+base.exit) and items that can not be pickled run in a thread pool, as in
+thread mode.
+
+Items that must run in the ScriptEngine process change the process itself
+(e.g. its working directory or environment), which all other items share.
+Therefore, in both modes, they run on their own: they start when all running
+items have finished, and no other items start before they have finished.
+
+Every item sees the context updates of all items it (transitively) depends
+on, merged in script order, but not the updates of independent items. The
+context update of the script is the merge of all updates, in script order.
+Hence, the results do not depend on the order in which items complete.
+"""
+
+import concurrent.futures
+import contextlib
+import contextvars
+import os
+import pickle
+
+from scriptengine import runtime
+from scriptengine.context import Context
+from scriptengine.engines.simple_script_engine import SimpleScriptEngine
+from scriptengine.exceptions import ScriptEngineParseScriptError
+from scriptengine.jobs import Job
+
+
+def _run_in_process(pickled_todo, context, cwd, environ):
+    """Runs the (pickled, see DAGScriptEngine._pickled()) todo in a worker
+    process, in the working directory and environment of the ScriptEngine
+    process, and returns the context update"""
+    os.chdir(cwd)
+    os.environ.clear()
+    os.environ.update(environ)
+    return pickle.loads(pickled_todo).run(context)
+
+
+class DAGScriptEngine(SimpleScriptEngine):
+    _modes = ("thread", "process")
+
+    def __init__(self, max_workers=None, mode="thread"):
+        super().__init__()
+        if mode not in self._modes:
+            raise ValueError(f"Unknown mode '{mode}', use one of {self._modes}")
+        self.max_workers = max_workers
+        self.mode = mode
+
+    def _pickled(self, todo):
+        """Returns todo pickled, if it can run in a worker process, else None.
+        The pickled todo is sent to the worker as it is, so that it is
+        pickled only once."""
+        if todo.parent_process_only:
+            self.log_debug(f"Run <{todo.shortid}> in the ScriptEngine process")
+            return None
+        try:
+            return pickle.dumps(todo)
+        except Exception as e:
+            self.log_debug(
+                f"Run <{todo.shortid}> in the ScriptEngine process, "
+                f"can not be pickled: {e}"
+            )
+            return None
+
+    def dependencies(self, script):
+        """Returns the dependencies of all items in script, as a list of sets of
+        item indices. Raises ScriptEngineParseScriptError for duplicate or
+        unknown ids, and for cyclic dependencies."""
+
+        # id:/needs: annotations are parsed into jobs (see parser.build_job())
+        def annotation(todo, name):
+            return getattr(todo, name) if isinstance(todo, Job) else None
+
+        ids = {}
+        for index, todo in enumerate(script):
+            dag_id = annotation(todo, "dag_id")
+            if dag_id is None:
+                continue
+            if dag_id in ids:
+                self.log_error(f"Duplicate id in script: {dag_id}")
+                raise ScriptEngineParseScriptError
+            ids[dag_id] = index
+
+        dependencies = []
+        for index, todo in enumerate(script):
+            needs = annotation(todo, "needs")
+            if needs is None:
+                dependencies.append(set(range(index)))
+                continue
+            unknown = [n for n in needs if n not in ids]
+            if unknown:
+                self.log_error(f"Unknown id(s) in needs of <{todo.shortid}>: {unknown}")
+                raise ScriptEngineParseScriptError
+            dependencies.append({ids[n] for n in needs})
+
+        # Check for cycles (Kahn's algorithm)
+        resolved = set()
+        while len(resolved) < len(script):
+            ready = {
+                i
+                for i, deps in enumerate(dependencies)
+                if i not in resolved and deps <= resolved
+            }
+            if not ready:
+                self.log_error(
+                    "Cyclic dependencies in script: "
+                    + ", ".join(
+                        str(annotation(script[i], "dag_id") or script[i].shortid)
+                        for i in range(len(script))
+                        if i not in resolved
+                    )
+                )
+                raise ScriptEngineParseScriptError
+            resolved |= ready
+        return dependencies
+
+    def run(self, script, context):
+        script = script if isinstance(script, list) else [script]
+        schedule = _Schedule(self.dependencies(script), context, script)
+        running = {}
+
+        with runtime.bind(instance=self), contextlib.ExitStack() as stack:
+            executor = stack.enter_context(
+                concurrent.futures.ThreadPoolExecutor(self.max_workers)
+            )
+            processes = (
+                stack.enter_context(
+                    concurrent.futures.ProcessPoolExecutor(self.max_workers)
+                )
+                if self.mode == "process"
+                else None
+            )
+            while schedule.pending or running:
+                for index in schedule.ready(busy=bool(running)):
+                    item_context = schedule.context(index)
+                    pickled = None
+                    if processes is not None:
+                        pickled = self._pickled(script[index])
+                    if pickled is not None:
+                        future = processes.submit(
+                            _run_in_process,
+                            pickled,
+                            item_context,
+                            os.getcwd(),
+                            dict(os.environ),
+                        )
+                    else:
+                        future = executor.submit(
+                            contextvars.copy_context().run,
+                            script[index].run,
+                            item_context,
+                        )
+                    running[future] = (index, item_context)
+                completed, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in completed:
+                    index, item_context = running.pop(future)
+                    try:
+                        # Merging the update may fail as well (context limits)
+                        schedule.complete(index, future.result())
+                    except Exception as error:
+                        # Do not start further items, wait for running ones
+                        schedule.pending.clear()
+                        concurrent.futures.wait(running)
+                        if isinstance(error, self._stopping_errors):
+                            self._stop(script[index], item_context, error)
+                        raise
+
+        return schedule.changes()
+
+
+class _Schedule:
+    """Book-keeping for running a script as DAG: which items are ready to run,
+    the contexts they run in, and the merge of their context updates"""
+
+    def __init__(self, dependencies, context, script):
+        self.dependencies = dependencies
+
+        # Items that change the ScriptEngine process run on their own, see
+        # ready(); the index of such an item while it is running
+        self.exclusive = [todo.parent_process_only for todo in script]
+        self.barrier = None
+
+        # All (transitive) dependencies of each item
+        self.ancestors = [set(deps) for deps in dependencies]
+        changed = True
+        while changed:
+            changed = False
+            for index, deps in enumerate(self.ancestors):
+                extended = deps.union(*(self.ancestors[d] for d in deps))
+                if extended != deps:
+                    self.ancestors[index] = extended
+                    changed = True
+
+        # The initial context, and the context with the updates of all items,
+        # merged in script order (as far as they are complete)
+        self.initial_context = (
+            context.snapshot() if isinstance(context, Context) else Context(context)
+        )
+        self.local_context = self.initial_context.snapshot()
+        self.start = self.local_context.mark()
+        self.merged = 0
+
+        self.updates = {}
+        self.done = set()
+        self.pending = list(range(len(dependencies)))
+
+    def ready(self, busy):
+        """Removes the items that can start now from the pending items and
+        returns them. Items with complete dependencies can start, except
+        for items that change the ScriptEngine process (exclusive items):
+        they act as barriers, i.e. they start only when no other items are
+        running (busy is False), and no items start while they are running
+        or waiting to start."""
+        if self.barrier is not None:
+            return []
+        ready = []
+        for index in self.pending:
+            if not self.dependencies[index] <= self.done:
+                continue
+            if self.exclusive[index]:
+                if not (busy or ready):
+                    ready = [index]
+                    self.barrier = index
+                break
+            ready.append(index)
+        for index in ready:
+            self.pending.remove(index)
+        return ready
+
+    def context(self, index):
+        """Returns the context for item index, with the updates of all items it
+        depends on"""
+        if self.ancestors[index] == set(range(index)):
+            # All preceding items are complete and merged
+            return self.local_context.snapshot()
+        item_context = self.initial_context.snapshot()
+        for a in sorted(self.ancestors[index]):
+            if self.updates[a]:
+                item_context += self.updates[a]
+        return item_context
+
+    def complete(self, index, update):
+        """Records the context update of item index"""
+        self.updates[index] = update
+        self.done.add(index)
+        if index == self.barrier:
+            self.barrier = None
+        while self.merged in self.done:
+            if self.updates[self.merged]:
+                self.local_context += self.updates[self.merged]
+            self.merged += 1
+
+    def changes(self):
+        """Returns the merged context updates of all items, or None"""
+        return self.local_context.changes_since(self.start) or None
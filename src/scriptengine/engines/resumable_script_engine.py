@@ -0,0 +1,131 @@
+""" ResumableScriptEngine for ScriptEngine.
+
+ResumableScriptEngine runs scripts like the SimpleScriptEngine, but records
+the progress in a log file: after every completed top-level task or job, a
+record with a stable id of the task/job and its context update is appended to
+the log. When the engine is run with resume=True (se --resume), the completed
+tasks and jobs at the beginning of the script are skipped, their context
+updates are restored from the log, and the script continues with the task or
+job that failed before.
+
+The id of a task or job is made from its position in the script and its
+fingerprint (see Task.fingerprint()), hence a task/job that has been changed
+since the previous run, and all following ones, are run again. Besides the
+context updates, the log records changes of the working directory and the
+environment (e.g. from base.chdir or base.setenv), which are restored as
+well when resuming. Other effects of skipped tasks/jobs (e.g. files) are
+assumed to persist.
+
+Tasks and jobs of nested scripts (e.g. from base.include) are not recorded
+separately, they are part of the enclosing top-level task.
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+from scriptengine import runtime
+from scriptengine.context import PICKLE_PROTOCOL, Context
+from scriptengine.engines.simple_script_engine import SimpleScriptEngine
+
+
+class ResumableScriptEngine(SimpleScriptEngine):
+    def __init__(self, progress, resume=False):
+        super().__init__()
+        # Absolute path, tasks may change the working directory
+        self.progress = Path(progress).absolute()
+        self.resume = resume
+
+    @staticmethod
+    def stable_id(index, todo):
+        """Returns the id of todo at position index of the script, which is the
+        same in different runs of the script"""
+        return f"{index}-{todo.fingerprint()}"
+
+    def _read_progress(self):
+        records = []
+        try:
+            with open(self.progress, "rb") as f:
+                while True:
+                    records.append(pickle.load(f))
+        except FileNotFoundError:
+            self.log_warning(f"No progress log to resume from: {self.progress}")
+        except EOFError:
+            pass
+        except (pickle.UnpicklingError, ValueError) as e:
+            # Incomplete last record, e.g. if the previous run was killed
+            self.log_warning(f"Ignoring invalid record in progress log: {e}")
+        return records
+
+    def _write_progress(self, records):
+        with open(self.progress, "wb") as f:
+            for record in records:
+                pickle.dump(record, f, protocol=PICKLE_PROTOCOL)
+
+    def _append_progress(self, record):
+        with open(self.progress, "ab") as f:
+            pickle.dump(record, f, protocol=PICKLE_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def run(self, script, context):
+        if runtime.instance() is self:
+            # Nested script (e.g. base.include), part of a top-level task
+            return super().run(script, context)
+
+        script = script if isinstance(script, list) else [script]
+        local_context = (
+            context.snapshot() if isinstance(context, Context) else Context(context)
+        )
+        start = local_context.mark()
+
+        # Skip the completed tasks/jobs at the beginning of the script
+        records = self._read_progress() if self.resume else []
+        resumed = 0
+        for index, (todo, record) in enumerate(zip(script, records)):
+            if record["id"] != self.stable_id(index, todo):
+                break
+            if record["update"]:
+                local_context += record["update"]
+            resumed += 1
+        if resumed:
+            last = records[resumed - 1]
+            os.chdir(last["cwd"])
+            os.environ.update(last["setenv"])
+            for name in last["unsetenv"]:
+                os.environ.pop(name, None)
+            self.log_info(
+                f"Resuming after {resumed} completed task(s)/job(s) "
+                f"from {self.progress}"
+            )
+        elif self.resume:
+            self.log_info("No completed tasks/jobs to resume from, run all")
+        self._write_progress(records[:resumed])
+
+        # Changes of the environment are recorded relative to the environment
+        # at the start of this run (possibly in a new session)
+        environ = dict(os.environ)
+        setenv = dict(records[resumed - 1]["setenv"]) if resumed else {}
+        unsetenv = set(records[resumed - 1]["unsetenv"]) if resumed else set()
+
+        with runtime.bind(instance=self):
+            for index, todo in enumerate(script[resumed:], start=resumed):
+                context_update = self._guarded_run(todo, local_context)
+                for name, value in os.environ.items():
+                    if environ.get(name) != value:
+                        setenv[name] = value
+                        unsetenv.discard(name)
+                for name in set(environ) - set(os.environ):
+                    setenv.pop(name, None)
+                    unsetenv.add(name)
+                environ = dict(os.environ)
+                self._append_progress(
+                    {
+                        "id": self.stable_id(index, todo),
+                        "update": dict(context_update) if context_update else None,
+                        "cwd": os.getcwd(),
+                        "setenv": dict(setenv),
+                        "unsetenv": sorted(unsetenv),
+                    }
+                )
+        return local_context.changes_since(start) or None
@@ -5,13 +5,14 @@ on the local machine, without consideration of job contexts. The
 SimpleScriptEngine relies on the Job class to run the actual tasks/jobs.
 """
 
-import copy
 import logging
 import sys
 from pprint import pprint
 
+from scriptengine import runtime
 from scriptengine.context import Context
 from scriptengine.exceptions import (
+    ScriptEngineContextError,
     ScriptEngineJobError,
     ScriptEngineStopException,
     ScriptEngineTaskError,
@@ -25,35 +26,58 @@ class SimpleScriptEngine:
             "se.instance." + self.__class__.__name__.lower()
         )
 
+    # Errors that stop the engine (see _stop()), other errors propagate
+    _stopping_errors = (
+        AttributeError,
+        ScriptEngineStopException,
+        ScriptEngineTaskError,
+        ScriptEngineJobError,
+        ScriptEngineContextError,
+    )
+
     def _guarded_run(self, runner, context):
+        """Runs runner, merges its context update into context and returns the
+        update"""
         try:
-            return runner.run(context)
-        except AttributeError as e:
+            context_update = runner.run(context)
+            if context_update:
+                context += context_update
+            return context_update
+        except self._stopping_errors as e:
+            self._stop(runner, context, e)
+
+    def _stop(self, runner, context, exception):
+        """Logs why the engine stops (due to exception raised when running
+        runner) and exits"""
+        error = exception
+        if isinstance(exception, AttributeError):
             self.log_error(
-                "STOPPING SimpleScriptEngine due to internal error: "
+                f"STOPPING {self.__class__.__name__} due to internal error: "
                 f"Cannot run type {type(runner).__name__}"
             )
-            error = e
-        except ScriptEngineStopException:
-            self.log_info("STOPPING SimpleScriptEngine instance upon request")
+        elif isinstance(exception, ScriptEngineStopException):
+            self.log_info(f"STOPPING {self.__class__.__name__} instance upon request")
             error = None
-        except ScriptEngineTaskError as e:
+        elif isinstance(exception, ScriptEngineTaskError):
             if isinstance(runner, Task):
                 self.log_error(
-                    "STOPPING SimpleScriptEngine due to task error in "
+                    f"STOPPING {self.__class__.__name__} due to task error in "
                     f"{runner.reg_name} <{runner.shortid}>"
                 )
             else:
                 self.log_error(
-                    "STOPPING SimpleScriptEngine due to task error in job "
+                    f"STOPPING {self.__class__.__name__} due to task error in job "
                     f"<{runner.shortid}>"
                 )
-            error = e
-        except ScriptEngineJobError as e:
+        elif isinstance(exception, ScriptEngineJobError):
             self.log_error(
-                f"STOPPING SimpleScriptEngine due to job error in <{runner.shortid}>"
+                f"STOPPING {self.__class__.__name__} due to job error in "
+                f"<{runner.shortid}>"
+            )
+        elif isinstance(exception, ScriptEngineContextError):
+            self.log_error(
+                f"STOPPING {self.__class__.__name__} due to context error: {exception}"
             )
-            error = e
         if error:
             if self.logger.getEffectiveLevel() <= logging.DEBUG:
                 self.log_error("Last context before error:")
@@ -65,14 +89,14 @@ class SimpleScriptEngine:
         sys.exit()
 
     def run(self, script, context):
-        local_context = Context(context)
-        context_update = Context()
-        for todo in script if isinstance(script, list) else [script]:
-            c = self._guarded_run(todo, local_context)
-            if c:
-                local_context += c
-                context_update += copy.deepcopy(c)
-        return context_update or None
+        local_context = (
+            context.snapshot() if isinstance(context, Context) else Context(context)
+        )
+        start = local_context.mark()
+        with runtime.bind(instance=self):
+            for todo in script if isinstance(script, list) else [script]:
+                self._guarded_run(todo, local_context)
+        return local_context.changes_since(start) or None
 
     def _log(self, level, msg):
         self.logger.log(level, msg)
@@ -32,6 +32,11 @@ class ScriptEngineParseScriptError(ScriptEngineParseError):
     parsed as a valid ScriptEngine script"""
 
 
+class ScriptEngineContextError(ScriptEngineError):
+    """There is a problem with the ScriptEngine context, for example when it
+    exceeds its memory limit"""
+
+
 class ScriptEngineTaskError(ScriptEngineError):
     """All ScriptEngine Tasks should throw this"""
 
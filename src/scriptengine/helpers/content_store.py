@@ -0,0 +1,208 @@
+"""ScriptEngine helpers: Content-addressed store
+
+A local, content-addressed store for cached results. Files are stored once by
+the SHA-256 hash of their content (objects), results are stored as entries
+under a key, with references to the objects:
+
+    store = ContentStore("~/.cache/scriptengine", max_size=parse_size("10G"))
+    store.put("<key>", {"files": {"out.nc": store.add_file("out.nc")}})
+    entry = store.get("<key>")  # or None
+    store.restore_file(entry["files"]["out.nc"], "out.nc")
+
+The store size is limited by max_size: when an entry is put, the least
+recently used entries are evicted, together with the objects that are not
+referenced any more. The store keeps a running estimate of its size (the
+size when first needed plus everything added since), so that the store is
+only scanned when the estimate exceeds max_size. Use open_store() to share
+ContentStore objects (and their estimates) within a process.
+"""
+
+import collections
+import contextlib
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+_CHUNK_SIZE = 1024 * 1024
+
+DEFAULT_PATH = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")) / "scriptengine"
+DEFAULT_MAX_SIZE = 10 * 1024**3
+
+
+def file_digest(path):
+    """Returns the SHA-256 hash (hex string) of the content of file path. For
+    directories, the hash covers the names and contents of all files below."""
+    h = hashlib.sha256()
+    if os.path.isdir(path):
+        for f in sorted(p for p in Path(path).rglob("*") if p.is_file()):
+            h.update(f"{f.relative_to(path)}:{file_digest(f)}".encode())
+        return h.hexdigest()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ContentStore:
+    """Content-addressed store in directory path, with at most max_size bytes
+    (no limit if max_size is None)"""
+
+    def __init__(self, path, max_size=None):
+        self.path = Path(path).expanduser()
+        self.max_size = max_size
+        self._objects = self.path / "objects"
+        self._entries = self.path / "entries"
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._entries.mkdir(parents=True, exist_ok=True)
+        self._size = None  # Running size estimate, see _grow()
+        self._lock = threading.Lock()
+
+    def _grow(self, path):
+        # Adds the size of (new) file path to the running size estimate. Other
+        # processes may add to the store as well, the estimate is corrected
+        # whenever the store is scanned (see evict()).
+        with self._lock:
+            if self._size is None:
+                self._size = self.size()  # includes path
+            else:
+                self._size += path.stat().st_size
+
+    def _object(self, digest):
+        return self._objects / digest[:2] / digest[2:]
+
+    def _entry(self, key):
+        return self._entries / key
+
+    def _write_atomic(self, path, write):
+        # Concurrent writers (e.g. ensemble members) see complete files only
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def add_file(self, path):
+        """Adds the content of file path to the store and returns its digest"""
+        digest = file_digest(path)
+        obj = self._object(digest)
+        if not obj.exists():
+
+            def write(f):
+                with open(path, "rb") as src:
+                    shutil.copyfileobj(src, f)
+
+            self._write_atomic(obj, write)
+            self._grow(obj)
+        return digest
+
+    def restore_file(self, digest, path):
+        """Copies the object with digest to file path. Raises KeyError if the
+        object is not in the store."""
+        obj = self._object(digest)
+        path = Path(path)
+        if path.parent != Path(""):
+            path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.copyfile(obj, path)
+        except FileNotFoundError:
+            raise KeyError(digest)
+        os.utime(obj)
+
+    def get(self, key):
+        """Returns the entry stored under key (see put()), or None. The entry is
+        marked as recently used."""
+        entry_path = self._entry(key)
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(entry_path)
+        return entry
+
+    def put(self, key, entry):
+        """Stores entry (a picklable object, e.g. a dict with object digests)
+        under key and evicts the least recently used entries, if the store is
+        larger than max_size"""
+        entry_path = self._entry(key)
+        self._write_atomic(entry_path, lambda f: pickle.dump(entry, f))
+        self._grow(entry_path)
+        if self.max_size is not None and self._size > self.max_size:
+            self.evict(self.max_size)
+
+    def size(self):
+        """Returns the total size (in bytes) of all entries and objects"""
+        return sum(f.stat().st_size for f in self.path.rglob("*") if f.is_file())
+
+    def evict(self, max_size):
+        """Removes the least recently used entries, and the objects that are
+        not referenced by other entries, until the store is at most max_size
+        bytes"""
+        size = self.size()
+        with self._lock:
+            self._size = size
+        if size <= max_size:
+            return
+        entries = sorted(
+            (f for f in self._entries.iterdir() if not f.name.startswith(".")),
+            key=lambda f: f.stat().st_mtime,
+        )
+
+        references = {}
+        counts = collections.Counter()
+        for entry in entries:
+            try:
+                with open(entry, "rb") as f:
+                    references[entry] = set(_digests(pickle.load(f)))
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                references[entry] = set()
+            counts.update(references[entry])
+
+        while entries and size > max_size:
+            oldest = entries.pop(0)
+            with contextlib.suppress(FileNotFoundError):
+                size -= oldest.stat().st_size
+                oldest.unlink()
+            for digest in references.pop(oldest):
+                counts[digest] -= 1
+                if counts[digest] == 0:
+                    obj = self._object(digest)
+                    with contextlib.suppress(FileNotFoundError):
+                        size -= obj.stat().st_size
+                        obj.unlink()
+        with self._lock:
+            self._size = size
+
+
+@functools.lru_cache(maxsize=None)
+def _open_store(path, max_size):
+    return ContentStore(path, max_size)
+
+
+def open_store(path, max_size=None):
+    """Returns the ContentStore for path (and max_size), shared within the
+    process"""
+    return _open_store(str(Path(path).expanduser().absolute()), max_size)
+
+
+def _digests(entry):
+    """Yields all object digests referenced in (nested) entry data, i.e. all
+    values of "files" dicts"""
+    if isinstance(entry, dict):
+        for key, value in entry.items():
+            if key == "files" and isinstance(value, dict):
+                yield from value.values()
+            else:
+                yield from _digests(value)
+    elif isinstance(entry, (list, tuple)):
+        for item in entry:
+            yield from _digests(item)
@@ -0,0 +1,57 @@
+"""ScriptEngine helpers: Memory accounting
+
+Approximate memory sizes of (nested) Python data, as stored in the
+ScriptEngine context, and conversion of human readable sizes:
+
+    deep_sizeof({"files": ["a.nc", "b.nc"]})  # size in bytes
+    parse_size("512M")                        # 536870912
+    format_size(536870912)                    # "512.0 MiB"
+"""
+
+import re
+import sys
+
+_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d*)?)\s*([KMGT]?)(?:I?B)?\s*$", re.IGNORECASE)
+
+
+def deep_sizeof(obj):
+    """Returns the approximate memory size (in bytes) of obj, including all
+    items of (nested) dicts, lists, tuples and sets. Objects that are
+    referenced more than once are counted once. Other objects count with
+    their own size only (sys.getsizeof()), not including their attributes."""
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return size
+
+
+def parse_size(string):
+    """Converts a size like "1024", "500K", "1.5G" or "2GiB" (binary units)
+    into a number of bytes"""
+    match = _SIZE_RE.match(str(string))
+    if not match:
+        raise ValueError(f"Invalid size: '{string}'")
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.upper()])
+
+
+def format_size(size):
+    """Formats a number of bytes in human readable form"""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} TiB"
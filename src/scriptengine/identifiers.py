@@ -0,0 +1,69 @@
+"""ScriptEngine identifiers for tasks and jobs
+
+Tasks and jobs parsed from a script get stable ids, which are the same in
+different runs of the script (e.g. for the instance timers of timed tasks):
+the id is a name-based UUID (UUID5), derived from the origin of the task/job
+(the script file and the position of the task/job in the script) and its
+fingerprint (see Task.fingerprint() and Job.fingerprint()). The parser sets
+the origin for the duration of the construction of a task/job:
+
+    from scriptengine import identifiers
+
+    with identifiers.origin("/path/to/script.yml#/0/do/1"):
+        task = Task(arguments)
+
+Tasks and jobs that are created otherwise (e.g. programmatically) get ids from
+a counter, which are cheap to generate and unique within the process.
+
+The ids are returned as int (the 128 bit value of the UUID), which is more
+compact than a uuid.UUID object, see Task.id and Job.id.
+"""
+
+import contextlib
+import contextvars
+import itertools
+import uuid
+
+NAMESPACE = uuid.uuid5(
+    uuid.NAMESPACE_URL, "https://github.com/uwefladrich/scriptengine"
+)
+
+_origin = contextvars.ContextVar("scriptengine_origin", default=None)
+
+# next() on itertools.count is atomic, no lock needed for threads
+_counter = itertools.count(1)
+_MASK = 2**64 - 1
+_MIX = 0x9E3779B97F4A7C15  # Fibonacci hashing: spreads the counter bits
+
+
+@contextlib.contextmanager
+def origin(name):
+    """Context manager that sets the origin of the tasks and jobs created in
+    the with block"""
+    token = _origin.set(name)
+    try:
+        yield
+    finally:
+        _origin.reset(token)
+
+
+def counter_id():
+    """Returns a new id from the counter. The upper half of the UUID is a
+    bijective mix of the counter, so that the short ids (the first ten hex
+    digits) of subsequent ids differ."""
+    n = next(_counter)
+    return (((n * _MIX) & _MASK) << 64) | n
+
+
+def stable_id(origin, fingerprint):
+    """Returns the id for a task or job with fingerprint at origin"""
+    return uuid.uuid5(NAMESPACE, f"{origin}:{fingerprint}").int
+
+
+def new_id(todo):
+    """Returns the id for the task or job todo, which is being created: a
+    stable id if an origin is set (see origin()), otherwise a counter id"""
+    name = _origin.get()
+    if name is None:
+        return counter_id()
+    return stable_id(name, todo.fingerprint())
@@ -2,8 +2,11 @@
 
 import datetime
 import os
+import threading
+from collections import OrderedDict, namedtuple
 
 import jinja2
+import jinja2.nativetypes
 
 from scriptengine.exceptions import ScriptEngineParseJinjaError
 
@@ -69,45 +72,237 @@ _param_env = jinja2.Environment(loader=jinja2.BaseLoader)
 for name, function in filters().items():
     _param_env.filters[name] = function
 
+# Same as _param_env, but rendering to native Python types
+_native_param_env = jinja2.nativetypes.NativeEnvironment(loader=jinja2.BaseLoader)
+for name, function in filters().items():
+    _native_param_env.filters[name] = function
+
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+
+class TemplateCache:
+    """Bounded LRU cache of compiled Jinja2 templates, keyed on the source string.
+
+    Compiling is much more expensive than rendering and the same argument
+    strings are rendered over and over again (e.g. in loops). Entries are
+    created by 'factory' (e.g. Environment.from_string) and the least recently
+    used ones are discarded once 'maxsize' is reached. A maxsize of None lets
+    the cache grow without bounds, 0 disables caching.
+    """
+
+    def __init__(self, factory, maxsize=1024):
+        self._factory = factory
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, source):
+        with self._lock:
+            try:
+                compiled = self._entries[source]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(source)
+                return compiled
+        # Compile outside of the lock, errors are propagated to the caller
+        compiled = self._factory(source)
+        with self._lock:
+            if self._maxsize != 0:
+                self._entries[source] = compiled
+                self._evict()
+        return compiled
+
+    def _evict(self):
+        if self._maxsize is not None:
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def resize(self, maxsize):
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._maxsize,
+                len(self._entries),
+            )
 
-def _strtobool(value):
-    if value in ("y", "yes", "t", "true", "on", "1"):
-        return True
-    elif value in ("n", "no", "f", "false", "off", "0"):
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+# Compiled templates and expressions of the parameter environment, keyed on
+# the source string
+template_cache = TemplateCache(_param_env.from_string)
+native_template_cache = TemplateCache(_native_param_env.from_string)
+expression_cache = TemplateCache(_param_env.compile_expression)
+
+
+def is_template(string, env=_param_env):
+    """Returns True if string contains Jinja2 syntax, i.e. any of the block,
+    variable, comment (or line statement/comment) start strings configured
+    for env. Returns False for literal strings."""
+    markers = (
+        env.variable_start_string,
+        env.block_start_string,
+        env.comment_start_string,
+        env.line_statement_prefix,
+        env.line_comment_prefix,
+    )
+    return any(m in string for m in markers if m)
+
+
+def _renders_verbatim(string, env=_param_env):
+    """Returns True if Jinja2 would return the string unchanged. Apart from
+    template syntax, Jinja2 normalises newlines and may strip a single trailing
+    newline."""
+    if is_template(string, env) or "\r" in string:
+        return False
+    if "\n" in string and env.newline_sequence != "\n":
         return False
-    raise ValueError(f"Cannot convert '{value}' to a boolean value")
+    return env.keep_trailing_newline or not string.endswith("\n")
+
+
+RenderInfo = namedtuple("RenderInfo", ["calls", "passes", "max_passes"])
+
+
+class RenderStats:
+    """Counts the calls of render() (for strings), the number of Jinja2 render
+    passes done for them and the maximum number of passes for a single call"""
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = self._passes = self._max_passes = 0
 
-def render(arg, context, recursive=True, boolean=False):
+    def record(self, passes):
+        with self._lock:
+            self._calls += 1
+            self._passes += passes
+            self._max_passes = max(self._max_passes, passes)
+
+    def info(self):
+        with self._lock:
+            return RenderInfo(self._calls, self._passes, self._max_passes)
+
+    def clear(self):
+        with self._lock:
+            self._calls = self._passes = self._max_passes = 0
+
+
+render_stats = RenderStats()
+
+# Upper limit for the number of passes in recursive rendering
+MAX_RENDER_PASSES = 100
+
+
+def precompile(string, native=False):
+    """Compiles string in the parameter environment (or the native types
+    parameter environment, if native is true).
+
+    Returns the compiled template (which is also put in the template cache),
+    or None if string is a literal that needs no rendering. Raises
+    ScriptEngineParseJinjaError if string is not a valid Jinja2 template.
+    """
+    if _renders_verbatim(string):
+        return None
+    try:
+        return (native_template_cache if native else template_cache).get(string)
+    except jinja2.TemplateError as e:
+        raise ScriptEngineParseJinjaError(
+            f"Jinja2 {type(e).__name__} while parsing '{string}': {e}"
+        )
+
+
+def precompile_expression(string):
+    """Compiles string as a Jinja2 expression in the parameter environment
+    (the compiled expression is also put in the expression cache). Raises
+    ScriptEngineParseJinjaError if string is not a valid expression."""
+    try:
+        return expression_cache.get(string)
+    except jinja2.TemplateError as e:
+        raise ScriptEngineParseJinjaError(
+            f"Jinja2 {type(e).__name__} while parsing '{string}' "
+            f"(in boolean context): {e}"
+        )
+
+
+def render(
+    arg,
+    context,
+    recursive=True,
+    boolean=False,
+    *,
+    native=False,
+    template=None,
+    expression=None,
+):
     """Renders a string with Jinja2.
 
     The argument is rendered via jinja2.Template().render() if it is a string,
-    or returned unchanged otherwise. Rendering is done either once or
-    recursively until no further variables can be substituted. The result is
-    returned either as string, or converted into a bool (True/False).
+    or returned unchanged otherwise. Strings without Jinja2 syntax (see
+    is_template()) are returned without invoking Jinja2. Rendering is done
+    either once or recursively until no further variables can be substituted.
+    The result is returned either as string, or converted into a bool
+    (True/False).
 
     Args:
         arg: The string to be rendered. If it is not a string, arg is returned
             without changes.
         recursive (bool): If true (default), the string is rendered
-            recursively, i.e. until it's value doesn't change anymore. If
+            recursively, i.e. until the result contains no more Jinja2 syntax
+            or doesn't change anymore. Render cycles (e.g. a context parameter
+            that refers to itself) raise a ScriptEngineParseJinjaError. If
             false, the string is rendered once.
         boolean (bool): If false (default) the rendered string is returned
             (i.e. the return value is a string). If true, the rendered
-            string is evaluated in a boolean context in Jinja2.  The return
-            value is true or false in this case.
+            string is evaluated as a Jinja2 expression and the result is
+            returned as true or false.
         context (dict): A dictionary that provides the context for
             jinja2.Template().render()
+        native (bool): If true, render with jinja2.nativetypes, i.e. a string
+            that consists of a single expression (e.g. '{{ files }}') returns
+            the Python object (list, int, datetime, ...) instead of its string
+            representation. Other results may be converted with
+            ast.literal_eval() by Jinja2. Ignored if boolean is true.
+        template: A compiled template for arg (see precompile(), compiled
+            with the same value for native), used for the first render pass
+            instead of the template cache.
+        expression: A compiled expression for arg (see
+            precompile_expression()), used in boolean context if arg needs no
+            rendering.
 
     Returns:
         str: The rendered string (of boolean==False), OR
-        bool: The rendered string, evaluated as bool (if boolean=True)
+        bool: The rendered string, evaluated as bool (if boolean=True), OR
+        any: The rendered native value (if native=True)
+
+    The number of render passes is recorded in render_stats.
     """
 
-    def render_with_context(string_arg):
+    cache = native_template_cache if native and not boolean else template_cache
+
+    def render_with_context(string_arg, compiled=None):
         try:
             # Render string in parameter environment using context
-            return _param_env.from_string(string_arg).render(context)
+            if compiled is None:
+                compiled = cache.get(string_arg)
+            result = compiled.render(context)
+            # Native rendering returns Undefined objects, not empty strings
+            return str(result) if isinstance(result, jinja2.Undefined) else result
         except jinja2.TemplateError as e:
             raise ScriptEngineParseJinjaError(
                 f"Jinja2 {type(e).__name__} while parsing '{string_arg}'"
@@ -115,16 +310,51 @@ def render(arg, context, recursive=True, boolean=False):
                 f"{e}"
             )
 
+    def render_recursively(string_arg):
+        passes = 0
+        seen = []
+        while not _renders_verbatim(string_arg):
+            if passes >= MAX_RENDER_PASSES:
+                raise ScriptEngineParseJinjaError(
+                    f"Rendering '{arg}' did not finish after {passes} passes"
+                )
+            seen.append(string_arg)
+            string_arg = render_with_context(
+                string_arg, template if passes == 0 else None
+            )
+            passes += 1
+            if (
+                not recursive
+                or not isinstance(string_arg, str)  # native value
+                or string_arg == seen[-1]
+            ):
+                break
+            if string_arg in seen:
+                cycle = " -> ".join(f"'{s}'" for s in seen[seen.index(string_arg) :])
+                raise ScriptEngineParseJinjaError(
+                    f"Render cycle while parsing '{arg}': {cycle} -> '{string_arg}'"
+                )
+        render_stats.record(passes)
+        # Literal strings are returned as plain str, just as Jinja2 would
+        return str(string_arg) if isinstance(string_arg, str) else string_arg
+
+    def evaluate(string_arg):
+        try:
+            if expression is None or string_arg != arg:
+                compiled = expression_cache.get(string_arg)
+            else:
+                compiled = expression
+            return bool(compiled(context))
+        except jinja2.TemplateError as e:
+            raise ScriptEngineParseJinjaError(
+                f"Jinja2 {type(e).__name__} while parsing '{string_arg}' "
+                f"(in boolean context): {e}"
+            )
+
     if isinstance(arg, str):
-        rendered_string = render_with_context(arg)
-        if recursive:
-            next_rendered_string = render_with_context(rendered_string)
-            while rendered_string != next_rendered_string:
-                rendered_string = next_rendered_string
-                next_rendered_string = render_with_context(rendered_string)
+        rendered_string = render_recursively(arg)
         if boolean:
-            expr = f"{{% if {rendered_string} %}}1{{% else %}}0{{% endif %}}"
-            return _strtobool(render_with_context(expr))
+            return evaluate(rendered_string)
         return rendered_string
     else:
         return arg
@@ -6,15 +6,25 @@ be given to a ScriptEngine, for execution.
 """
 
 import ast
-import copy
+import asyncio
+import concurrent.futures
+import contextvars
+import hashlib
 import logging
+import threading
+import types
 import uuid
 
+from scriptengine import identifiers
 from scriptengine.context import Context
 from scriptengine.exceptions import (
     ScriptEngineJobParseError,
     ScriptEngineParseJinjaError,
+    ScriptEngineStopException,
 )
+from scriptengine.jinja import is_template
+from scriptengine.jinja import precompile as j2precompile
+from scriptengine.jinja import precompile_expression as j2precompile_expression
 from scriptengine.jinja import render as j2render
 from scriptengine.tasks.core import Task
 
@@ -41,28 +51,162 @@ def _todo_list(todo):
     return todo_list
 
 
+def _run_iteration(todo, context, items, cancelled=None):
+    """Runs the todo list for one loop iteration (with loop variables items) in
+    a child of context and returns the context update (the changes made in the
+    child, see Context.changes_since()). Used for parallel loops, must be a
+    module-level function for process pools."""
+    iteration_context = context.new_child()
+    start = iteration_context.mark()
+    for t in todo:
+        if cancelled is not None and cancelled.is_set():
+            return None
+        c = t.run(iteration_context.new_child(items))
+        if c:
+            iteration_context += c
+    return iteration_context.changes_since(start)
+
+
+async def _arun_iteration(todo, context, items, cancelled):
+    """Asynchronous version of _run_iteration(), for parallel loops in the
+    AsyncScriptEngine"""
+    iteration_context = context.new_child()
+    start = iteration_context.mark()
+    for t in todo:
+        if cancelled.is_set():
+            return None
+        c = await t.arun(iteration_context.new_child(items))
+        if c:
+            iteration_context += c
+    return iteration_context.changes_since(start)
+
+
+_NO_TEMPLATES = types.MappingProxyType({})
+_logger = logging.getLogger("se.job")
+
+
 class Job:
-    def __init__(self, todo=None, *, when=None, loop=None, loop_vars=None):
-        self._identifier = uuid.uuid4()
+    # Compact instances for large (e.g. generated) scripts, see Task
+    __slots__ = (
+        "_identifier",
+        "_todo",
+        "_when",
+        "_loop",
+        "_loop_vars",
+        "_parallel",
+        "_dag_id",
+        "_needs",
+        "_templates",  # Pre-compiled Jinja2 templates, see Job.precompile()
+        "_when_expression",  # Pre-compiled *when* clause, see Job.precompile()
+        "_loop_template",  # Pre-compiled *loop* spec, see Job.precompile()
+        "__weakref__",
+    )
+    # Attributes that are pickled, see Job.__getstate__()
+    _pickled_attributes = (
+        "_identifier",
+        "_todo",
+        "_when",
+        "_loop",
+        "_loop_vars",
+        "_parallel",
+        "_dag_id",
+        "_needs",
+    )
+
+    # Pool executors for parallel loops, see Job.run()
+    _executors = {
+        "thread": concurrent.futures.ThreadPoolExecutor,
+        "process": concurrent.futures.ProcessPoolExecutor,
+    }
+
+    def __init__(
+        self,
+        todo=None,
+        *,
+        when=None,
+        loop=None,
+        loop_vars=None,
+        parallel=None,
+        dag_id=None,
+        needs=None,
+    ):
         self.todo = todo or []
         self._when = when
         self._loop = loop
         self._loop_vars = loop_vars
-        self.log_debug(
-            "New Job:"
-            f"{' when '+self._when if self._when else ''}"
-            f"{' with '+str(self._loop_vars) if self._loop else ''}"
-            f"{' in '+str(self._loop) if self._loop else ''}"
-            f" {tuple(t.shortid for t in self._todo)}"
-        )
+        self._parallel = parallel
+        self._dag_id = dag_id
+        self._needs = needs
+        self._clear_templates()
+        # The id depends on the job spec, see scriptengine.identifiers
+        self._identifier = identifiers.new_id(self)
+        if _logger.isEnabledFor(logging.DEBUG):
+            self.log_debug(
+                "New Job:"
+                f"{' when '+str(self._when) if self._when else ''}"
+                f"{' with '+str(self._loop_vars) if self._loop else ''}"
+                f"{' in '+str(self._loop) if self._loop else ''}"
+                f"{' parallel '+str(self._parallel) if self._parallel else ''}"
+                f"{' id '+str(self._dag_id) if self._dag_id is not None else ''}"
+                f"{' needs '+str(self._needs) if self._needs is not None else ''}"
+                f" {tuple(t.shortid for t in self._todo)}"
+            )
+
+    def _clear_templates(self):
+        self._templates = _NO_TEMPLATES
+        self._when_expression = None
+        self._loop_template = None
+
+    def __getstate__(self):
+        # Pre-compiled templates can not be pickled (for process pools)
+        return {name: getattr(self, name) for name in self._pickled_attributes}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._clear_templates()
 
     @property
     def id(self):
-        return self._identifier
+        return uuid.UUID(int=self._identifier)
 
     @property
     def shortid(self):
-        return self._identifier.hex[:10]
+        return f"{self._identifier:032x}"[:10]
+
+    @property
+    def dag_id(self):
+        """The id given in the script (id:), used to refer to the job in the
+        needs of other jobs, or None"""
+        return self._dag_id
+
+    @property
+    def needs(self):
+        """The ids of the jobs this job depends on (needs:), or None if not
+        given"""
+        return self._needs
+
+    def fingerprint(self):
+        """Returns a hash (hex string) of the job specification, including the
+        fingerprints of all tasks and jobs in the todo list. Unlike the id,
+        the fingerprint is the same for equal jobs, no matter where they are
+        created (see scriptengine.identifiers)."""
+        spec = (
+            self._when,
+            self._loop,
+            self._loop_vars,
+            self._parallel,
+            self._dag_id,
+            self._needs,
+            tuple(t.fingerprint() for t in self.todo),
+        )
+        return hashlib.sha256(repr(spec).encode()).hexdigest()
+
+    @property
+    def parent_process_only(self):
+        """True if any task in the todo list must run in the ScriptEngine
+        process, see Task.parent_process_only"""
+        return any(t.parent_process_only for t in self.todo)
 
     @property
     def todo(self):
@@ -72,9 +216,65 @@ class Job:
     def todo(self, todo):
         self._todo = _todo_list(todo)
 
+    def precompile(self):
+        """Pre-compiles the Jinja2 templates in the *when* clause and the *loop*
+        spec, and (recursively) in all tasks and jobs of the todo list. A *when*
+        clause without template syntax is compiled into a Jinja2 expression.
+        Raises ScriptEngineParseJinjaError if a template is invalid."""
+        templates = {}
+
+        def compile_(arg, what, native=False):
+            if isinstance(arg, (list, tuple)):
+                for item in arg:
+                    compile_(item, what)
+            elif isinstance(arg, dict):
+                for key, val in arg.items():
+                    compile_(key, what)
+                    compile_(val, what)
+            elif isinstance(arg, str):
+                try:
+                    compiled = j2precompile(arg, native=native)
+                except ScriptEngineParseJinjaError as e:
+                    self.log_error(
+                        f"Jinja2 error in *{what}* '{arg}' (full error: {e})"
+                    )
+                    raise
+                if native:
+                    return compiled
+                if compiled is not None:
+                    templates[arg] = compiled
+
+        if isinstance(self._when, str) and not is_template(self._when):
+            try:
+                self._when_expression = j2precompile_expression(self._when)
+            except ScriptEngineParseJinjaError as e:
+                self.log_error(
+                    f"Jinja2 error in *when* clause '{self._when}' (full error: {e})"
+                )
+                raise
+        else:
+            compile_(self._when, "when clause")
+        if isinstance(self._loop, str):
+            # String loop specs are rendered to native types, see loop_spec()
+            self._loop_template = compile_(self._loop, "loop spec", native=True)
+        else:
+            compile_(self._loop, "loop spec")
+        self._templates = templates
+        for t in self.todo:
+            t.precompile()
+
+    def _template(self, arg):
+        return self._templates.get(arg) if isinstance(arg, str) else None
+
     def when(self, context):
         try:
-            return self._when is None or j2render(self._when, context, boolean=True)
+            return self._when is None or j2render(
+                self._when,
+                context,
+                boolean=True,
+                template=self._template(self._when),
+                expression=self._when_expression,
+            )
         except ScriptEngineParseJinjaError as e:
             self.log_error(
                 f"Jinja2 error in *when* clause '{self._when}' (full error: {e})"
@@ -82,8 +282,13 @@ class Job:
             raise ScriptEngineJobParseError
 
     def loop_spec(self, context):
+        # The loop spec is rendered to native types, so that a single expression
+        # (e.g. '{{ files }}') yields the list (or dict, ...) from the context
+        # as it is, without the round trip through str() and literal_eval()
         try:
-            iter = j2render(self._loop, context)
+            iter = j2render(
+                self._loop, context, native=True, template=self._loop_template
+            )
         except ScriptEngineParseJinjaError as e:
             self.log_error(
                 f"Jinja2 error in *loop* spec '{self._loop}' (full error: {e})"
@@ -110,7 +315,8 @@ class Job:
             if iter:
                 for items in iter:
                     parsed_items = tuple(
-                        j2render(i, context) for i in _listy(items, type_=tuple)
+                        j2render(i, context, template=self._template(i))
+                        for i in _listy(items, type_=tuple)
                     )
                     vars_tuple = _listy(vars, type_=tuple)
                     if len(vars_tuple) == 1 and len(parsed_items) > 1:
@@ -129,30 +335,210 @@ class Job:
         else:
             yield {}
 
+    def parallel_workers(self, context):
+        """Returns the number of workers for parallel loops (None means the
+        default of the pool executor). The number can be given as Jinja2
+        template."""
+        workers = self._parallel.get("workers")
+        if isinstance(workers, str):
+            try:
+                workers = j2render(workers, context, native=True)
+            except ScriptEngineParseJinjaError as e:
+                self.log_error(
+                    f"Jinja2 error in *parallel* workers '{workers}' (full error: {e})"
+                )
+                raise ScriptEngineJobParseError
+        if workers is None:
+            return None
+        try:
+            workers = int(workers)
+        except (TypeError, ValueError):
+            workers = 0
+        if workers < 1:
+            self.log_error(f"Invalid number of *parallel* workers: {workers}")
+            raise ScriptEngineJobParseError
+        return workers
+
     def append(self, todo):
         todo_list = _todo_list(todo)
         self._todo.extend(todo_list)
-        self.log_debug(f'Append: {",".join(t.shortid for t in todo_list)}')
+        if _logger.isEnabledFor(logging.DEBUG):
+            self.log_debug(f'Append: {",".join(t.shortid for t in todo_list)}')
 
     def run(self, context):
         if self.when(context):
-            local_context = Context(copy.deepcopy(context))
-            context_update = Context()
-            for items in self.loop(local_context):
-                if set(items) & set(local_context):
-                    self.log_warning(
-                        "The following loop variables collide with the "
-                        f"context: {set(items) & set(local_context)}"
+            if not isinstance(context, Context):
+                context = Context(context)
+            # Changes go into the overlay of the child, while the parent context
+            # remains untouched. The changes (not the overlay, which may hold
+            # complete replaced values of the parent) are the context update
+            local_context = context.new_child()
+            start = local_context.mark()
+            if self._runs_parallel():
+                self._run_parallel(local_context)
+            else:
+                for items in self.loop(local_context):
+                    self._check_collisions(items, local_context)
+                    for t in self.todo:
+                        c = t.run(local_context.new_child(items))
+                        if c:
+                            local_context += c
+            return local_context.changes_since(start) or None
+
+    async def arun(self, context):
+        """Asynchronous run(), used by the AsyncScriptEngine. The tasks and jobs
+        of the todo list are run with arun(). The iterations of parallel loops
+        in thread mode run concurrently on the event loop, parallel loops in
+        process mode run in a process pool, as with run()."""
+        if self.when(context):
+            if not isinstance(context, Context):
+                context = Context(context)
+            local_context = context.new_child()
+            start = local_context.mark()
+            if self._runs_parallel():
+                if self._parallel.get("mode", "thread") == "thread":
+                    await self._arun_parallel(local_context)
+                else:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None,
+                        contextvars.copy_context().run,
+                        self._run_parallel,
+                        local_context,
+                    )
+            else:
+                for items in self.loop(local_context):
+                    self._check_collisions(items, local_context)
+                    for t in self.todo:
+                        c = await t.arun(local_context.new_child(items))
+                        if c:
+                            local_context += c
+            return local_context.changes_since(start) or None
+
+    def _runs_parallel(self):
+        """True if the loop iterations run in parallel (see _run_parallel()).
+        Loops with tasks that change the ScriptEngine process (e.g. the working
+        directory or the environment) run sequentially, since the iterations
+        would change the process under each other's feet."""
+        if not (self._parallel and self._loop):
+            return False
+        if self.parent_process_only:
+            self.log_warning(
+                "Parallel loop contains tasks that change the ScriptEngine "
+                "process, running the iterations sequentially"
+            )
+            return False
+        return True
+
+    def _check_collisions(self, items, context):
+        if set(items) & set(context):
+            self.log_warning(
+                "The following loop variables collide with the "
+                f"context: {set(items) & set(context)}"
+            )
+
+    def _run_parallel(self, local_context):
+        """Runs the loop iterations concurrently in a thread or process pool.
+        All iterations start from the same context (updates from other
+        iterations are not visible), the context updates of the iterations
+        are merged in loop order. If an iteration fails, the iterations that
+        have not yet started are cancelled and the (first) error is raised
+        after the running ones have finished."""
+        iterations = list(self.loop(local_context))
+        for items in iterations:
+            self._check_collisions(items, local_context)
+        mode = self._parallel.get("mode", "thread")
+        workers = self.parallel_workers(local_context)
+        self.log_debug(
+            f"Run {len(iterations)} loop iterations in parallel "
+            f"({mode} pool, {workers or 'default'} workers)"
+        )
+        cancelled = threading.Event() if mode == "thread" else None
+        with self._executors[mode](max_workers=workers) as executor:
+            if mode == "thread":
+                # Run every iteration in a copy of the current contextvars
+                # context, so that the ScriptEngine runtime is available
+                futures = [
+                    executor.submit(
+                        contextvars.copy_context().run,
+                        _run_iteration,
+                        self.todo,
+                        local_context,
+                        items,
+                        cancelled,
+                    )
+                    for items in iterations
+                ]
+            else:
+                futures = [
+                    executor.submit(_run_iteration, self.todo, local_context, items)
+                    for items in iterations
+                ]
+            done, _ = concurrent.futures.wait(
+                futures, return_when=concurrent.futures.FIRST_EXCEPTION
+            )
+            if any(f.exception() for f in done):
+                if cancelled is not None:
+                    cancelled.set()
+                for f in futures:
+                    f.cancel()
+        errors = [f.exception() for f in futures if not f.cancelled() and f.exception()]
+        if errors:
+            stops = [e for e in errors if isinstance(e, ScriptEngineStopException)]
+            if len(stops) < len(errors):
+                self.log_error(
+                    f"{len(errors) - len(stops)} of {len(iterations)} parallel loop "
+                    "iteration(s) failed, remaining iterations cancelled"
+                )
+            raise errors[0]
+        for f in futures:
+            c = f.result()
+            if c:
+                local_context += c
+
+    async def _arun_parallel(self, local_context):
+        """Asynchronous version of _run_parallel() (thread mode): the loop
+        iterations run as asyncio tasks, at most *workers* at a time (no limit
+        if workers is not given). If an iteration fails, no further tasks or
+        jobs are started and the (first) error is raised after the running
+        ones have finished."""
+        iterations = list(self.loop(local_context))
+        for items in iterations:
+            self._check_collisions(items, local_context)
+        workers = self.parallel_workers(local_context)
+        self.log_debug(
+            f"Run {len(iterations)} loop iterations concurrently "
+            f"({workers or 'unlimited'} workers)"
+        )
+        cancelled = asyncio.Event()
+        semaphore = asyncio.Semaphore(workers or len(iterations) or 1)
+
+        async def iteration(items):
+            async with semaphore:
+                try:
+                    return await _arun_iteration(
+                        self.todo, local_context, items, cancelled
                     )
-                for t in self.todo:
-                    c = t.run(Context({**local_context, **items}))
-                    if c:
-                        local_context += c
-                        context_update += c
-            return context_update or None
+                except BaseException:
+                    cancelled.set()
+                    raise
+
+        tasks = [asyncio.ensure_future(iteration(items)) for items in iterations]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            stops = [e for e in errors if isinstance(e, ScriptEngineStopException)]
+            if len(stops) < len(errors):
+                self.log_error(
+                    f"{len(errors) - len(stops)} of {len(iterations)} parallel loop "
+                    "iteration(s) failed, remaining iterations cancelled"
+                )
+            raise errors[0]
+        for c in results:
+            if c:
+                local_context += c
 
     def _log(self, level, msg):
-        logging.getLogger("se.job").log(level, msg, extra={"id": self.shortid})
+        _logger.log(level, msg, extra={"id": self.shortid})
 
     def log_debug(self, msg):
         self._log(logging.DEBUG, msg)
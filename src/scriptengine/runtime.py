@@ -0,0 +1,41 @@
+"""ScriptEngine runtime objects
+
+Runtime objects that are not data, most notably the ScriptEngine instance that
+runs the current script, are kept in this registry rather than in the
+context. Thus, the context holds only plain data, which can be copied and
+saved safely. The registry is a context variable, i.e. bindings are local to
+the current thread (or asyncio task):
+
+    from scriptengine import runtime
+
+    with runtime.bind(instance=engine):
+        ...
+        runtime.instance()  # returns engine
+"""
+
+import contextlib
+import contextvars
+
+_objects = contextvars.ContextVar("scriptengine_runtime", default=None)
+
+
+@contextlib.contextmanager
+def bind(**objects):
+    """Context manager that binds runtime objects by name, for the duration of
+    the with block. Bindings can be nested, inner bindings hide outer ones."""
+    token = _objects.set({**(_objects.get() or {}), **objects})
+    try:
+        yield
+    finally:
+        _objects.reset(token)
+
+
+def get(name, default=None):
+    """Returns the runtime object bound to name, or default"""
+    return (_objects.get() or {}).get(name, default)
+
+
+def instance():
+    """Returns the ScriptEngine instance that runs the current script, or None
+    if no instance is bound"""
+    return get("instance")
@@ -8,7 +8,10 @@ from scriptengine.tasks.core import Task, timed_runner
 class Chdir(Task):
     """Chdir task, changes the current working directory"""
 
+    __slots__ = ()
+
     _required_arguments = ("path",)
+    _parent_process_only = True
 
     def __init__(self, arguments):
         Chdir.check_arguments(arguments)
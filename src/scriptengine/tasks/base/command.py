@@ -4,12 +4,29 @@
       - command:
             name: ls
             args: [-l, -a]
+
+   With the cache option, the results of deterministic commands (declared
+   output files and captured stdout/stderr) are stored in a content-addressed
+   store and restored, instead of running the command again, for the same
+   command, args, selected environment variables and input file contents:
+      - command:
+            name: cdo
+            args: [remapcon,r360x180, in.nc, out.nc]
+            inputs: in.nc
+            outputs: out.nc
+            cache:
+                env: [CDO_PCTL_NC4]
 """
 
+import asyncio
+import hashlib
+import locale
 import os
 import subprocess
 import threading
+from collections import namedtuple
 from contextlib import contextmanager
+from glob import glob
 from pathlib import Path
 
 from scriptengine.context import Context
@@ -17,7 +34,22 @@ from scriptengine.exceptions import (
     ScriptEngineTaskArgumentInvalidError,
     ScriptEngineTaskRunError,
 )
-from scriptengine.tasks.core import Task, timed_runner
+from scriptengine.helpers.content_store import (
+    DEFAULT_MAX_SIZE,
+    DEFAULT_PATH,
+    file_digest,
+    open_store,
+)
+from scriptengine.helpers.memory import parse_size
+from scriptengine.tasks.core import Task, incremental_runner, timed_runner
+
+_CHUNK_SIZE = 64 * 1024
+
+_Invocation = namedtuple(
+    "_Invocation", "args cwd env ignore_error stdout_mode stderr_mode"
+)
+
+_Cache = namedtuple("_Cache", "store key outputs")
 
 
 class LogPipe(threading.Thread):
@@ -49,14 +81,17 @@ class LogPipe(threading.Thread):
 class Command(Task):
     """Command task, executes a command in a shell"""
 
+    __slots__ = ()
+
     _required_arguments = ("name",)
 
     def __init__(self, arguments):
         Command.check_arguments(arguments)
         super().__init__(arguments)
 
-    @timed_runner
-    def run(self, context):
+    def _prepare(self, context):
+        """Renders the task arguments and returns the _Invocation of the
+        command"""
         self.log_info(
             f"{self.name} "
             f'args={getattr(self, "args", None)} '
@@ -78,29 +113,6 @@ class Command(Task):
             f"ignore_error={ignore_error} "
         )
 
-        @contextmanager
-        def log_pipe(mode):
-            """Returns something that can be used as stdout/stderr argument for
-            subprocess.run(). If mode is True, a LogPipe is returned, which
-            sends stdout/stderr through the info logger of the tasks. If mode is
-            None/False, then None is returned and stdout/stderr are ignored. If
-            mode is a string, stdout/stderr is captured by subprocess and later
-            stored in the context."""
-            if mode is True:
-                pipe = LogPipe(self.log_info)
-            elif not mode:
-                pipe = None
-            elif isinstance(mode, str):
-                pipe = subprocess.PIPE
-            else:
-                self.log_error(f"Invalid task argument: {mode}")
-                raise ScriptEngineTaskArgumentInvalidError
-            try:
-                yield pipe
-            finally:
-                if isinstance(pipe, LogPipe):
-                    pipe.close()
-
         stdout_mode = self.getarg("stdout", context, default=True)
         self.log_debug(
             "stdout mode: "
@@ -111,6 +123,10 @@ class Command(Task):
             "stderr mode: "
             f'{stderr_mode if stderr_mode in (True, False) else "context"}'
         )
+        for mode in (stdout_mode, stderr_mode):
+            if not (mode in (True, False, None) or isinstance(mode, str)):
+                self.log_error(f"Invalid task argument: {mode}")
+                raise ScriptEngineTaskArgumentInvalidError
 
         # Update $PWD in the environment of the command
         # Once support for Python<=3.8 is dropped, this can be done directly in the
@@ -124,35 +140,227 @@ class Command(Task):
         if cwd:
             cmd_env["PWD"] = Path(cwd).resolve()
 
-        with log_pipe(stdout_mode) as stdout, log_pipe(stderr_mode) as stderr:
-            context_update = Context()
-            try:
-                cmd_proc = subprocess.run(
-                    map(str, (command, *args)),
-                    stdout=stdout,
-                    stderr=stderr,
-                    cwd=cwd,
-                    check=True,
-                    env=cmd_env,
-                    errors="replace",
+        return _Invocation(
+            [str(a) for a in (command, *args)],
+            cwd,
+            cmd_env,
+            ignore_error,
+            stdout_mode,
+            stderr_mode,
+        )
+
+    def _check_returncode(self, returncode, ignore_error):
+        if returncode:
+            if ignore_error:
+                self.log_warning(f"Command returned error code {returncode}")
+            else:
+                self.log_error(f"Command returned error code {returncode}")
+                raise ScriptEngineTaskRunError
+
+    def _context_update(self, invocation, stdout, stderr):
+        context_update = Context()
+        if isinstance(invocation.stdout_mode, str):
+            self.log_debug(f"Store stdout in context under {invocation.stdout_mode}")
+            context_update[invocation.stdout_mode] = stdout.split("\n")
+        if isinstance(invocation.stderr_mode, str):
+            self.log_debug(f"Store stderr in context under {invocation.stderr_mode}")
+            context_update[invocation.stderr_mode] = stderr.split("\n")
+        return context_update or None
+
+    def _cache(self, invocation, context):
+        """Returns the _Cache for the invocation, or None if the cache option
+        is not set (or the inputs can not be read). The cache key is made
+        from the command and args, the working directory, the selected
+        environment variables, the contents of the inputs, the names of the
+        outputs and the stdout/stderr modes. Inputs and outputs are relative
+        to the working directory of the command (cwd)."""
+        cache = self.getarg("cache", context, default=False)
+        if not cache:
+            return None
+        env_names = cache.get("env", []) if isinstance(cache, dict) else []
+        env_names = env_names if isinstance(env_names, list) else [env_names]
+        cwd = Path(invocation.cwd or ".")
+
+        def paths(name):
+            arg = self.getarg(name, context, default=[])
+            return [str(cwd / p) for p in (arg if isinstance(arg, list) else [arg])]
+
+        try:
+            inputs = [
+                (os.path.relpath(path, cwd), file_digest(path))
+                for pattern in paths("inputs")
+                for path in sorted(glob(pattern)) or [pattern]
+            ]
+        except OSError as e:
+            self.log_warning(f"Cannot read cache input, not using cache: {e}")
+            return None
+        outputs = paths("outputs")
+        key = hashlib.sha256(
+            repr(
+                (
+                    invocation.args,
+                    str(cwd.resolve()),
+                    {n: invocation.env.get(n) for n in sorted(env_names)},
+                    inputs,
+                    [os.path.relpath(p, cwd) for p in outputs],
+                    invocation.stdout_mode if invocation.stdout_mode else False,
+                    invocation.stderr_mode if invocation.stderr_mode else False,
+                )
+            ).encode()
+        ).hexdigest()
+        self.log_debug(f"Cache key: {key}")
+
+        max_size = context.get("se.tasks.cache.size", DEFAULT_MAX_SIZE)
+        store = open_store(
+            context.get("se.tasks.cache.path") or DEFAULT_PATH,
+            max_size=parse_size(max_size) if isinstance(max_size, str) else max_size,
+        )
+        return _Cache(store, key, outputs)
+
+    def _incremental_cwd(self, context):
+        # Inputs and outputs in incremental mode are relative to cwd
+        return self.getarg("cwd", context, default=None)
+
+    def _cache_restore(self, cache):
+        """Restores the outputs from the cache and returns the cache entry, or
+        None if there is no (complete) entry"""
+        entry = cache.store.get(cache.key)
+        if entry is None:
+            self.log_debug("Cache miss")
+            return None
+        try:
+            for path, digest in entry["files"].items():
+                cache.store.restore_file(digest, path)
+        except KeyError:
+            self.log_warning("Incomplete cache entry, run command")
+            return None
+        self.log_info(f"Restored {len(entry['files'])} output(s) from cache")
+        return entry
+
+    def _cache_save(self, cache, stdout, stderr):
+        """Stores the outputs and captured stdout/stderr in the cache"""
+        files = {}
+        for pattern in cache.outputs:
+            matches = glob(pattern)
+            if not matches:
+                self.log_warning(f"Output not found, not caching results: {pattern}")
+                return
+            for match in matches:
+                path = Path(match)
+                for f in sorted(path.rglob("*")) if path.is_dir() else [path]:
+                    if f.is_file():
+                        files[str(f)] = cache.store.add_file(f)
+        cache.store.put(cache.key, {"files": files, "stdout": stdout, "stderr": stderr})
+        self.log_debug(f"Stored {len(files)} output(s) in cache")
+
+    @timed_runner
+    @incremental_runner
+    def run(self, context):
+        invocation = self._prepare(context)
+        cache = self._cache(invocation, context)
+        if cache:
+            entry = self._cache_restore(cache)
+            if entry is not None:
+                return self._context_update(
+                    invocation, entry["stdout"], entry["stderr"]
                 )
-            except subprocess.CalledProcessError as e:
-                if ignore_error:
-                    self.log_warning(f"Command returned error code {e.returncode}")
-                    stdout = e.stdout
-                    stderr = e.stderr
-                else:
-                    self.log_error(f"Command returned error code {e.returncode}")
-                    raise ScriptEngineTaskRunError
+
+        @contextmanager
+        def log_pipe(mode):
+            """Returns something that can be used as stdout/stderr argument for
+            subprocess.run(). If mode is True, a LogPipe is returned, which
+            sends stdout/stderr through the info logger of the tasks. If mode is
+            None/False, then None is returned and stdout/stderr are ignored. If
+            mode is a string, stdout/stderr is captured by subprocess and later
+            stored in the context."""
+            if mode is True:
+                pipe = LogPipe(self.log_info)
+            elif not mode:
+                pipe = None
             else:
-                stdout = cmd_proc.stdout
-                stderr = cmd_proc.stderr
+                pipe = subprocess.PIPE
+            try:
+                yield pipe
+            finally:
+                if isinstance(pipe, LogPipe):
+                    pipe.close()
 
-            if isinstance(stdout_mode, str):
-                self.log_debug(f"Store stdout in context under {stdout_mode}")
-                context_update[stdout_mode] = stdout.split("\n")
-            if isinstance(stderr_mode, str):
-                self.log_debug(f"Store stderr in context under {stderr_mode}")
-                context_update[stderr_mode] = stderr.split("\n")
+        with log_pipe(invocation.stdout_mode) as stdout, log_pipe(
+            invocation.stderr_mode
+        ) as stderr:
+            cmd_proc = subprocess.run(
+                invocation.args,
+                stdout=stdout,
+                stderr=stderr,
+                cwd=invocation.cwd,
+                env=invocation.env,
+                errors="replace",
+            )
+            self._check_returncode(cmd_proc.returncode, invocation.ignore_error)
+            if cache and cmd_proc.returncode == 0:
+                self._cache_save(cache, cmd_proc.stdout, cmd_proc.stderr)
+            return self._context_update(invocation, cmd_proc.stdout, cmd_proc.stderr)
 
-        return context_update or None
+    @timed_runner
+    @incremental_runner
+    async def arun(self, context):
+        """Asynchronous run(), using an asyncio subprocess. The output of the
+        command is read on the event loop, no threads are needed."""
+        invocation = self._prepare(context)
+        cache = self._cache(invocation, context)
+        if cache:
+            entry = self._cache_restore(cache)
+            if entry is not None:
+                return self._context_update(
+                    invocation, entry["stdout"], entry["stderr"]
+                )
+
+        def pipe(mode):
+            return asyncio.subprocess.PIPE if mode else None
+
+        cmd_proc = await asyncio.create_subprocess_exec(
+            *invocation.args,
+            stdout=pipe(invocation.stdout_mode),
+            stderr=pipe(invocation.stderr_mode),
+            cwd=invocation.cwd,
+            env=invocation.env,
+        )
+        stdout, stderr = await asyncio.gather(
+            self._read_stream(cmd_proc.stdout, invocation.stdout_mode),
+            self._read_stream(cmd_proc.stderr, invocation.stderr_mode),
+        )
+        returncode = await cmd_proc.wait()
+        self._check_returncode(returncode, invocation.ignore_error)
+        if cache and returncode == 0:
+            self._cache_save(cache, stdout, stderr)
+        return self._context_update(invocation, stdout, stderr)
+
+    async def _read_stream(self, stream, mode):
+        """Reads stream (stdout/stderr of an asyncio subprocess) until EOF. If
+        mode is True, every line is sent to the info logger of the task,
+        otherwise the whole output is returned."""
+        if stream is None:
+            return None
+        if mode is not True:
+            return _text(await stream.read())
+        buffer = b""
+        while True:
+            chunk = await stream.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                self.log_info(_text(line).rstrip("\n"))
+        if buffer:
+            self.log_info(_text(buffer).rstrip("\n"))
+        return None
+
+
+# Same as subprocess.run(..., errors="replace") for the asyncio subprocess,
+# which yields bytes: decode with the locale encoding, universal newlines
+def _text(data):
+    return (
+        data.decode(locale.getpreferredencoding(False), errors="replace")
+        .replace("\r\n", "\n")
+        .replace("\r", "\n")
+    )
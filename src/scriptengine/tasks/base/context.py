@@ -7,6 +7,7 @@ from scriptengine.context import (
 )  # avoid name clashes between se.context.Context and se.tasks.base.Context
 from scriptengine.exceptions import ScriptEngineTaskError, ScriptEngineTaskRunError
 from scriptengine.tasks.core import Task, timed_runner
+from scriptengine.yaml import backend as yaml_backend
 
 
 class Context(Task):
@@ -18,10 +19,12 @@ class Context(Task):
     running instance (a Job or a ScriptEngine instance) is responsible for
     merging the update with an existing context dict."""
 
+    __slots__ = ()
+
     @timed_runner
     def run(self, context):
         context_update = SEContext(
-            {n: self.getarg(n, context) for n in vars(self) if not n.startswith("_")}
+            {n: self.getarg(n, context) for n in self._arguments}
         )
         self.log_info(f"Context update: {context_update}")
         return context_update
@@ -48,6 +51,8 @@ class ContextLoad(Task):
         file: update.yml
     """
 
+    __slots__ = ()
+
     @timed_runner
     def run(self, context):
         dict_arg = self.getarg("dict", context, default=False)
@@ -71,7 +76,7 @@ class ContextLoad(Task):
             self.log_info(f"Load context update from file: {file_arg}")
             try:
                 with open(file_arg) as f:
-                    dict_from_file = yaml.load(f, Loader=yaml.SafeLoader)
+                    dict_from_file = yaml_backend.safe_load(f)
             except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
                 self.log_error(e)
                 raise ScriptEngineTaskRunError
@@ -7,6 +7,8 @@ from scriptengine.tasks.core import Task, timed_runner
 class Echo(Task):
     """Echo task, writes a (coloured) message to stdout"""
 
+    __slots__ = ()
+
     _required_arguments = ("msg",)
 
     def __init__(self, arguments):
@@ -20,11 +20,11 @@ class Getenv(Task):
     will store $HOME in context['home'] and $BAR in context['foo'].
     """
 
+    __slots__ = ()
+
     @timed_runner
     def run(self, context):
-        wanted = {
-            n: self.getarg(n, context) for n in vars(self) if not n.startswith("_")
-        }
+        wanted = {n: self.getarg(n, context) for n in self._arguments}
         self.log_info(
             f"Read environment variables to context: {', '.join(wanted.values())}"
         )
@@ -49,11 +49,13 @@ class Setenv(Task):
     will set $foo to "one" and $bar to "2".
     """
 
+    __slots__ = ()
+
+    _parent_process_only = True
+
     @timed_runner
     def run(self, context):
-        vars_ = {
-            n: str(self.getarg(n, context)) for n in vars(self) if not n.startswith("_")
-        }
+        vars_ = {n: str(self.getarg(n, context)) for n in self._arguments}
         self.log_info(f"Set environment variables ({', '.join(vars_.keys())})")
         os.environ.update(vars_)
 
@@ -70,7 +72,10 @@ class Unsetenv(Task):
     will unset $foo $bar.
     """
 
+    __slots__ = ()
+
     _required_arguments = ("vars",)
+    _parent_process_only = True
 
     @timed_runner
     def run(self, context):
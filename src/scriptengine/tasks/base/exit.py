@@ -7,6 +7,10 @@ from scriptengine.tasks.core import Task
 class Exit(Task):
     """Exit task, run method throws ScriptEngineStopException"""
 
+    __slots__ = ()
+
+    _parent_process_only = True
+
     def run(self, context):
         self.log_info(
             self.getarg("msg", context, default="Requesting ScriptEngine to STOP")
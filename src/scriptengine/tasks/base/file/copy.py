@@ -3,7 +3,7 @@ from glob import glob
 from pathlib import Path
 
 from scriptengine.exceptions import ScriptEngineTaskRunError
-from scriptengine.tasks.core import Task, timed_runner
+from scriptengine.tasks.core import Task, incremental_runner, timed_runner
 
 
 class Copy(Task):
@@ -19,8 +19,13 @@ class Copy(Task):
     <ignore_not_found> is false (default), a ScriptEngineTaskRunError is raised
     if no source files are found. If true, only a warning is written and SE
     continues.
+
+    In incremental mode, the sources are the inputs and the copies in the
+    destination are the outputs, unless 'inputs'/'outputs' are given.
     """
 
+    __slots__ = ()
+
     _required_arguments = (
         "src",
         "dst",
@@ -30,10 +35,22 @@ class Copy(Task):
         Copy.check_arguments(arguments)
         super().__init__(arguments)
 
+    def _incremental_files(self, context):
+        sources = []
+        src_arg = self.getarg("src", context, native=True)
+        for s in src_arg if isinstance(src_arg, list) else [src_arg]:
+            sources.extend(Path(p) for p in glob(str(s)))
+        dst = Path(self.getarg("dst", context))
+        outputs = [
+            dst / s.name if dst.is_dir() and not s.is_dir() else dst for s in sources
+        ]
+        return sources, outputs
+
     @timed_runner
+    @incremental_runner
     def run(self, context):
 
-        src_arg = self.getarg("src", context)
+        src_arg = self.getarg("src", context, native=True)
         dst_arg = self.getarg("dst", context)
         self.log_info(f"Copy: {src_arg} --> {dst_arg}")
 
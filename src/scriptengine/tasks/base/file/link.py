@@ -5,7 +5,7 @@ from scriptengine.exceptions import (
     ScriptEngineTaskArgumentMissingError,
     ScriptEngineTaskRunError,
 )
-from scriptengine.tasks.core import Task, timed_runner
+from scriptengine.tasks.core import Task, incremental_runner, timed_runner
 
 
 class Link(Task):
@@ -22,15 +22,37 @@ class Link(Task):
     symlink named after the target basename is created inside this directory.
     When multiple targets are specified (list or glob pattern) the links are
     created inside the <link> directory for each target.
+
+    In incremental mode, the links are the outputs (unless 'outputs' is
+    given). Since the targets are part of the arguments, a link is up to date
+    if it exists and the arguments did not change.
     """
 
+    __slots__ = ()
+
     #   _required_arguments = ("target",)
 
     def __init__(self, arguments):
         Link.check_arguments(arguments)
         super().__init__(arguments)
 
+    def _incremental_files(self, context):
+        target_arg = self.getarg("src", context, default=False) or self.getarg(
+            "target", context, default=False
+        )
+        link = Path(
+            self.getarg("dst", context, default=False)
+            or self.getarg("link", context, default=".")
+        )
+        targets = []
+        for t in target_arg if isinstance(target_arg, list) else [target_arg]:
+            targets.extend(Path(p) for p in glob(str(t)))
+        if link.is_dir() and not link.is_symlink():
+            return [], [link / t.name for t in targets]
+        return [], [link]
+
     @timed_runner
+    @incremental_runner
     def run(self, context):
 
         target_arg = self.getarg("src", context, default=False)
@@ -15,6 +15,8 @@ class MakeDir(Task):
     file with the same name exists, a ScriptEngineTaskRunError is raised.
     """
 
+    __slots__ = ()
+
     _required_arguments = ("path",)
 
     def __init__(self, arguments):
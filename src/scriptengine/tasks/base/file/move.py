@@ -21,6 +21,8 @@ class Move(Task):
     continues.
     """
 
+    __slots__ = ()
+
     _required_arguments = (
         "src",
         "dst",
@@ -33,7 +35,7 @@ class Move(Task):
     @timed_runner
     def run(self, context):
 
-        src_arg = self.getarg("src", context)
+        src_arg = self.getarg("src", context, native=True)
         dst_arg = self.getarg("dst", context)
         self.log_info(f"Move: {src_arg} --> {dst_arg}")
 
@@ -20,6 +20,8 @@ class Remove(Task):
     is written and SE continues.
     """
 
+    __slots__ = ()
+
     _required_arguments = ("path",)
 
     def __init__(self, arguments):
@@ -29,7 +31,7 @@ class Remove(Task):
     @timed_runner
     def run(self, context):
 
-        path_arg = self.getarg("path", context)
+        path_arg = self.getarg("path", context, native=True)
         self.log_info(f"Remove '{path_arg}'")
 
         path_list = []
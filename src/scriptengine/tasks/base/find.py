@@ -11,6 +11,8 @@ from scriptengine.tasks.core import Task, timed_runner
 class Find(Task):
     """Find task, finds files or directories by name patterns"""
 
+    __slots__ = ()
+
     _required_arguments = ("path",)
 
     def __init__(self, arguments):
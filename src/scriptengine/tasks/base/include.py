@@ -4,9 +4,9 @@
    ScriptEngine script and lets the active ScriptEngine instance execute it.
 """
 
-import copy
 from pathlib import Path
 
+from scriptengine import runtime
 from scriptengine.context import Context
 from scriptengine.exceptions import ScriptEngineTaskRunError
 from scriptengine.tasks.core import Task, timed_runner
@@ -31,7 +31,10 @@ def _file_in_paths(file, paths=None):
 
 class Include(Task):
 
+    __slots__ = ()
+
     _required_arguments = ("src",)
+    _parent_process_only = True
 
     def __init__(self, arguments):
         Include.check_arguments(arguments)
@@ -68,8 +71,16 @@ class Include(Task):
         script = parse_file(inc_file)
 
         self.log_debug(f"Execute include script: {inc_file}")
-        local_context = Context(copy.deepcopy(context))
-        context_update = local_context["se"]["instance"].run(script, local_context)
+        local_context = (
+            context.new_child() if isinstance(context, Context) else Context(context)
+        )
+        # The ScriptEngine instance running this task, for compatibility also
+        # from the context (se.instance), if not available from the runtime
+        instance = runtime.instance() or local_context.get("se.instance")
+        if instance is None:
+            self.log_error("No ScriptEngine instance to run the include script")
+            raise ScriptEngineTaskRunError
+        context_update = instance.run(script, local_context)
         self.log_debug(f"Finished executing include script: {inc_file}")
 
         return context_update or None
@@ -26,6 +26,8 @@ class TaskTimer(Task):
                          'debug': Logging to the debug logger.
     """
 
+    __slots__ = ()
+
     _required_arguments = ("mode",)
 
     def __init__(self, arguments):
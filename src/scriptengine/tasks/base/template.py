@@ -10,6 +10,7 @@ from scriptengine.exceptions import ScriptEngineTaskRunError
 from scriptengine.jinja import filters as j2filters
 from scriptengine.jinja import render as j2render
 from scriptengine.tasks.core import Task, timed_runner
+from scriptengine.tasks.core.incremental import incremental_mode
 
 
 class Template(Task):
@@ -23,8 +24,14 @@ class Template(Task):
         dictionary (dict): Must at least contain the following keys:
             - src: Source file name (a Jinja2 template)
             - dst: Destination file name
+
+    In incremental mode, the destination file is not written if it has the
+    same content already. Thus, its modification time changes only if the
+    output changes, and tasks that use the file as input stay up to date.
     """
 
+    __slots__ = ()
+
     _required_arguments = (
         "src",
         "dst",
@@ -62,8 +69,15 @@ class Template(Task):
             self.log_error(f"Jinja2 error {type(e).__name__}: {e}")
             raise ScriptEngineTaskRunError
 
-        with dst.open(mode="w") as f:
-            f.write(output + "\n")
+        if (
+            incremental_mode(self, context)
+            and dst.is_file()
+            and dst.read_text() == output + "\n"
+        ):
+            self.log_info(f"Destination is up to date: {dst}")
+        else:
+            with dst.open(mode="w") as f:
+                f.write(output + "\n")
 
         if self.getarg("executable", context, default=False):
             umask = os.umask(0)
@@ -11,6 +11,8 @@ from scriptengine.tasks.core import Task, timed_runner
 class Time(Task):
     """Task class for measuring time in ScriptEngine"""
 
+    __slots__ = ()
+
     _required_arguments = ("set",)
 
     def __init__(self, arguments):
@@ -8,7 +8,9 @@ the execution context (e.g. parallel execution).
 This module provides
   - the Task base class
   - a timing wrapper for Task.run() functions
+  - an incremental (up-to-date check) wrapper for Task.run() functions
 """
 
+from .incremental import incremental_runner as incremental_runner
 from .task import Task as Task
 from .timing import timed_runner as timed_runner
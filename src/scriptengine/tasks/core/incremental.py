@@ -0,0 +1,224 @@
+"""ScriptEngine incremental tasks: skips Task.run() if the outputs are up to date
+
+In incremental mode, a task is skipped (like a make rule) if
+
+    - all its outputs exist,
+    - no input is newer than the oldest output, and
+    - its rendered arguments are the same as in the last run of the task.
+
+The inputs and outputs are given by the task arguments 'inputs' and 'outputs'
+(file names or glob patterns, or lists thereof) or, if not given, inferred by
+the task (e.g. from 'src' and 'dst'). Tasks without outputs are always run.
+
+The hashes of the rendered arguments and the context updates of the tasks
+are kept in a small (SQLite) state database. A skipped task returns the
+context update from its last run.
+
+Incremental mode is enabled for all tasks by the context parameter
+'se.tasks.incremental.mode' (e.g. 'se --incremental'), or for single tasks by
+the task argument 'incremental' (which can also be used to disable the mode
+for a task). The state database is given by 'se.tasks.incremental.state'.
+"""
+
+import contextlib
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+from glob import glob
+from pathlib import Path
+
+STATE_FILE = ".se-state.db"
+
+# Task arguments that control the incremental mode itself, not part of the
+# argument hash
+_CONTROL_ARGUMENTS = ("incremental", "inputs", "outputs")
+
+
+def incremental_mode(task, context):
+    """Returns True if incremental mode is enabled for task"""
+    default = context.get("se.tasks.incremental.mode") or False
+    return bool(task.getarg("incremental", context, default=default))
+
+
+def incremental_runner(func):
+    """Wrapper for run() functions of SE tasks that support incremental mode.
+    To be used as decorator as follows:
+
+    from scriptengine.tasks.core import incremental_runner
+    class Foo(Task):
+        # ...
+        @timed_runner
+        @incremental_runner
+        def run(self, context):
+            # ...
+
+    Tasks can infer inputs and outputs, if not given as arguments, by
+    providing a method _incremental_files(context), which returns a tuple
+    (inputs, outputs) of lists of paths. Tasks that run in another working
+    directory (such as base.command) provide a method
+    _incremental_cwd(context), which returns the directory that the inputs
+    and outputs arguments are relative to. Coroutine functions (arun()) can
+    be decorated in the same way.
+    """
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrap_incremental_async(self, context):
+            if not incremental_mode(self, context):
+                return await func(self, context)
+            record, skip, stored_update = _check(self, context)
+            if skip:
+                return stored_update
+            context_update = await func(self, context)
+            if record:
+                record(context_update)
+            return context_update
+
+        return wrap_incremental_async
+
+    @functools.wraps(func)
+    def wrap_incremental(self, context):
+        if not incremental_mode(self, context):
+            return func(self, context)
+        record, skip, stored_update = _check(self, context)
+        if skip:
+            return stored_update
+        context_update = func(self, context)
+        if record:
+            record(context_update)
+        return context_update
+
+    return wrap_incremental
+
+
+def _check(task, context):
+    """Checks if task is up to date. Returns a tuple (record, skip, update),
+    where record is a function that records the context update of a new run
+    of the task in the state database (or None if the task has no outputs),
+    skip is True if the task is up to date, and update is the context update
+    of the last run."""
+    inputs, outputs = _files(task, context)
+    if not outputs:
+        task.log_debug("No outputs given or inferred, run task")
+        return None, False, None
+
+    key = _hash((task.reg_name, sorted(str(p.absolute()) for p in outputs)))
+    signature = _hash(
+        {
+            name: task.getarg(name, context)
+            for name in task._arguments
+            if name not in _CONTROL_ARGUMENTS
+        }
+    )
+    state = _State(context.get("se.tasks.incremental.state") or STATE_FILE)
+
+    def record(context_update):
+        state.set(key, signature, context_update)
+
+    stored = state.get(key)
+    if stored is not None and stored[0] == signature:
+        if _up_to_date(inputs, outputs):
+            task.log_info("Outputs are up to date, skip task")
+            return record, True, stored[1]
+        task.log_debug("Outputs are out of date, run task")
+    else:
+        task.log_debug("Arguments changed or no previous run, run task")
+    return record, False, None
+
+
+def _hash(obj):
+    return hashlib.sha256(repr(obj).encode()).hexdigest()
+
+
+def _paths(task, name, context, cwd):
+    # Expands the file names/glob patterns of argument name (relative to cwd),
+    # or returns None
+    arg = task.getarg(name, context, default=None)
+    if arg is None:
+        return None
+    paths = []
+    for pattern in arg if isinstance(arg, list) else [arg]:
+        pattern = os.path.join(str(cwd), str(pattern))
+        paths.extend(glob(pattern) or [pattern])
+    return [Path(p) for p in paths]
+
+
+def _files(task, context):
+    cwd = ""
+    if hasattr(task, "_incremental_cwd"):
+        cwd = task._incremental_cwd(context) or ""
+    inputs = _paths(task, "inputs", context, cwd)
+    outputs = _paths(task, "outputs", context, cwd)
+    if (inputs is None or outputs is None) and hasattr(task, "_incremental_files"):
+        inferred_inputs, inferred_outputs = task._incremental_files(context)
+        inputs = inferred_inputs if inputs is None else inputs
+        outputs = inferred_outputs if outputs is None else outputs
+    return inputs or [], outputs or []
+
+
+def _mtimes(path, follow_symlinks=True):
+    """Yields the modification times of path and, for directories, of all
+    files below. Raises FileNotFoundError if path does not exist."""
+    stat = os.stat(path, follow_symlinks=follow_symlinks)
+    yield stat.st_mtime_ns
+    if os.path.isdir(path) and (follow_symlinks or not os.path.islink(path)):
+        for root, _, files in os.walk(path):
+            for f in files:
+                yield os.stat(os.path.join(root, f), follow_symlinks=False).st_mtime_ns
+
+
+def _up_to_date(inputs, outputs):
+    """Returns True if all outputs exist and no input is newer than the oldest
+    output"""
+    try:
+        oldest = min(m for p in outputs for m in _mtimes(p, follow_symlinks=False))
+        newest = max((m for p in inputs for m in _mtimes(p)), default=None)
+    except FileNotFoundError:
+        return False
+    return newest is None or newest <= oldest
+
+
+class _State:
+    """The state database of incremental tasks: argument hash and context
+    update of the last run, by task key"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # A connection per access, tasks may run in different threads or
+        # processes (see DAGScriptEngine)
+        with contextlib.closing(sqlite3.connect(self.path, timeout=60)) as conn:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS tasks "
+                    "(key TEXT PRIMARY KEY, signature TEXT, context_update BLOB)"
+                )
+                yield conn
+
+    def get(self, key):
+        """Returns (signature, context update) for key, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT signature, context_update FROM tasks WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        signature, context_update = row
+        return signature, pickle.loads(context_update) if context_update else None
+
+    def set(self, key, signature, context_update):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?)",
+                (
+                    key,
+                    signature,
+                    pickle.dumps(context_update) if context_update else None,
+                ),
+            )
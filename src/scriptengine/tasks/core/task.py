@@ -3,13 +3,20 @@
 Provides the base class for all tasks.
 """
 
+import asyncio
+import contextvars
+import functools
+import hashlib
+import inspect
 import logging
+import types
 import uuid
 
 import yaml
 
 import scriptengine.jinja
-import scriptengine.yaml
+import scriptengine.yaml.backend
+from scriptengine import identifiers
 from scriptengine.exceptions import (
     ScriptEngineParseJinjaError,
     ScriptEngineTaskArgumentInvalidError,
@@ -18,10 +25,66 @@ from scriptengine.exceptions import (
 from scriptengine.yaml.noparse_strings import NoParseJinjaString, NoParseYamlString
 
 _SENTINEL = object()
+_logger = logging.getLogger("se.task")
+_NO_TEMPLATES = types.MappingProxyType({})
+
+
+def _dropping_argcache(func):
+    """Wraps run()/arun() of Task subclasses, so that the cached arguments (see
+    Task.getarg()) are dropped when the run is finished"""
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrap_async(self, context):
+            try:
+                return await func(self, context)
+            finally:
+                self._argcache = None
+
+        return wrap_async
+
+    @functools.wraps(func)
+    def wrap(self, context):
+        try:
+            return func(self, context)
+        finally:
+            self._argcache = None
+
+    return wrap
 
 
 class Task:
+    """Base class for all ScriptEngine tasks.
+
+    Task arguments are kept in a single dict (the one passed to the
+    constructor, it is not copied) and are accessible as attributes, but they
+    are not instance attributes: vars(task) does not list them. Subclasses
+    (e.g. in task plugins) should define __slots__ = (), otherwise each
+    instance gets an (unused) __dict__:
+
+        class MyTask(Task):
+            __slots__ = ()
+
+            @timed_runner
+            def run(self, context):
+                ...
+
+    Subclasses that need extra instance attributes add them to __slots__.
+    """
+
+    # Compact instances for large (e.g. generated) scripts: the task arguments
+    # are kept in a single dict, not as instance attributes, and the id is
+    # kept as int (see Task.id)
+    __slots__ = (
+        "_arguments",
+        "_identifier",
+        "_argcache",
+        "_templates",  # Pre-compiled Jinja2 templates, see Task.precompile()
+        "__weakref__",
+    )
     _reg_name = None
+    _parent_process_only = False  # See Task.parent_process_only
     _invalid_arguments = (
         "run",
         "id",
@@ -36,7 +99,7 @@ class Task:
         """
         for name in arguments:
             if name in getattr(cls, "_invalid_arguments", ()):
-                logging.getLogger("se.task").error(
+                _logger.error(
                     (
                         f'Invalid argument "{name}" found while '
                         f'trying to create "{cls.__name__}" task'
@@ -47,7 +110,7 @@ class Task:
 
         for name in getattr(cls, "_required_arguments", ()):
             if name not in arguments:
-                logging.getLogger("se.task").error(
+                _logger.error(
                     (
                         f'Missing required argument "{name}" while '
                         f'trying to create "{cls.__name__}" task'
@@ -57,16 +120,75 @@ class Task:
                 raise ScriptEngineTaskArgumentMissingError
 
     def __init__(self, arguments=None):
-        self._identifier = uuid.uuid4()
+        self._argcache = None  # (generation, values), see Task.getarg()
+        self._templates = _NO_TEMPLATES
 
-        if arguments is not None:
+        if arguments is None:
+            arguments = {}
+        else:
             Task.check_arguments(arguments)
-            for name, value in arguments.items():
-                if hasattr(self, name):
-                    self.log_error(f"Invalid (reserved name) task argument: {name}")
+            for name in arguments:
+                if hasattr(type(self), name):
+                    _logger.error(
+                        f"Invalid (reserved name) task argument: {name}",
+                        extra={"id": "no id", "type": self.reg_name},
+                    )
                     raise ScriptEngineTaskArgumentInvalidError
-                setattr(self, name, value)
-        self.log_debug(f"Created task: {self}")
+        # The task keeps (and owns) the arguments dict of the caller, it is not
+        # copied. Other mappings are converted, arguments may be set later.
+        self._arguments = arguments if isinstance(arguments, dict) else dict(arguments)
+        # The id depends on the arguments, see scriptengine.identifiers
+        self._identifier = identifiers.new_id(self)
+        if _logger.isEnabledFor(logging.DEBUG):
+            self.log_debug(f"Created task: {self}")
+
+    def __getattr__(self, name):
+        # Only called if normal attribute lookup fails: task arguments are
+        # accessible as attributes
+        if name == "_arguments":  # not yet set, e.g. while unpickling
+            raise AttributeError(name)
+        try:
+            return self._arguments[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+    def __setattr__(self, name, value):
+        # Public names that are not defined by the class are task arguments
+        if name.startswith("_") or hasattr(type(self), name):
+            object.__setattr__(self, name, value)
+        else:
+            self._arguments[name] = value
+            self._argcache = None
+
+    def __delattr__(self, name):
+        if name in self._arguments:
+            del self._arguments[name]
+            self._argcache = None
+        else:
+            object.__delattr__(self, name)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Cached arguments are only useful during a run (the next run gets a
+        # new context), drop them afterwards, see Task.getarg()
+        for name in ("run", "arun"):
+            if name in cls.__dict__:
+                setattr(cls, name, _dropping_argcache(cls.__dict__[name]))
+
+    def __getstate__(self):
+        # Pre-compiled templates can not be pickled (for process pools) and
+        # cached arguments are not needed in a copy. Attributes of subclasses
+        # without __slots__ are kept.
+        return self._arguments, self._identifier, getattr(self, "__dict__", None)
+
+    def __setstate__(self, state):
+        self._arguments, self._identifier, attributes = state
+        self._argcache = None
+        self._templates = _NO_TEMPLATES
+        if attributes:
+            self.__dict__.update(attributes)
 
     @classmethod
     def register_name(cls, name):
@@ -80,26 +202,88 @@ class Task:
 
     @property
     def id(self):
-        return self._identifier
+        return uuid.UUID(int=self._identifier)
 
     @property
     def shortid(self):
-        return self._identifier.hex[:10]
+        return f"{self._identifier:032x}"[:10]
+
+    def fingerprint(self):
+        """Returns a hash (hex string) of the task type and its arguments. Unlike
+        the id, the fingerprint is the same for equal tasks, no matter where
+        they are created (see scriptengine.identifiers)."""
+        return hashlib.sha256(f"{self.reg_name}:{self!r}".encode()).hexdigest()
+
+    @property
+    def parent_process_only(self):
+        """True if the task must run in the ScriptEngine process itself, not in
+        a worker process (e.g. because it changes the working directory or the
+        environment of the process)"""
+        return self._parent_process_only
 
     def __repr__(self):
-        params = {
-            key: val
-            for key, val in self.__dict__.items()
-            if not (isinstance(key, str) and key.startswith("_"))
-        }
-        params_list = f'{", ".join([f"{k}={params[k]}" for k in params])}'
+        params_list = ", ".join(f"{k}={v}" for k, v in self._arguments.items())
         return f"{self.__class__.__name__}({params_list})"
 
     def run(self, context):
         raise NotImplementedError("Base class function Task.run() must not be called")
 
+    async def arun(self, context):
+        """Asynchronous run(), used by the AsyncScriptEngine. The default runs
+        the blocking run() in the default executor of the event loop. Tasks
+        that wait for external resources (such as processes) can override
+        arun() with a native coroutine."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, contextvars.copy_context().run, self.run, context
+        )
+
+    def precompile(self):
+        """Pre-compiles the Jinja2 templates in all task arguments (including
+        list items and dict values). The compiled templates are attached to
+        the task and used by getarg(), so that only rendering is left for run
+        time. Literal arguments and !noparse/!noparse_jinja strings are
+        skipped. Raises ScriptEngineParseJinjaError if an argument is not a
+        valid Jinja2 template.
+        """
+        templates = {}
+        literals = 0
+
+        def compile_(arg_):
+            nonlocal literals
+            if isinstance(arg_, list):
+                for item in arg_:
+                    compile_(item)
+            elif isinstance(arg_, dict):
+                for val in arg_.values():
+                    compile_(val)
+            elif isinstance(arg_, str) and not isinstance(arg_, NoParseJinjaString):
+                try:
+                    compiled = scriptengine.jinja.precompile(arg_)
+                except ScriptEngineParseJinjaError as e:
+                    self.log_error(e)
+                    raise
+                if compiled is None:
+                    literals += 1
+                else:
+                    templates[arg_] = compiled
+
+        for value in self._arguments.values():
+            compile_(value)
+        self._templates = templates
+        self.log_debug(
+            f"Pre-compiled {len(templates)} template(s), "
+            f"{literals} literal argument(s)"
+        )
+
     def getarg(
-        self, name, context={}, *, parse_jinja=True, parse_yaml=True, default=_SENTINEL
+        self,
+        name,
+        context={},
+        *,
+        parse_jinja=True,
+        parse_yaml=True,
+        native=False,
+        default=_SENTINEL,
     ):
         """Returns the value of argument 'name'.
         The argument value is parsed with Jinja2 and the given context,
@@ -109,8 +293,19 @@ class Task:
         Parsing with Jinja/YAML is also skipped, if the argument value is a
         string that starts with '_noparse_', '_noparsejinja_',
         '_noparseyaml_', respectively.
+        If 'native' is True, Jinja2 renders to native Python types (see
+        scriptengine.jinja.render()), i.e. if the argument is a single
+        expression, such as '{{ files }}', the value from the context is
+        returned as it is, without the round trip through a string and the
+        YAML parser.
         If argument 'name' does not exist, the function raises an
         AttributeError, unless a 'default' value is given.
+        If the context is a scriptengine.context.Context, the parsed value is
+        cached and returned again as long as the context generation does not
+        change (i.e. the context is not modified). Only values for the latest
+        generation are kept, and they are dropped at the end of run()/arun()
+        and when an argument is changed. Cached values are not copied: like
+        data from the context, they must not be modified in place.
         """
 
         def parse(arg_):
@@ -125,16 +320,24 @@ class Task:
             if isinstance(arg_, str):
                 if parse_jinja and not isinstance(arg_, NoParseJinjaString):
                     try:
-                        # Make sure that a NoParseString is still a NoParseString
-                        # after this!
-                        arg_ = type(arg_)(scriptengine.jinja.render(arg_, context))
+                        rendered = scriptengine.jinja.render(
+                            arg_,
+                            context,
+                            native=native,
+                            template=None if native else self._templates.get(arg_),
+                        )
                     except ScriptEngineParseJinjaError as e:
                         self.log_error(e)
                         raise ScriptEngineTaskArgumentInvalidError
+                    if not isinstance(rendered, str):  # native value
+                        return rendered
+                    # Make sure that a NoParseString is still a NoParseString
+                    # after this!
+                    arg_ = type(arg_)(rendered)
 
                 if parse_yaml and not isinstance(arg_, NoParseYamlString):
                     try:
-                        return yaml.full_load(arg_)
+                        return scriptengine.yaml.backend.load(arg_)
                     except (
                         yaml.scanner.ScannerError,
                         yaml.parser.ParserError,
@@ -149,17 +352,29 @@ class Task:
             return arg_
 
         try:
-            arg = getattr(self, name)
-        except AttributeError:
+            arg = self._arguments[name]
+        except KeyError:
             if default is _SENTINEL:
                 self.log_error(f"Trying to access missing task argument: {name}")
                 raise ScriptEngineTaskArgumentMissingError
-            arg = default
-        return parse(arg)
+            return parse(default)
+
+        generation = getattr(context, "generation", None)
+        if generation is None:
+            return parse(arg)
+
+        cache = self._argcache
+        if cache is None or cache[0] != generation:
+            cache = self._argcache = (generation, {})
+        key = (name, parse_jinja, parse_yaml, native)
+        try:
+            value = cache[1][key]
+        except KeyError:
+            value = cache[1][key] = parse(arg)
+        return value
 
     def _log(self, level, msg):
-        logger = logging.getLogger("se.task")
-        logger.log(level, msg, extra={"type": self.reg_name, "id": self.shortid})
+        _logger.log(level, msg, extra={"type": self.reg_name, "id": self.shortid})
 
     def log_debug(self, msg):
         self._log(logging.DEBUG, msg)
@@ -3,6 +3,7 @@
 
 import copy
 import functools
+import inspect
 import time
 
 from scriptengine.context import Context
@@ -17,8 +18,28 @@ def timed_runner(func):
         @timed_runner
         def run(self, context):
             # ...
+
+    Coroutine functions (such as the arun() method of asynchronous tasks) can
+    be decorated in the same way.
     """
 
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def wrap_timed_async(self, context):
+
+            mode = context.get("se.tasks.timing.mode")
+
+            if mode in ("basic", "classes", "instances"):
+                start_tic = time.perf_counter()
+                context_update = await func(self, context) or Context()
+                elapsed_time = time.perf_counter() - start_tic
+                return _timed_update(self, context, mode, context_update, elapsed_time)
+
+            return await func(self, context)
+
+        return wrap_timed_async
+
     @functools.wraps(func)
     def wrap_timed(self, context):
 
@@ -31,33 +52,41 @@ def timed_runner(func):
             context_update = func(self, context) or Context()
             elapsed_time = time.perf_counter() - start_tic
 
-            # logging
-            if context["se.tasks.timing.logging"] == "info":
-                self.log_info(f"Elapsed time: {elapsed_time:0.4f} seconds")
-            elif context["se.tasks.timing.logging"] == "debug":
-                self.log_debug(f"Elapsed time: {elapsed_time:0.4f} seconds")
+            return _timed_update(self, context, mode, context_update, elapsed_time)
+
+        # if no timing, just return the function
+        return func(self, context)
 
-            # update timers
-            if mode in ("classes", "instances"):
-                timers = copy.deepcopy(context["se.tasks.timing.timers"])
+    return wrap_timed
 
-                class_t = timers.setdefault("classes", {})
-                class_t.setdefault(self.__class__.__name__, 0)
-                class_t[self.__class__.__name__] += elapsed_time
 
-                if mode == "instances":
-                    instance_t = timers.setdefault("instances", {})
-                    instance_t.setdefault(self.id, 0)
-                    instance_t[self.id] += elapsed_time
+def _timed_update(task, context, mode, context_update, elapsed_time):
+    """Logs the elapsed time of task and adds it to the timers in
+    context_update, according to the timing mode"""
 
-                timer_update = Context()
-                timer_update["se.tasks.timing.timers"] = timers
+    # logging
+    log_level = context["se.tasks.timing.logging"]
+    if log_level == "info":
+        task.log_info(f"Elapsed time: {elapsed_time:0.4f} seconds")
+    elif log_level == "debug":
+        task.log_debug(f"Elapsed time: {elapsed_time:0.4f} seconds")
 
-                context_update += timer_update
+    # update timers
+    if mode in ("classes", "instances"):
+        timers = copy.deepcopy(context["se.tasks.timing.timers"])
 
-            return context_update
+        class_t = timers.setdefault("classes", {})
+        class_t.setdefault(task.__class__.__name__, 0)
+        class_t[task.__class__.__name__] += elapsed_time
 
-        # if no timing, just return the function
-        return func(self, context)
+        if mode == "instances":
+            instance_t = timers.setdefault("instances", {})
+            instance_t.setdefault(task.id, 0)
+            instance_t[task.id] += elapsed_time
 
-    return wrap_timed
+        timer_update = Context()
+        timer_update["se.tasks.timing.timers"] = timers
+
+        context_update += timer_update
+
+    return context_update
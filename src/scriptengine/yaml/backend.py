@@ -0,0 +1,103 @@
+"""ScriptEngine YAML backend
+
+Provides the YAML loaders and dumpers used throughout ScriptEngine. The fast
+LibYAML based (C) implementations are used if PyYAML has been built with
+LibYAML, otherwise the pure Python implementations. The ScriptEngine specific
+YAML tags (!noparse, !noparse_yaml, !noparse_jinja, !rrule) are known to the
+FullLoader, no matter which implementation is used.
+"""
+
+import dateutil.rrule
+import yaml
+
+from scriptengine.yaml.noparse_strings import (
+    NoParseJinjaString,
+    NoParseString,
+    NoParseYamlString,
+)
+
+try:
+    from yaml import CDumper as _Dumper
+    from yaml import CFullLoader as _FullLoader
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import Dumper as _Dumper
+    from yaml import FullLoader as _FullLoader
+    from yaml import SafeLoader as _SafeLoader
+
+    LIBYAML = False
+else:
+    LIBYAML = True
+
+
+class FullLoader(_FullLoader):
+    """Loader for ScriptEngine scripts and task arguments"""
+
+
+class SafeLoader(_SafeLoader):
+    """Loader for data files, such as saved contexts"""
+
+
+class Dumper(_Dumper):
+    """Dumper for contexts"""
+
+
+def add_constructor(tag, constructor):
+    """Adds a constructor for tag to the FullLoader of this module, as well as
+    to the default PyYAML loaders (for yaml.load() and yaml.full_load())."""
+    FullLoader.add_constructor(tag, constructor)
+    yaml.add_constructor(tag, constructor)
+
+
+def string_class_constructor(derived_string_class):
+    """YAML constructor factory. The constructors convert their values to a
+    string and return an object of a specific class (derived from str). The
+    class membership is later used to limit the Jinja2/YAML parsing during
+    the processing of ScriptEngine scripts.
+    """
+
+    def constructor(loader, node):
+        value = loader.construct_scalar(node)
+        return derived_string_class(str(value))
+
+    return constructor
+
+
+def rrule_constructor(loader, node):
+    """A YAML constructor that can parse RFC5545 rrules"""
+    value = loader.construct_scalar(node)
+    rrule = dateutil.rrule.rrulestr(value)
+    return rrule
+
+
+add_constructor("!noparse", string_class_constructor(NoParseString))
+add_constructor("!noparse_yaml", string_class_constructor(NoParseYamlString))
+add_constructor("!noparse_jinja", string_class_constructor(NoParseJinjaString))
+add_constructor("!rrule", rrule_constructor)
+
+
+def _plain(stream):
+    # LibYAML accepts only exact str objects, not derived classes
+    return str(stream) if isinstance(stream, str) else stream
+
+
+def load(stream):
+    """Parses a YAML document (string or stream) with the FullLoader"""
+    return yaml.load(_plain(stream), Loader=FullLoader)
+
+
+def safe_load(stream):
+    """Parses a YAML document (string or stream) with the SafeLoader"""
+    return yaml.load(_plain(stream), Loader=SafeLoader)
+
+
+def safe_load_all(stream):
+    """Parses all YAML documents in stream with the SafeLoader, returns a
+    generator"""
+    return yaml.load_all(_plain(stream), Loader=SafeLoader)
+
+
+def dump(data, stream=None, **kwargs):
+    """Serialises data as YAML (into stream, or returns a string if stream is
+    None). Keyword arguments are passed on to yaml.dump()."""
+    return yaml.dump(data, stream, Dumper=Dumper, **kwargs)
@@ -1,11 +1,12 @@
-"""ScriptEngine YAML parsing
-"""
+"""ScriptEngine YAML parsing"""
 
+import contextlib
 import logging
+from pathlib import Path
 
-import dateutil.rrule
 import yaml
 
+from scriptengine import identifiers
 from scriptengine.exceptions import (
     ScriptEngineParseFileError,
     ScriptEngineParseScriptError,
@@ -13,45 +14,22 @@ from scriptengine.exceptions import (
 )
 from scriptengine.jobs import Job
 from scriptengine.tasks.core.loader import load_and_register
-from scriptengine.yaml.noparse_strings import (
-    NoParseJinjaString,
-    NoParseString,
-    NoParseYamlString,
-)
-
-
-def string_class_constructor(derived_string_class):
-    """YAML constructor factory. The constructors convert their values to a
-    string and return an object of a specific class (derived from str). The
-    class membership is later used to limit the Jinja2/YAML parsing during
-    the processing of ScriptEngine scripts.
-    """
-
-    def constructor(loader, node):
-        value = loader.construct_scalar(node)
-        return derived_string_class(str(value))
-
-    return constructor
-
-
-yaml.add_constructor("!noparse", string_class_constructor(NoParseString))
-yaml.add_constructor("!noparse_yaml", string_class_constructor(NoParseYamlString))
-yaml.add_constructor("!noparse_jinja", string_class_constructor(NoParseJinjaString))
-
-
-def rrule_constructor(loader, node):
-    """A YAML constructor that can parse RFC5545 rrules"""
-    value = loader.construct_scalar(node)
-    rrule = dateutil.rrule.rrulestr(value)
-    return rrule
+from scriptengine.yaml import backend
 
 
-yaml.add_constructor("!rrule", rrule_constructor)
+def parse(data, origin=None):
+    """Recursively parses data and returns a ScriptEngine Task or Job, or a list of those.
+    The data is supposed to come from YAML-parsing a ScriptEngine script.
 
+    If origin (e.g. the script file name) is given, the tasks and jobs get
+    stable ids, derived from origin, their position in data, and their
+    arguments (see scriptengine.identifiers).
+    """
 
-def parse(data):
-    """Recursively parses data and returns a ScriptEngine Task or Job, or a list of those.
-    The data is supposed to come from YAML-parsing a ScriptEngine script."""
+    def at_origin():
+        if origin is None:
+            return contextlib.nullcontext()
+        return identifiers.origin(origin)
 
     def build_job(todo, spec):
         sentinel = object()
@@ -59,7 +37,7 @@ def parse(data):
         when_clause = spec.get("when")
         loop_descriptor = spec.get("loop", sentinel)
 
-        loop_opts = {}
+        job_opts = {}
         if loop_descriptor is not sentinel:
             if not loop_descriptor:
                 log.error(
@@ -67,25 +45,57 @@ def parse(data):
                 )
                 raise ScriptEngineParseYAMLError
             if isinstance(loop_descriptor, list) or isinstance(loop_descriptor, str):
-                loop_opts = {
+                job_opts = {
                     "loop": loop_descriptor,
                     "loop_vars": None,
                 }
             elif isinstance(loop_descriptor, dict) and "in" in loop_descriptor:
-                loop_opts = {
+                job_opts = {
                     "loop": loop_descriptor["in"],
                     "loop_vars": loop_descriptor.get("with"),
                 }
             else:
                 log.error(f"Invalid loop descriptor: {loop_descriptor}")
                 raise ScriptEngineParseYAMLError
-        return Job(todo, when=when_clause, **loop_opts)
+
+        if "id" in spec:
+            job_opts["dag_id"] = spec["id"]
+        if "needs" in spec:
+            needs = spec["needs"]
+            if needs is None:
+                needs = []
+            elif isinstance(needs, str) or not isinstance(needs, list):
+                needs = [needs]
+            job_opts["needs"] = tuple(needs)
+
+        parallel_descriptor = spec.get("parallel")
+        if parallel_descriptor is not None:
+            job_opts["parallel"] = build_parallel(parallel_descriptor)
+            if loop_descriptor is sentinel:
+                log.warning("Parallel descriptor for a job without loop is ignored")
+        with at_origin():
+            return Job(todo, when=when_clause, **job_opts)
+
+    def build_parallel(spec):
+        # parallel: true|false, number of workers, or {workers: .., mode: ..}
+        if spec is True or spec is False:
+            return {"workers": None, "mode": "thread"} if spec else None
+        if isinstance(spec, (int, str)):
+            return {"workers": spec, "mode": "thread"}
+        if (
+            isinstance(spec, dict)
+            and spec.keys() <= {"workers", "mode"}
+            and spec.get("mode", "thread") in ("thread", "process")
+        ):
+            return {"workers": spec.get("workers"), "mode": spec.get("mode", "thread")}
+        log.error(f"Invalid parallel descriptor: {spec}")
+        raise ScriptEngineParseYAMLError
 
     if not data:
         return []
 
     if isinstance(data, list):
-        return [parse(d) for d in data]
+        return [parse(d, _child(origin, i)) for i, d in enumerate(data)]
 
     log = logging.getLogger("se.yaml")
 
@@ -110,20 +120,37 @@ def parse(data):
 
     if key in tasks:
         if len(data) == 1:  # It's a simple Task
-            return tasks[key](data[key])
-        return build_job(parse({key: data[key]}), data)
+            with at_origin():
+                return tasks[key](data[key])
+        return build_job(parse({key: data[key]}, _child(origin, key)), data)
 
     return build_job(
-        [parse(t) for t in data[key]],
+        [parse(t, _child(origin, key, i)) for i, t in enumerate(data[key])],
         data,
     )
 
 
-def parse_file(filename):
+def _child(origin, *position):
+    # Origin of an item at position below the item at origin
+    return None if origin is None else "/".join(map(str, (origin, *position)))
+
+
+def precompile_script(script):
+    """Pre-compiles the Jinja2 templates in all arguments of a script (a Task,
+    Job, or list of those), see Task.precompile() and Job.precompile(). Raises
+    ScriptEngineParseJinjaError if any template is invalid."""
+    for todo in script if isinstance(script, list) else [script]:
+        todo.precompile()
+    return script
+
+
+def parse_file(filename, *, precompile=False):
     """Reads a ScriptEngine script from a YAML file.
 
     Args:
         filename (str): Path to YAML file
+        precompile (bool): If true, all Jinja2 templates in the script are
+            compiled right after parsing, see precompile_script()
 
     Returns:
         A scriptengine.task.Task, a scriptengine.jobs.Job, or a list of
@@ -131,11 +158,15 @@ def parse_file(filename):
     """
     try:
         with open(filename) as file:
-            data = yaml.load(file, Loader=yaml.FullLoader)
+            data = backend.load(file)
     except (FileNotFoundError, PermissionError, IsADirectoryError) as e:
         logging.getLogger("se.yaml").error(f"Could not read script file: {e}")
         raise ScriptEngineParseFileError
     except yaml.YAMLError as e:
         logging.getLogger("se.yaml").error(f"Could not parse script file: {e}")
         raise ScriptEngineParseYAMLError
-    return parse(data)
+    # Origin of the script items: file name and (JSON pointer like) position
+    script = parse(data, origin=f"{Path(filename).resolve()}#")
+    if precompile:
+        precompile_script(script)
+    return script
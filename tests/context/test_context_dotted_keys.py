@@ -53,3 +53,32 @@ def test_wrong_key_type():
 def test_add_wrong_type():
     with pytest.raises(TypeError):
         Context() + 1
+
+
+def test_get_literal_dotted_key():
+    c = Context()
+    c.data = {"foo.bar": 1, "foo": {"bar": 2, "baz.bam": 3}}
+    assert c["foo.bar"] == 1
+    assert c["foo.baz.bam"] == 3
+    assert "foo.baz.bam" in c
+
+
+def test_get_with_default():
+    c = Context({"foo": {"bar": 1}})
+    assert c.get("foo.bar") == 1
+    assert c.get("foo.baz") is None
+    assert c.get("foo.bar.baz", 2) == 2
+    assert c.get(1, 3) == 3
+
+
+def test_missing_subkey_in_error():
+    c = Context({"foo": {"bar": 1}})
+    with pytest.raises(KeyError, match="subkey 'baz' not found"):
+        c["foo.baz.bam"]
+
+
+def test_set_does_not_keep_nested_contexts():
+    c = Context()
+    c["foo"] = Context({"bar.baz": 1})
+    assert type(c.data["foo"]) is dict
+    assert c.data["foo"] == {"bar": {"baz": 1}}
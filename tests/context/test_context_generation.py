@@ -0,0 +1,50 @@
+import io
+
+from scriptengine.context import Context
+
+
+def test_generation_differs_between_contexts():
+    assert Context().generation != Context().generation
+
+
+def test_generation_changes_on_setitem():
+    c = Context()
+    g = c.generation
+    c["foo.bar"] = 1
+    assert c.generation != g
+
+
+def test_generation_changes_on_delitem():
+    c = Context({"foo": 1})
+    g = c.generation
+    del c["foo"]
+    assert c.generation != g
+
+
+def test_generation_changes_on_merge():
+    c = Context({"foo": 1})
+    g = c.generation
+    c += {"bar": 2}
+    assert c.generation != g
+    g = c.generation
+    c.merge(Context({"baz": 3}))
+    assert c.generation != g
+
+
+def test_generation_changes_on_reset_and_load():
+    c = Context({"foo": 1})
+    g = c.generation
+    c.reset()
+    assert c.generation != g
+    g = c.generation
+    c.load(io.StringIO("foo: 1"))
+    assert c.generation != g
+
+
+def test_generation_unchanged_on_read():
+    c = Context({"foo": {"bar": 1}})
+    g = c.generation
+    c["foo.bar"]
+    "foo" in c
+    c.get("baz")
+    assert c.generation == g
@@ -0,0 +1,101 @@
+import copy
+import weakref
+
+import pytest
+
+from scriptengine.context import Context
+
+
+def test_changes_since_mark():
+    c = Context({"foo": {"bar": 1}, "list": [1]})
+    mark = c.mark()
+    c.merge({"foo": {"baz": 2}, "list": [2]})
+    c["new.key"] = 3
+    c += {"list": [3]}
+    assert c.changes_since(mark) == {
+        "foo": {"baz": 2},
+        "list": [2, 3],
+        "new": {"key": 3},
+    }
+
+
+def test_changes_since_reproduce_state():
+    c = Context({"foo": {"bar": 1}, "list": [1]})
+    snapshot = c.snapshot()
+    mark = c.mark()
+    c.merge({"foo": {"baz": 2}, "list": [2]})
+    c.merge({"foo": {"bar": {"bam": 3}}, "other": True})
+    snapshot.merge(c.changes_since(mark))
+    assert snapshot == c
+
+
+def test_nested_marks():
+    c = Context()
+    first = c.mark()
+    c.merge({"foo": [1]})
+    second = c.mark()
+    c.merge({"foo": [2]})
+    assert c.changes_since(first) == {"foo": [1, 2]}
+    assert c.changes_since(second) == {"foo": [2]}
+    assert c.changes_since(c.mark()) == {}
+
+
+def test_changes_do_not_share_state():
+    c = Context()
+    mark = c.mark()
+    c.merge({"foo": {"bar": 1}})
+    changes = c.changes_since(mark)
+    c.merge({"foo": {"baz": 2}})
+    assert changes == {"foo": {"bar": 1}}
+
+
+@pytest.mark.parametrize("wrap", (dict, Context))
+def test_journal_does_not_share_merged_mappings(wrap):
+    c = Context()
+    mark = c.mark()
+    update = wrap({"foo": 1})
+    c.merge(update)
+    item = {"baz": 2}
+    c["bar"] = item
+    update["other"] = 3
+    item["bam"] = 4
+    assert c.changes_since(mark) == {"foo": 1, "bar": {"baz": 2}}
+    assert c.records_since(mark) == [["merge", {"foo": 1}], ["set", "bar", {"baz": 2}]]
+
+
+def test_journal_segments_are_freed():
+    c = Context()
+    first = c.mark()
+    c["foo"] = 1
+    segment = weakref.ref(first.journal)
+    c.mark()
+    c["bar"] = 2
+    assert c.changes_since(first) == {"foo": 1, "bar": 2}
+    del first
+    assert segment() is None
+
+
+@pytest.mark.parametrize("copy_", (Context.copy, copy.copy))
+def test_copy_has_own_journal(copy_):
+    c = Context({"a": 1})
+    mark = c.mark()
+    d = copy_(c)
+    d["b"] = 2
+    assert c.changes_since(mark) == {}
+    assert d.generation != c.generation
+    assert d == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize(
+    "change",
+    (
+        lambda c: c.reset(),
+        lambda c: c.__delitem__("foo"),
+    ),
+)
+def test_invalid_mark(change):
+    c = Context({"foo": 1})
+    mark = c.mark()
+    change(c)
+    with pytest.raises(ValueError):
+        c.changes_since(mark)
@@ -0,0 +1,135 @@
+import io
+
+from scriptengine.context import Context
+
+
+def test_child_reads_through():
+    parent = Context({"foo": {"bar": 1}, "baz": 2})
+    child = parent.new_child()
+    assert child["foo.bar"] == 1
+    assert child["baz"] == 2
+    assert "foo.bar" in child
+    assert "foo.bam" not in child
+    assert child == parent
+
+
+def test_child_initial_mapping_shadows_parent():
+    parent = Context({"foo": {"bar": 1}, "baz": 2})
+    child = parent.new_child({"foo": {"bam": 3}})
+    assert child["foo"] == {"bam": 3}
+    assert child["baz"] == 2
+    assert parent["foo"] == {"bar": 1}
+
+
+def test_child_setitem_does_not_modify_parent():
+    parent = Context({"foo": {"bar": 1, "baz": 2}})
+    child = parent.new_child()
+    child["foo.bar"] = 10
+    child["new.key"] = 3
+    assert child["foo"] == {"bar": 10, "baz": 2}
+    assert child["new.key"] == 3
+    assert parent == {"foo": {"bar": 1, "baz": 2}}
+
+
+def test_child_merge_does_not_modify_parent():
+    parent = Context({"foo": {"bar": 1}, "list": [1, 2]})
+    child = parent.new_child()
+    child.merge({"foo": {"baz": 2}, "list": [3]})
+    child += {"list": [4]}
+    assert child["foo"] == {"bar": 1, "baz": 2}
+    assert child["list"] == [1, 2, 3, 4]
+    assert parent == {"foo": {"bar": 1}, "list": [1, 2]}
+
+
+def test_child_merge_equals_merge_into_copy():
+    data = {"foo": {"bar": 1, "list": [1]}, "baz": {1, 2}}
+    updates = (
+        {"foo": {"list": [2], "new": 1}},
+        {"foo": {"bar": {"nested": True}}, "baz": {3}},
+        {"other": 1},
+    )
+    reference = Context(data)
+    child = Context(data).new_child()
+    for u in updates:
+        reference.merge(u)
+        child.merge(u)
+    assert child == reference
+
+
+def test_child_merge_replacing_type_equals_merge_into_copy():
+    data = {"a": {"x": 1}, "b": {"c": {"x": 1}}, "l": [1]}
+    updates = (
+        {"a": 5},
+        {"a": {"y": 2}},
+        {"b": {"c": 5}},
+        {"b": {"c": {"y": 2}}},
+        {"l": None},
+        {"l": [2]},
+    )
+    reference = Context(data)
+    child = Context(data).new_child()
+    for u in updates:
+        reference.merge(u)
+        child.merge(u)
+    assert child == reference
+    assert child["a"] == {"y": 2}
+
+
+def test_overlay_contains_only_changes():
+    parent = Context({"foo": {"bar": 1}, "list": [1, 2]})
+    child = parent.new_child({"item": 0})
+    child.merge({"foo": {"baz": 2}, "list": [3]})
+    assert child.overlay() == {"item": 0, "foo": {"baz": 2}, "list": [3]}
+    expected = dict(child)
+    parent.merge(child.overlay())
+    assert parent == expected
+
+
+def test_child_keys_and_len():
+    parent = Context({"foo": 1, "bar": 2})
+    child = parent.new_child({"bar": 3, "baz": 4})
+    assert list(child) == ["foo", "bar", "baz"]
+    assert len(child) == 3
+    assert dict(child) == {"foo": 1, "bar": 3, "baz": 4}
+
+
+def test_child_delitem_uncovers_parent():
+    parent = Context({"foo": 1})
+    child = parent.new_child({"foo": 2})
+    assert child["foo"] == 2
+    del child["foo"]
+    assert child["foo"] == 1
+
+
+def test_grandchild():
+    parent = Context({"foo": {"a": 1}})
+    child = parent.new_child()
+    child.merge({"foo": {"b": 2}})
+    grandchild = child.new_child()
+    grandchild["foo.c"] = 3
+    assert grandchild["foo"] == {"a": 1, "b": 2, "c": 3}
+    assert child["foo"] == {"a": 1, "b": 2}
+    assert parent["foo"] == {"a": 1}
+
+
+def test_child_generation_follows_parent():
+    parent = Context({"foo": 1})
+    child = parent.new_child()
+    generation = child.generation
+    parent["foo"] = 2
+    assert child.generation != generation
+    assert child["foo"] == 2
+
+
+def test_child_reset_and_save():
+    parent = Context({"foo": 1, "bar": 2})
+    child = parent.new_child({"baz": 3})
+    stream = io.StringIO()
+    child.save(stream)
+    stream.seek(0)
+    loaded = Context()
+    loaded.load(stream)
+    assert loaded == {"foo": 1, "bar": 2, "baz": 3}
+    child.reset(keep=["foo"])
+    assert child == {"foo": 1}
+    assert parent == {"foo": 1, "bar": 2}
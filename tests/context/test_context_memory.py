@@ -0,0 +1,94 @@
+import logging
+
+import pytest
+
+from scriptengine.context import Context, memory_limits
+from scriptengine.exceptions import ScriptEngineContextError
+from scriptengine.helpers.memory import deep_sizeof, format_size, parse_size
+
+
+@pytest.fixture
+def limits():
+    yield memory_limits
+    memory_limits.set()
+
+
+def test_deep_sizeof_counts_nested_and_shared_once():
+    item = "x" * 1000
+    assert deep_sizeof({"a": [item]}) > 1000
+    assert deep_sizeof({"a": [item], "b": [item]}) < 2000
+
+
+@pytest.mark.parametrize(
+    "string, size",
+    (("1024", 1024), ("2K", 2048), ("1.5M", 1572864), ("1GiB", 1024**3)),
+)
+def test_parse_size(string, size):
+    assert parse_size(string) == size
+
+
+def test_parse_size_invalid():
+    with pytest.raises(ValueError):
+        parse_size("1x")
+
+
+def test_format_size():
+    assert format_size(100) == "100 B"
+    assert format_size(1536) == "1.5 KiB"
+
+
+def test_sizeof_and_report():
+    c = Context({"big": ["x" * 10000], "small": {"a": 1, "b": "y" * 100}})
+    assert c.sizeof("big") > 10000
+    assert c.sizeof() >= c.sizeof("big") + c.sizeof("small")
+    report = c.memory_report(depth=2)
+    assert list(report) == ["big", "small", "small.b", "small.a"]
+
+
+def test_sizeof_child_includes_parent():
+    parent = Context({"big": ["x" * 10000]})
+    child = parent.new_child({"item": 1})
+    assert child.sizeof() > 10000
+
+
+def test_soft_limit_warns_once(limits, caplog):
+    limits.set(soft=parse_size("10K"))
+    c = Context()
+    with caplog.at_level(logging.WARNING, logger="se.context"):
+        c.merge({"big": "x" * 20000})
+        c.merge({"bigger": "x" * 20000})
+    assert len(caplog.records) == 1
+    assert "soft limit" in caplog.text
+    assert "bigger" in c
+
+
+def test_no_exact_size_after_soft_warning(limits, monkeypatch):
+    limits.set(soft=parse_size("10K"))
+    c = Context({"big": "x" * 20000})
+    c.merge({"foo": 0})
+    assert limits.warned
+    calls = []
+    monkeypatch.setattr(
+        "scriptengine.context.deep_sizeof",
+        lambda obj: calls.append(obj) or deep_sizeof(obj),
+    )
+    for i in range(10):
+        c.merge({f"foo{i}": i})
+    # Only the updates are measured, not the whole context
+    assert calls == [{f"foo{i}": i} for i in range(10)]
+
+
+def test_hard_limit_raises(limits):
+    limits.set(hard=parse_size("10K"))
+    c = Context({"foo": 1})
+    c.merge({"small": "x" * 100})
+    with pytest.raises(ScriptEngineContextError, match="big"):
+        c.merge({"big": "x" * 20000})
+    assert "big" not in c
+
+
+def test_hard_limit_in_child(limits):
+    limits.set(hard=parse_size("10K"))
+    child = Context({"foo": "x" * 6000}).new_child()
+    with pytest.raises(ScriptEngineContextError):
+        child.merge({"bar": "x" * 6000})
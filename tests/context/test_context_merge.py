@@ -56,3 +56,36 @@ def test_merge_add_with_context():
     c = Context({"foo": 1, "bar": 2})
     c.merge(Context({"bar": 3, "baz": 4}))
     assert c == {"foo": 1, "bar": 3, "baz": 4}
+
+
+def test_merge_does_not_modify_nested_data():
+    nested = {"bar": {"baz": 1}, "list": [1]}
+    c = Context()
+    c["foo"] = nested
+    shared = c["foo"]
+    c.merge({"foo": {"bar": {"bam": 2}, "list": [2]}})
+    assert c["foo"] == {"bar": {"baz": 1, "bam": 2}, "list": [1, 2]}
+    assert shared == {"bar": {"baz": 1}, "list": [1]}
+
+
+def test_merge_does_not_modify_other():
+    update = {"foo": {"bar": [1]}}
+    c = Context()
+    c.merge(update)
+    c.merge({"foo": {"bar": [2], "baz": 3}})
+    assert update == {"foo": {"bar": [1]}}
+
+
+def test_snapshot():
+    c = Context({"foo": {"bar": 1}, "list": [1]})
+    s = c.snapshot()
+    c.merge({"foo": {"baz": 2}, "list": [2]})
+    c["foo.bar"] = 3
+    c["new"] = 4
+    assert s == {"foo": {"bar": 1}, "list": [1]}
+    assert c == {"foo": {"bar": 3, "baz": 2}, "list": [1, 2], "new": 4}
+
+
+def test_snapshot_shares_data():
+    c = Context({"foo": {"bar": 1}})
+    assert c.snapshot()["foo"] is c["foo"]
@@ -0,0 +1,62 @@
+import datetime
+import io
+
+import dateutil.rrule
+import pytest
+
+from scriptengine.context import Context
+
+
+def test_save_load_yaml():
+    c = Context({"foo": {"bar": [1, 2]}, "baz": "text"})
+    stream = io.StringIO()
+    c.save(stream)
+    stream.seek(0)
+    loaded = Context()
+    loaded.load(stream)
+    assert loaded == c
+
+
+def test_save_load_pickle_round_trip(tmp_path):
+    rrule = dateutil.rrule.rrule(
+        dateutil.rrule.YEARLY, dtstart=datetime.datetime(2000, 1, 1), count=3
+    )
+    c = Context({"foo": {"date": datetime.date(2000, 1, 1)}, "rrule": rrule})
+    path = tmp_path / "context.pickle"
+    with open(path, "wb") as f:
+        c.save(f, format="pickle")
+    loaded = Context()
+    with open(path, "rb") as f:
+        loaded.load(f, format="pickle")
+    assert loaded["foo.date"] == datetime.date(2000, 1, 1)
+    assert list(loaded["rrule"]) == list(rrule)
+
+
+def test_load_pickle_from_memory_stream():
+    c = Context({"foo": 1})
+    stream = io.BytesIO()
+    c.save(stream, format="pickle")
+    stream.seek(0)
+    loaded = Context()
+    loaded.load(stream, format="pickle")
+    assert loaded == {"foo": 1}
+
+
+def test_load_pickle_advances_file_position(tmp_path):
+    path = tmp_path / "context.pickle"
+    with open(path, "wb") as f:
+        Context({"first": 1}).save(f, format="pickle")
+        Context({"second": 2}).save(f, format="pickle")
+    first, second = Context(), Context()
+    with open(path, "rb") as f:
+        first.load(f, format="pickle")
+        second.load(f, format="pickle")
+    assert first == {"first": 1}
+    assert second == {"second": 2}
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        Context().save(io.StringIO(), format="xml")
+    with pytest.raises(ValueError):
+        Context().load(io.StringIO(), format="xml")
@@ -1,5 +1,6 @@
 import yaml
 
+from scriptengine.context import Context
 from scriptengine.engines import SimpleScriptEngine
 from scriptengine.yaml.parser import parse
 
@@ -38,3 +39,35 @@ def test_echo_updates_context_in_job(capsys):
     SimpleScriptEngine().run(s, context={})
     captured = capsys.readouterr()
     assert "Hello world!" in captured.out
+
+
+def test_job_does_not_modify_context():
+    j = from_yaml(
+        """
+        do:
+            - base.context:
+                foo.bar: 2
+                list: [2]
+        loop: [1, 2]
+        """
+    )
+    context = Context({"foo": {"bar": 1}, "list": [1]})
+    update = j.run(context)
+    assert context == {"foo": {"bar": 1}, "list": [1]}
+    assert update == {"foo": {"bar": 2}, "list": [2, 2]}
+
+
+def test_job_replacing_container_with_scalar():
+    s = from_yaml(
+        """
+        - do:
+            - base.context:
+                exp.restart: false
+        """
+    )
+    context = {"exp": {"members": ["m1", "m2"], "restart": {"date": 1}}}
+    update = SimpleScriptEngine().run(s, context=context)
+    assert update == {"exp": {"restart": False}}
+    result = Context(context)
+    result.merge(update)
+    assert result == {"exp": {"members": ["m1", "m2"], "restart": False}}
@@ -1,3 +1,5 @@
+from datetime import date
+
 import yaml
 
 from scriptengine.context import Context
@@ -163,3 +165,31 @@ def test_loop_over_lists(capsys):
     captured = capsys.readouterr()
     assert "1 - 2" in captured.out
     assert "3 - 4" in captured.out
+
+
+def test_loop_over_dates_from_context(capsys):
+    j = from_yaml(
+        """
+        base.echo:
+            msg: 'Date is {{ item.year }}'
+        loop: '{{ dates }}'
+    """
+    )
+    j.run(Context({"dates": [date(2000, 1, 1), date(2001, 1, 1)]}))
+    captured = capsys.readouterr()
+    assert "Date is 2000" in captured.out
+    assert "Date is 2001" in captured.out
+
+
+def test_loop_over_range(capsys):
+    j = from_yaml(
+        """
+        base.echo:
+            msg: 'Hello {{item}}'
+        loop: '{{ range(2) }}'
+    """
+    )
+    j.run(Context())
+    captured = capsys.readouterr()
+    assert "Hello 0" in captured.out
+    assert "Hello 1" in captured.out
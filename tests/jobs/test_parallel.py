@@ -0,0 +1,158 @@
+import logging
+import os
+import time
+
+import pytest
+import yaml
+
+from scriptengine.context import Context
+from scriptengine.exceptions import (
+    ScriptEngineParseYAMLError,
+    ScriptEngineTaskRunError,
+)
+from scriptengine.yaml.parser import parse
+
+
+def from_yaml(string):
+    return parse(yaml.load(string, Loader=yaml.FullLoader))
+
+
+@pytest.mark.parametrize("parallel", ("4", "{workers: 2, mode: process}", "true"))
+def test_parallel_loop_merges_in_order(parallel):
+    j = from_yaml(
+        f"""
+        do:
+            - base.context:
+                results: ["{{{{item}}}}"]
+        loop: [1, 2, 3, 4, 5, 6, 7, 8]
+        parallel: {parallel}
+        """
+    )
+    c = j.run(Context({"results": []}))
+    assert c["results"] == list(range(1, 9))
+
+
+def test_parallel_loop_runs_concurrently():
+    j = from_yaml(
+        """
+        do:
+            - base.command:
+                name: sleep
+                args: [0.5]
+        loop: [1, 2, 3, 4]
+        parallel:
+            workers: 4
+        """
+    )
+    start = time.perf_counter()
+    j.run(Context())
+    assert time.perf_counter() - start < 1.5
+
+
+def test_parallel_updates_within_iteration():
+    j = from_yaml(
+        """
+        do:
+            - base.context:
+                value: "{{item}}"
+            - base.context:
+                results: ["{{value}}"]
+        loop: [a, b, c]
+        parallel: 2
+        """
+    )
+    c = j.run(Context())
+    assert c["results"] == ["a", "b", "c"]
+
+
+def test_parallel_workers_from_context():
+    j = from_yaml(
+        """
+        do:
+            - base.context:
+                results: ["{{item}}"]
+        loop: [1, 2]
+        parallel:
+            workers: "{{ncpus}}"
+        """
+    )
+    assert j.run(Context({"ncpus": 2}))["results"] == [1, 2]
+
+
+def test_parallel_error_cancels_iterations(tmp_path):
+    j = from_yaml(
+        f"""
+        do:
+            - base.command:
+                name: "{{{{ '/bin/false' if item == 1 else '/bin/true' }}}}"
+            - base.command:
+                name: touch
+                args: ["{tmp_path}/{{{{item}}}}"]
+        loop: [1, 2, 3, 4, 5, 6, 7, 8]
+        parallel: 1
+        """
+    )
+    with pytest.raises(ScriptEngineTaskRunError):
+        j.run(Context())
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize(
+    "parallel", ("{mode: fork}", "{workers: 2, foo: 1}", "[1, 2]")
+)
+def test_invalid_parallel_spec(parallel):
+    with pytest.raises(ScriptEngineParseYAMLError):
+        from_yaml(
+            f"""
+            do:
+                - base.echo:
+                    msg: hello
+            loop: [1, 2]
+            parallel: {parallel}
+            """
+        )
+
+
+def test_parallel_process_mode_parent_process_only(caplog):
+    j = from_yaml(
+        """
+        do:
+            - base.setenv:
+                SE_TEST_PARALLEL: "{{item}}"
+        loop: [a, b]
+        parallel:
+            mode: process
+        """
+    )
+    with caplog.at_level(logging.WARNING, logger="se.job"):
+        j.run(Context())
+    assert "running the iterations sequentially" in caplog.text
+    assert os.environ.pop("SE_TEST_PARALLEL") == "b"
+
+
+def test_parallel_loop_with_chdir_runs_sequentially(tmp_path, monkeypatch, caplog):
+    monkeypatch.chdir(tmp_path)
+    dirs = ["a", "b", "c", "d"]
+    for d in dirs:
+        (tmp_path / d).mkdir()
+    j = from_yaml(
+        f"""
+        do:
+            - base.chdir:
+                path: "{tmp_path}/{{{{item}}}}"
+            - base.command:
+                name: sleep
+                args: [0.1]
+            - base.command:
+                name: pwd
+                stdout: cwd
+            - base.context:
+                results: ["{{{{item}}}}:{{{{cwd[-2]}}}}"]
+        loop: {dirs}
+        parallel: 4
+        """
+    )
+    with caplog.at_level(logging.WARNING, logger="se.job"):
+        c = j.run(Context({"results": []}))
+    assert "running the iterations sequentially" in caplog.text
+    assert c["results"] == [f"{d}:{tmp_path / d}" for d in dirs]
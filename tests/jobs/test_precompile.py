@@ -0,0 +1,99 @@
+import pickle
+
+import pytest
+import yaml
+
+from scriptengine.context import Context
+from scriptengine.exceptions import ScriptEngineParseJinjaError
+from scriptengine.yaml.parser import parse, parse_file, precompile_script
+
+
+def from_yaml(string):
+    return parse(yaml.load(string, Loader=yaml.FullLoader))
+
+
+def test_precompile_job(capsys):
+    j = from_yaml(
+        """
+        base.echo:
+            msg: 'Hello {{ item }}'
+        loop: '{{ items }}'
+        when: '{{ go }}'
+        """
+    )
+    precompile_script(j)
+    assert set(j._templates) == {"{{ go }}"}
+    assert j._loop_template is not None
+    assert set(j.todo[0]._templates) == {"Hello {{ item }}"}
+    j.run(Context({"items": [1, 2], "go": True}))
+    captured = capsys.readouterr()
+    assert "Hello 1" in captured.out
+    assert "Hello 2" in captured.out
+
+
+def test_precompile_loop_items():
+    j = from_yaml(
+        """
+        base.echo:
+            msg: '{{ item }}'
+        loop: ['{{ a }}', 'b']
+        """
+    )
+    j.precompile()
+    assert set(j._templates) == {"{{ a }}"}
+
+
+@pytest.mark.parametrize(
+    "script",
+    (
+        "{base.echo: {msg: '{{ foo'}}",
+        "{base.echo: {msg: foo}, when: '{{ foo'}",
+        "{base.echo: {msg: foo}, loop: '{% for %}'}",
+        "{do: [{base.echo: {msg: '{{ foo'}}]}",
+    ),
+)
+def test_precompile_syntax_errors(script):
+    with pytest.raises(ScriptEngineParseJinjaError):
+        precompile_script(from_yaml(script))
+
+
+def test_parse_file_with_precompile(tmp_path):
+    script_file = tmp_path / "script.yml"
+    script_file.write_text("- base.echo: {msg: '{{ foo'}\n")
+    parse_file(script_file)
+    with pytest.raises(ScriptEngineParseJinjaError):
+        parse_file(script_file, precompile=True)
+
+
+def test_precompile_literal_when_clause(capsys):
+    j = from_yaml(
+        """
+        base.echo:
+            msg: Hello!
+        when: foo == 1
+        """
+    )
+    j.precompile()
+    assert j._when_expression is not None
+    assert "foo == 1" not in j._templates
+    j.run(Context({"foo": 2}))
+    assert "Hello!" not in capsys.readouterr().out
+    j.run(Context({"foo": 1}))
+    assert "Hello!" in capsys.readouterr().out
+
+
+def test_precompiled_job_pickle():
+    j = from_yaml(
+        """
+        base.echo:
+            msg: 'Hello {{ item }}'
+        loop: '{{ items }}'
+        when: '{{ go }}'
+        """
+    )
+    j.precompile()
+    copy = pickle.loads(pickle.dumps(j))
+    assert copy.id == j.id
+    assert copy._templates == {}
+    assert copy._loop_template is None
+    assert copy.when(Context({"go": True}))
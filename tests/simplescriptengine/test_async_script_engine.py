@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+
+import pytest
+import yaml
+
+from scriptengine import runtime
+from scriptengine.context import Context
+from scriptengine.engines import AsyncScriptEngine
+from scriptengine.jobs import Job
+from scriptengine.tasks.core import Task, timed_runner
+from scriptengine.yaml.parser import parse
+
+
+def from_yaml(string):
+    return parse(yaml.load(string, Loader=yaml.FullLoader))
+
+
+def test_async_sequential_without_needs(capsys):
+    s = from_yaml("""
+        - base.context:
+            foo: [1]
+        - base.context:
+            foo: [2]
+        - base.echo:
+            msg: "foo is {{foo}}"
+        """)
+    c = AsyncScriptEngine().run(s, context={})
+    assert c["foo"] == [1, 2]
+    assert "foo is [1, 2]" in capsys.readouterr().out
+
+
+def test_async_commands_run_concurrently():
+    s = from_yaml("""
+        - base.command:
+            name: sleep
+            args: [0.5]
+          loop: "{{ range(20) | list }}"
+          parallel: true
+        - base.command:
+            name: sleep
+            args: [0.5]
+          needs: []
+        """)
+    start = time.perf_counter()
+    AsyncScriptEngine().run(s, context={})
+    assert time.perf_counter() - start < 1.2
+
+
+def test_async_parallel_loop_update_order():
+    s = from_yaml("""
+        - base.command:
+            name: sh
+            args: [-c, "sleep 0.{{ 3 - item }}; echo {{ item }}"]
+            stdout: "out_{{ item }}"
+          loop: [1, 2, 3]
+          parallel: 2
+        - base.context:
+            outputs: ["{{ out_1[0] }}{{ out_2[0] }}{{ out_3[0] }}"]
+        """)
+    c = AsyncScriptEngine().run(s, context={})
+    assert c["outputs"] == [123]
+
+
+def test_async_native_task_and_runtime():
+    class Native(Task):
+        @timed_runner
+        async def arun(self, context):
+            await asyncio.sleep(0.01)
+            assert runtime.instance() is not None
+            return Context({"native": True})
+
+    class Blocking(Task):
+        def run(self, context):
+            assert runtime.instance() is not None
+            return Context({"blocking": context["native"]})
+
+    c = AsyncScriptEngine().run([Job(Native()), Job(Blocking())], context={})
+    assert c == {"native": True, "blocking": True}
+
+
+def test_async_error_stops_engine(tmp_path):
+    s = from_yaml(f"""
+        - base.command:
+            name: /bin/false
+          needs: []
+        - base.command:
+            name: touch
+            args: [{tmp_path}/after_error]
+        """)
+    with pytest.raises(SystemExit):
+        AsyncScriptEngine().run(s, context=Context())
+    assert not (tmp_path / "after_error").exists()
+
+
+def test_async_process_mode(tmp_path):
+    os.chdir(tmp_path)
+    (tmp_path / "sub").mkdir()
+    s = from_yaml("""
+        - base.chdir:
+            path: sub
+        - base.context:
+            foo: 1
+        - base.command:
+            name: pwd
+            stdout: async_pwd
+        """)
+    c = AsyncScriptEngine(mode="process").run(s, context={})
+    assert c["foo"] == 1
+    assert c["async_pwd"][0] == str(tmp_path / "sub")
+
+
+class SlowCwd(Task):
+    def run(self, context):
+        time.sleep(0.3)
+        return Context({"cwds": [os.getcwd()]})
+
+
+def test_async_parent_process_only_items_run_alone(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "sub").mkdir()
+    chdir = from_yaml("{base.chdir: {path: sub}, needs: []}")
+    s = [Job(SlowCwd(), needs=()), chdir, Job(SlowCwd(), needs=())]
+    c = AsyncScriptEngine().run(s, context={})
+    assert c["cwds"] == [str(tmp_path), str(tmp_path / "sub")]
@@ -0,0 +1,228 @@
+import logging
+import os
+import threading
+import time
+
+import pytest
+import yaml
+
+from scriptengine.context import Context, memory_limits
+from scriptengine.engines import DAGScriptEngine
+from scriptengine.exceptions import (
+    ScriptEngineParseScriptError,
+    ScriptEngineTaskRunError,
+)
+from scriptengine.jobs import Job
+from scriptengine.tasks.core import Task
+from scriptengine.yaml.parser import parse
+
+
+def from_yaml(string):
+    return parse(yaml.load(string, Loader=yaml.FullLoader))
+
+
+def test_dag_sequential_without_needs(capsys):
+    s = from_yaml("""
+        - base.context:
+            foo: [1]
+        - base.context:
+            foo: [2]
+        - base.echo:
+            msg: "foo is {{foo}}"
+        """)
+    c = DAGScriptEngine().run(s, context={})
+    assert c["foo"] == [1, 2]
+    assert "foo is [1, 2]" in capsys.readouterr().out
+
+
+def test_dag_independent_items_run_concurrently():
+    s = from_yaml("""
+        - base.command:
+            name: sleep
+            args: [0.5]
+          id: a
+          needs: []
+        - base.command:
+            name: sleep
+            args: [0.5]
+          id: b
+          needs: []
+        - base.command:
+            name: sleep
+            args: [0.5]
+          needs: []
+        """)
+    start = time.perf_counter()
+    DAGScriptEngine().run(s, context={})
+    assert time.perf_counter() - start < 1.2
+
+
+def test_dag_context_from_dependencies(capsys):
+    s = from_yaml("""
+        - base.context:
+            foo: 1
+          id: first
+          needs: []
+        - base.context:
+            bar: 2
+          id: second
+          needs: []
+        - base.echo:
+            msg: "foo={{foo}} bar={{bar|default('unset')}}"
+          needs: [first]
+        - base.context:
+            baz: "{{foo + bar}}"
+        """)
+    c = DAGScriptEngine().run(s, context={})
+    assert "foo=1 bar=unset" in capsys.readouterr().out
+    assert c == {"foo": 1, "bar": 2, "baz": 3}
+
+
+def test_dag_update_order_is_deterministic():
+    s = from_yaml("""
+        - base.command:
+            name: sleep
+            args: [0.2]
+          id: slow
+          needs: []
+        - base.context:
+            list: [slow]
+          needs: [slow]
+        - base.context:
+            list: [fast]
+          needs: []
+        """)
+    assert DAGScriptEngine().run(s, context={})["list"] == ["slow", "fast"]
+
+
+def test_dag_max_workers():
+    class Count(Task):
+        running = 0
+        maximum = 0
+        lock = threading.Lock()
+
+        def run(self, context):
+            with Count.lock:
+                Count.running += 1
+                Count.maximum = max(Count.maximum, Count.running)
+            time.sleep(0.05)
+            with Count.lock:
+                Count.running -= 1
+
+    s = [Job(Count(), needs=()) for _ in range(6)]
+    DAGScriptEngine(max_workers=2).run(s, context={})
+    assert Count.maximum == 2
+
+
+@pytest.mark.parametrize(
+    "script",
+    (
+        "[{base.echo: {msg: a}, id: x}, {base.echo: {msg: b}, id: x}]",
+        "[{base.echo: {msg: a}, needs: [y]}]",
+        "[{base.echo: {msg: a}, id: x, needs: y}, {base.echo: {msg: b}, id: y, "
+        "needs: x}]",
+    ),
+)
+def test_dag_invalid_dependencies(script):
+    with pytest.raises(ScriptEngineParseScriptError):
+        DAGScriptEngine().run(from_yaml(script), context={})
+
+
+def test_dag_error_stops_engine(tmp_path):
+    s = from_yaml(f"""
+        - base.command:
+            name: /bin/false
+          needs: []
+        - base.command:
+            name: touch
+            args: [{tmp_path}/after_error]
+        """)
+    with pytest.raises(SystemExit):
+        DAGScriptEngine().run(s, context=Context())
+    assert not (tmp_path / "after_error").exists()
+
+
+def test_dag_error_traceback_at_debug(caplog):
+    s = from_yaml("[{base.command: {name: /bin/false}}]")
+    with caplog.at_level(logging.DEBUG):
+        with pytest.raises(ScriptEngineTaskRunError):
+            DAGScriptEngine().run(s, context={})
+
+
+class Pid(Task):
+    def run(self, context):
+        return Context({"pids": [os.getpid()]})
+
+
+def test_dag_process_mode():
+    s = [Job(Pid(), needs=()) for _ in range(4)]
+    c = DAGScriptEngine(max_workers=2, mode="process").run(s, context={})
+    assert len(c["pids"]) == 4
+    assert os.getpid() not in c["pids"]
+
+
+def test_dag_process_mode_parent_process_only(tmp_path):
+    os.chdir(tmp_path)
+    (tmp_path / "sub").mkdir()
+    s = from_yaml("""
+        - base.chdir:
+            path: sub
+        - base.setenv:
+            SE_TEST_DAG_PROCESS: foo
+        - base.getenv:
+            dag_env: SE_TEST_DAG_PROCESS
+        - base.command:
+            name: pwd
+            stdout: dag_pwd
+        """)
+    c = DAGScriptEngine(mode="process").run(s, context={})
+    assert os.getcwd() == str(tmp_path / "sub")
+    assert os.environ["SE_TEST_DAG_PROCESS"] == "foo"
+    assert c["dag_env"] == "foo"
+    assert c["dag_pwd"][0] == str(tmp_path / "sub")
+    del os.environ["SE_TEST_DAG_PROCESS"]
+
+
+class SlowCwd(Task):
+    def run(self, context):
+        time.sleep(0.3)
+        return Context({"cwds": [os.getcwd()]})
+
+
+@pytest.mark.parametrize("mode", ("thread", "process"))
+def test_dag_parent_process_only_items_run_alone(tmp_path, monkeypatch, mode):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "sub").mkdir()
+    chdir = from_yaml("{base.chdir: {path: sub}, needs: []}")
+    s = [Job(SlowCwd(), needs=()), chdir, Job(SlowCwd(), needs=())]
+    c = DAGScriptEngine(mode=mode).run(s, context={})
+    assert c["cwds"] == [str(tmp_path), str(tmp_path / "sub")]
+
+
+class Big(Task):
+    def run(self, context):
+        return Context({"big": "x" * 100000})
+
+
+def test_dag_context_error_stops_engine():
+    memory_limits.set(hard=10000)
+    try:
+        with pytest.raises(SystemExit):
+            DAGScriptEngine().run([Big()], context={})
+    finally:
+        memory_limits.set()
+
+
+def test_dag_process_mode_not_picklable():
+    class LocalPid(Task):
+        def run(self, context):
+            return Context({"pids": [os.getpid()]})
+
+    c = DAGScriptEngine(mode="process").run([LocalPid(), Pid()], context={})
+    assert c["pids"][0] == os.getpid()
+    assert c["pids"][1] != os.getpid()
+
+
+def test_dag_invalid_mode():
+    with pytest.raises(ValueError):
+        DAGScriptEngine(mode="fork")
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+import yaml
+
+from scriptengine.engines import ResumableScriptEngine
+from scriptengine.yaml.parser import parse
+
+
+def from_yaml(string):
+    return parse(yaml.load(string, Loader=yaml.FullLoader))
+
+
+SCRIPT = """
+    - base.context:
+        foo: 1
+    - base.command:
+        name: sh
+        args: [-c, "echo run >> {tmp_path}/runs"]
+    - base.setenv:
+        SE_TEST_RESUME: "{{{{foo}}}}"
+    - base.chdir:
+        path: {tmp_path}/sub
+    - base.command:
+        name: "{fail}"
+    - base.context:
+        bar: "{{{{foo + 1}}}}"
+"""
+
+
+def script(tmp_path, fail):
+    return from_yaml(SCRIPT.format(tmp_path=tmp_path, fail=fail))
+
+
+def test_resume_after_failure(tmp_path):
+    os.chdir(tmp_path)
+    (tmp_path / "sub").mkdir()
+    progress = tmp_path / "progress"
+
+    with pytest.raises(SystemExit):
+        ResumableScriptEngine(progress).run(script(tmp_path, "/bin/false"), context={})
+    assert (tmp_path / "runs").read_text() == "run\n"
+
+    # New session: different working directory and environment
+    os.chdir(tmp_path)
+    del os.environ["SE_TEST_RESUME"]
+
+    c = ResumableScriptEngine(progress, resume=True).run(
+        script(tmp_path, "/bin/true"), context={}
+    )
+    assert c == {"foo": 1, "bar": 2}
+    assert (tmp_path / "runs").read_text() == "run\n"
+    assert os.getcwd() == str(tmp_path / "sub")
+    assert os.environ.pop("SE_TEST_RESUME") == "1"
+
+
+def test_resume_reruns_changed_tasks(tmp_path):
+    os.chdir(tmp_path)
+    (tmp_path / "sub").mkdir()
+    progress = tmp_path / "progress"
+
+    ResumableScriptEngine(progress).run(script(tmp_path, "/bin/true"), context={})
+    os.chdir(tmp_path)
+
+    changed = script(tmp_path, "/bin/true")
+    changed[0] = from_yaml("base.context: {foo: 2}")
+    c = ResumableScriptEngine(progress, resume=True).run(changed, context={})
+    assert c == {"foo": 2, "bar": 3}
+    assert (tmp_path / "runs").read_text() == "run\nrun\n"
+    del os.environ["SE_TEST_RESUME"]
+
+
+def test_no_resume_without_progress_log(tmp_path, caplog):
+    os.chdir(tmp_path)
+    c = ResumableScriptEngine(tmp_path / "progress", resume=True).run(
+        from_yaml("[base.context: {foo: 1}]"), context={}
+    )
+    assert c == {"foo": 1}
+    assert "No progress log to resume from" in caplog.text
+
+
+def test_truncated_progress_log(tmp_path):
+    os.chdir(tmp_path)
+    progress = tmp_path / "progress"
+    s = from_yaml("[base.context: {foo: [1]}, base.context: {foo: [2]}]")
+    ResumableScriptEngine(progress).run(s, context={})
+    progress.write_bytes(progress.read_bytes()[:-5])
+    c = ResumableScriptEngine(progress, resume=True).run(s, context={})
+    assert c == {"foo": [1, 2]}
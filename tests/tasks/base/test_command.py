@@ -1,9 +1,13 @@
+import asyncio
 import logging
 import os
 import time
 
+import pytest
 import yaml
 
+from scriptengine.context import Context
+from scriptengine.exceptions import ScriptEngineTaskRunError
 from scriptengine.yaml.parser import parse
 
 
@@ -65,3 +69,103 @@ def test_command_cwd_sets_pwd(tmp_path):
     )
     c = t.run({})
     assert f"PWD={tmp_path}" in c["env_output"]
+
+
+def test_command_arun_stdout_stderr(caplog):
+    t = from_yaml(
+        """
+        base.command:
+          name: sh
+          args: [-c, "echo out1; echo out2; echo err >&2; echo logged"]
+          stdout: cmd_stdout
+          stderr: true
+        """
+    )
+    with caplog.at_level(logging.INFO, logger="se.task"):
+        c = asyncio.run(t.arun(Context()))
+    assert c["cmd_stdout"] == ["out1", "out2", "logged", ""]
+    assert "err" in [rec.message for rec in caplog.records]
+
+
+def test_command_arun_error(tmp_path, caplog):
+    t = from_yaml(
+        f"""
+        base.command:
+          name: ls
+          args: [ {tmp_path}/foo ]
+        """
+    )
+    with pytest.raises(ScriptEngineTaskRunError):
+        asyncio.run(t.arun(Context()))
+
+    t = from_yaml(
+        f"""
+        base.command:
+          name: ls
+          args: [ {tmp_path}/foo ]
+          ignore_error: true
+        """
+    )
+    with caplog.at_level(logging.WARN, logger="se.task"):
+        asyncio.run(t.arun(Context()))
+    assert "Command returned error code 2" in [rec.message for rec in caplog.records]
+
+
+def test_command_cache(tmp_path, caplog):
+    os.chdir(tmp_path)
+    (tmp_path / "in.txt").write_text("one")
+    context = Context({"se": {"tasks": {"cache": {"path": str(tmp_path / "cache")}}}})
+    t = from_yaml(
+        """
+        base.command:
+          name: sh
+          args: [-c, "cat in.txt > out.txt; echo run >> runs; echo done"]
+          stdout: cmd_stdout
+          inputs: in.txt
+          outputs: out.txt
+          cache: true
+        """
+    )
+
+    assert t.run(context)["cmd_stdout"] == ["done", ""]
+    (tmp_path / "out.txt").unlink()
+    with caplog.at_level(logging.INFO, logger="se.task"):
+        assert asyncio.run(t.arun(context))["cmd_stdout"] == ["done", ""]
+    assert "Restored 1 output(s) from cache" in caplog.text
+    assert (tmp_path / "out.txt").read_text() == "one"
+    assert (tmp_path / "runs").read_text() == "run\n"
+
+    # Changed input content
+    (tmp_path / "in.txt").write_text("two")
+    t.run(context)
+    assert (tmp_path / "out.txt").read_text() == "two"
+    assert (tmp_path / "runs").read_text() == "run\nrun\n"
+
+
+def test_command_cache_cwd(tmp_path, caplog):
+    os.chdir(tmp_path)
+    context = Context({"se": {"tasks": {"cache": {"path": str(tmp_path / "cache")}}}})
+    script = """
+        base.command:
+          name: sh
+          args: [-c, "cat in.txt > out.txt; echo run >> runs"]
+          cwd: {cwd}
+          inputs: in.txt
+          outputs: out.txt
+          cache: true
+        """
+    for member in ("m1", "m2"):
+        (tmp_path / member).mkdir()
+        (tmp_path / member / "in.txt").write_text("one")
+        from_yaml(script.format(cwd=member)).run(context)
+        assert (tmp_path / member / "out.txt").read_text() == "one"
+    # Same args and inputs in another cwd are not taken from the cache
+    assert (tmp_path / "m2" / "runs").read_text() == "run\n"
+    assert not (tmp_path / "out.txt").exists()
+
+    (tmp_path / "m1" / "out.txt").unlink()
+    with caplog.at_level(logging.INFO, logger="se.task"):
+        from_yaml(script.format(cwd="m1")).run(context)
+    assert "Restored 1 output(s) from cache" in caplog.text
+    assert (tmp_path / "m1" / "out.txt").read_text() == "one"
+    assert (tmp_path / "m1" / "runs").read_text() == "run\n"
@@ -179,3 +179,21 @@ def test_copy_ignore_not_found(tmp_path):
                 dst: bar
             """
         ).run({})
+
+
+def test_copy_native_file_list(tmp_path):
+    os.chdir(tmp_path)
+    # File names that do not survive a round trip through str() and YAML
+    names = ["a\\b.txt", "c: d.txt"]
+    for name in names:
+        (tmp_path / name).touch()
+    (tmp_path / "dst").mkdir()
+    from_yaml(
+        """
+        base.copy:
+            src: "{{ files }}"
+            dst: dst
+        """
+    ).run({"files": names})
+    for name in names:
+        assert (tmp_path / "dst" / name).exists()
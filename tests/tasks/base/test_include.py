@@ -75,3 +75,37 @@ def test_include_not_found_raises_error(tmp_path):
                 }
             )
         )
+
+
+def test_include_uses_runtime_instance(tmp_path):
+    f = Path(tmp_path / "include.yml")
+    f.write_text(
+        """
+        base.context:
+          foo: 1
+        """
+    )
+    s = from_yaml(
+        """
+        - base.include:
+            src: include.yml
+        - base.echo:
+            msg: "foo is {{foo}}"
+        """
+    )
+    context = {"se": {"cli": {"cwd": str(tmp_path), "script_path": [str(tmp_path)]}}}
+    c = SimpleScriptEngine().run(s, context)
+    assert c["foo"] == 1
+    assert "se.instance" not in c
+
+
+def test_include_without_instance_raises_error(tmp_path):
+    Path(tmp_path / "include.yml").write_text("base.echo:\n  msg: hello\n")
+    t = from_yaml(
+        """
+        base.include:
+          src: include.yml
+        """
+    )
+    with pytest.raises(ScriptEngineTaskRunError):
+        t.run(Context({"se.cli.cwd": str(tmp_path), "se.cli.script_path": []}))
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+
+import yaml
+
+from scriptengine.context import Context
+from scriptengine.yaml.parser import parse
+
+
+def from_yaml(string):
+    return parse(yaml.load(string, Loader=yaml.FullLoader))
+
+
+def incremental_context(tmp_path, mode=True):
+    return Context(
+        {
+            "se": {
+                "cli": {"cwd": str(tmp_path)},
+                "tasks": {
+                    "incremental": {
+                        "mode": mode,
+                        "state": str(tmp_path / "state.db"),
+                    }
+                },
+            }
+        }
+    )
+
+
+def touch(path, mtime):
+    path.touch()
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_incremental_copy(tmp_path, caplog):
+    os.chdir(tmp_path)
+    src = tmp_path / "src.txt"
+    src.write_text("one")
+    t = from_yaml(f"base.copy: {{src: {src}, dst: {tmp_path / 'dst.txt'}}}")
+    context = incremental_context(tmp_path)
+
+    with caplog.at_level(logging.INFO, logger="se.task"):
+        t.run(context)
+        assert "Outputs are up to date, skip task" not in caplog.text
+        t.run(context)
+        assert "Outputs are up to date, skip task" in caplog.text
+
+    # Input newer than output
+    src.write_text("two")
+    touch(src, (tmp_path / "dst.txt").stat().st_mtime_ns + 10**9)
+    t.run(context)
+    assert (tmp_path / "dst.txt").read_text() == "two"
+
+    # Output removed
+    (tmp_path / "dst.txt").unlink()
+    t.run(context)
+    assert (tmp_path / "dst.txt").read_text() == "two"
+
+
+def test_incremental_mode_off(tmp_path, caplog):
+    os.chdir(tmp_path)
+    (tmp_path / "src.txt").write_text("one")
+    t = from_yaml("base.copy: {src: src.txt, dst: dst.txt}")
+    context = incremental_context(tmp_path, mode=False)
+    with caplog.at_level(logging.DEBUG, logger="se.task"):
+        t.run(context)
+        t.run(context)
+    assert "up to date" not in caplog.text
+    assert not (tmp_path / "state.db").exists()
+
+
+def test_incremental_command_arguments_and_update(tmp_path):
+    os.chdir(tmp_path)
+    (tmp_path / "in.txt").write_text("one")
+    script = """
+        base.command:
+            name: sh
+            args: [-c, "cat in.txt >> out.txt; echo {msg}"]
+            stdout: msg
+            incremental: true
+            inputs: in.txt
+            outputs: out.txt
+        """
+    context = incremental_context(tmp_path, mode=False)
+
+    t = from_yaml(script.format(msg="hello"))
+    assert t.run(context)["msg"] == ["hello", ""]
+    assert t.run(context)["msg"] == ["hello", ""]
+    assert asyncio.run(t.arun(context))["msg"] == ["hello", ""]
+    assert (tmp_path / "out.txt").read_text() == "one"
+
+    # Changed arguments
+    t = from_yaml(script.format(msg="world"))
+    assert t.run(context)["msg"] == ["world", ""]
+    assert (tmp_path / "out.txt").read_text() == "oneone"
+
+
+def test_incremental_command_cwd(tmp_path, caplog):
+    os.chdir(tmp_path)
+    (tmp_path / "m1").mkdir()
+    (tmp_path / "m1" / "in.txt").write_text("one")
+    t = from_yaml("""
+        base.command:
+            name: sh
+            args: [-c, "cat in.txt >> out.txt"]
+            cwd: m1
+            inputs: in.txt
+            outputs: out.txt
+        """)
+    context = incremental_context(tmp_path)
+    t.run(context)
+    with caplog.at_level(logging.INFO, logger="se.task"):
+        t.run(context)
+    assert "Outputs are up to date, skip task" in caplog.text
+    assert (tmp_path / "m1" / "out.txt").read_text() == "one"
+
+
+def test_incremental_link(tmp_path, caplog):
+    os.chdir(tmp_path)
+    (tmp_path / "target").write_text("one")
+    t = from_yaml("base.link: {target: target, link: link}")
+    context = incremental_context(tmp_path)
+    t.run(context)
+    with caplog.at_level(logging.INFO, logger="se.task"):
+        t.run(context)
+    assert "Outputs are up to date, skip task" in caplog.text
+
+
+def test_incremental_template(tmp_path):
+    os.chdir(tmp_path)
+    (tmp_path / "namelist.j2").write_text("value = {{value}}")
+    t = from_yaml("base.template: {src: namelist.j2, dst: namelist}")
+    context = incremental_context(tmp_path)
+    context["value"] = 1
+
+    t.run(context)
+    touch(tmp_path / "namelist", 1)
+    t.run(context)
+    assert (tmp_path / "namelist").stat().st_mtime_ns == 1
+
+    context["value"] = 2
+    t.run(context)
+    assert (tmp_path / "namelist").read_text() == "value = 2\n"
@@ -1,10 +1,18 @@
+import logging
+import pickle
+from datetime import datetime
+
 import pytest
 
+from scriptengine.context import Context
 from scriptengine.exceptions import (
+    ScriptEngineParseJinjaError,
     ScriptEngineTaskArgumentInvalidError,
     ScriptEngineTaskArgumentMissingError,
 )
+from scriptengine.jinja import render_stats
 from scriptengine.tasks.core import Task
+from scriptengine.yaml.noparse_strings import NoParseJinjaString
 
 
 def test_create_task():
@@ -27,6 +35,136 @@ def test_create_task_with_invalid_args():
             task_class(parameters)
 
 
+def test_task_arguments_as_attributes():
+    t = Task({"foo": 1})
+    assert t.foo == 1
+    t.bar = 2
+    assert t.getarg("bar") == 2
+    assert repr(t) == "Task(foo=1, bar=2)"
+    del t.foo
+    with pytest.raises(AttributeError):
+        t.foo
+    assert not hasattr(t, "__dict__")
+
+
+def test_task_pickle():
+    t = Task({"foo": "{{ bar }}"})
+    t.precompile()
+    t.getarg("foo", Context({"bar": 1}))
+    copy = pickle.loads(pickle.dumps(t))
+    assert copy.id == t.id
+    assert copy.foo == "{{ bar }}"
+    assert copy._templates == {}
+    assert copy.getarg("foo", Context({"bar": 2})) == 2
+
+
+def test_no_repr_if_debug_disabled(caplog):
+    class Spy:
+        calls = 0
+
+        def __repr__(self):
+            Spy.calls += 1
+            return "spy"
+
+    caplog.set_level(logging.INFO, logger="se.task")
+    Task({"foo": Spy()})
+    assert Spy.calls == 0
+    caplog.set_level(logging.DEBUG, logger="se.task")
+    Task({"foo": Spy()})
+    assert Spy.calls == 1
+
+
 def test_create_task_with_missing_args():
     with pytest.raises(ScriptEngineTaskArgumentMissingError):
         Task().getarg("foo")
+
+
+def test_precompile_task_args():
+    t = Task({"foo": "{{ bar }}", "baz": "literal", "lst": ["{{ a }}", 1]})
+    t.precompile()
+    assert set(t._templates) == {"{{ bar }}", "{{ a }}"}
+    assert t.getarg("foo", {"bar": 42}) == 42
+    assert t.getarg("lst", {"a": "x"}) == ["x", 1]
+
+
+def test_precompile_skips_noparse():
+    t = Task({"foo": NoParseJinjaString("{{ bar")})
+    t.precompile()
+    assert t._templates == {}
+
+
+def test_precompile_invalid_template():
+    with pytest.raises(ScriptEngineParseJinjaError):
+        Task({"foo": "{{ bar"}).precompile()
+
+
+def test_getarg_native():
+    when = datetime(2024, 1, 1, 12)
+    t = Task({"foo": "{{ bar }}", "baz": "{{ bar }}/x"})
+    assert t.getarg("foo", {"bar": when}, native=True) is when
+    assert t.getarg("foo", {"bar": [1, 2]}, native=True) == [1, 2]
+    assert t.getarg("baz", {"bar": "y"}, native=True) == "y/x"
+    # Without native, datetimes get converted via string and YAML
+    assert t.getarg("foo", {"bar": when}) == when
+
+
+def test_getarg_cached_per_context_generation():
+    t = Task({"foo": "{{ bar }}"})
+    c = Context({"bar": 1})
+    render_stats.clear()
+    assert t.getarg("foo", c) == 1
+    assert t.getarg("foo", c) == 1
+    assert render_stats.info().calls == 1
+    c["bar"] = 2
+    assert t.getarg("foo", c) == 2
+    c += {"bar": 3}
+    assert t.getarg("foo", c) == 3
+    assert render_stats.info().calls == 3
+
+
+def test_getarg_cache_invalidated():
+    t = Task({"foo": "{{ bar }}"})
+    c = Context({"bar": 1})
+    assert t.getarg("foo", c) == 1
+    t.foo = "{{ bar + 1 }}"
+    assert t.getarg("foo", c) == 2
+    del t.foo
+    assert t.getarg("foo", c, default=None) is None
+
+
+def test_getarg_cache_dropped_after_run():
+    class Foo(Task):
+        def run(self, context):
+            return self.getarg("foo", context)
+
+    t = Foo({"foo": "{{ bar }}"})
+    assert t.run(Context({"bar": 1})) == 1
+    assert t._argcache is None
+
+
+def test_getarg_cache_shares_values():
+    t = Task({"foo": "{{ bar }}"})
+    files = [f"file{i}" for i in range(1000)]
+    c = Context({"bar": files})
+    assert t.getarg("foo", c, native=True) is files
+    assert t.getarg("foo", c, native=True) is files
+    assert t.getarg("foo", c) is t.getarg("foo", c)
+
+
+def test_task_keeps_arguments():
+    arguments = {"foo": 1}
+    t = Task(arguments)
+    assert t._arguments is arguments
+
+
+def test_base_tasks_have_no_dict():
+    from scriptengine.tasks.base.command import Command
+    from scriptengine.tasks.base.echo import Echo
+    from scriptengine.tasks.base.file.copy import Copy
+
+    for task in (
+        Echo({"msg": "Hello"}),
+        Command({"name": "ls"}),
+        Copy({"src": "foo", "dst": "bar"}),
+    ):
+        assert not hasattr(task, "__dict__")
@@ -1,3 +1,4 @@
+import asyncio
 from time import sleep
 
 import pytest
@@ -67,6 +68,32 @@ def test_task_timing():
     assert context["se.tasks.timing.timers.instances"][timed.id] > 1.0
 
 
+def test_task_timing_async():
+    class AsyncWait(Task):
+        @timed_runner
+        async def arun(self, context):
+            await asyncio.sleep(0.2)
+
+    timer = TaskTimer({"mode": "instances", "logging": False})
+    timed = AsyncWait()
+
+    context = Context(
+        {
+            "se.tasks.timing": {
+                "mode": False,
+                "logging": None,
+                "timers": {},
+            }
+        }
+    )
+
+    context += timer.run(context)
+    context += asyncio.run(timed.arun(context))
+
+    assert context["se.tasks.timing.timers.classes.AsyncWait"] > 0.2
+    assert context["se.tasks.timing.timers.instances"][timed.id] > 0.2
+
+
 def test_task_timer_after_echo():
 
     context = Context(
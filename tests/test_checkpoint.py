@@ -0,0 +1,93 @@
+import datetime
+
+import pytest
+
+from scriptengine.checkpoint import Checkpoint
+from scriptengine.context import Context
+
+
+def load(path, format):
+    context = Context()
+    with open(path, "rb" if format == "pickle" else "r") as f:
+        context.load(f, format=format)
+    return context
+
+
+@pytest.mark.parametrize("format", ("yaml", "pickle"))
+def test_checkpoint_replay(tmp_path, format):
+    path = tmp_path / "checkpoint"
+    checkpoint = Checkpoint(path, format=format)
+    c = Context({"files": ["a", "b"], "leg": {"number": 0}})
+    checkpoint.write(c)
+    for leg in range(1, 4):
+        c.merge({"files": [f"leg_{leg}"], "leg": {"number": leg}})
+        c["leg.start"] = datetime.date(2000 + leg, 1, 1)
+        checkpoint.write(c)
+        assert load(path, format) == c
+
+
+@pytest.mark.parametrize("format", ("yaml", "pickle"))
+def test_checkpoint_appends_only_changes(tmp_path, format):
+    path = tmp_path / "checkpoint"
+    checkpoint = Checkpoint(path, format=format)
+    c = Context({"files": [f"file_{i}" for i in range(1000)]})
+    checkpoint.write(c)
+    full_size = path.stat().st_size
+    c.merge({"leg": 1})
+    checkpoint.write(c)
+    assert path.stat().st_size - full_size < full_size / 10
+
+
+def test_checkpoint_replaces_values(tmp_path):
+    path = tmp_path / "checkpoint"
+    checkpoint = Checkpoint(path)
+    c = Context({"foo": [1, 2]})
+    checkpoint.write(c)
+    c["foo"] = [3]
+    c.merge({"foo": [4]})
+    checkpoint.write(c)
+    assert load(path, "yaml") == {"foo": [3, 4]}
+
+
+def test_checkpoint_compaction(tmp_path):
+    path = tmp_path / "checkpoint"
+    checkpoint = Checkpoint(path, format="pickle", compact=2)
+    c = Context({"foo": 0})
+    checkpoint.write(c)
+    c.merge({"foo": 1})
+    checkpoint.write(c)
+    size = path.stat().st_size
+    c.merge({"foo": 2})
+    checkpoint.write(c)  # compaction, rewrites the full context
+    assert path.stat().st_size < size
+    assert load(path, "pickle") == {"foo": 2}
+
+
+def test_checkpoint_after_reset(tmp_path):
+    path = tmp_path / "checkpoint"
+    checkpoint = Checkpoint(path)
+    c = Context({"foo": 0, "bar": 1})
+    checkpoint.write(c)
+    c.reset(keep=["bar"])
+    checkpoint.write(c)
+    assert load(path, "yaml") == {"bar": 1}
+
+
+def test_checkpoint_releases_journal(tmp_path):
+    checkpoint = Checkpoint(tmp_path / "checkpoint", format="pickle")
+    c = Context()
+    outer = c.mark()
+    for leg in range(3):
+        c.merge({"data": {leg: [leg] * 1000}})
+        checkpoint.write(c)
+        # Only the journal segment since the last checkpoint is kept
+        assert len(c._journal) == 0
+    # Older marks remain valid
+    assert c.changes_since(outer) == {
+        "data": {0: [0] * 1000, 1: [1] * 1000, 2: [2] * 1000}
+    }
+
+
+def test_checkpoint_wrong_format(tmp_path):
+    with pytest.raises(ValueError):
+        Checkpoint(tmp_path / "checkpoint", format="xml")
@@ -0,0 +1,79 @@
+import os
+
+from scriptengine.helpers.content_store import ContentStore, file_digest
+
+
+def test_add_and_restore(tmp_path):
+    store = ContentStore(tmp_path / "store")
+    src = tmp_path / "src.txt"
+    src.write_text("content")
+    digest = store.add_file(src)
+    assert digest == file_digest(src)
+
+    store.put("key", {"files": {"out.txt": digest}, "stdout": "hello"})
+    entry = store.get("key")
+    assert entry["stdout"] == "hello"
+
+    dst = tmp_path / "sub" / "dst.txt"
+    store.restore_file(entry["files"]["out.txt"], dst)
+    assert dst.read_text() == "content"
+    assert store.get("missing") is None
+
+
+def test_same_content_stored_once(tmp_path):
+    store = ContentStore(tmp_path / "store")
+    for name in ("a", "b"):
+        (tmp_path / name).write_text("same")
+    assert store.add_file(tmp_path / "a") == store.add_file(tmp_path / "b")
+    assert len(list((tmp_path / "store" / "objects").glob("*/*"))) == 1
+
+
+def test_directory_digest(tmp_path):
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "f").write_text("one")
+    digest = file_digest(tmp_path / "dir")
+    (tmp_path / "dir" / "f").write_text("two")
+    assert file_digest(tmp_path / "dir") != digest
+
+
+def test_lru_eviction(tmp_path):
+    store = ContentStore(tmp_path / "store")
+    for i, key in enumerate(("a", "b", "c")):
+        f = tmp_path / key
+        f.write_bytes(bytes([i]) * 1000)
+        store.put(key, {"files": {key: store.add_file(f)}})
+        os.utime(store._entry(key), (i, i))
+    # Use a, so that b is the least recently used entry
+    store.get("a")
+
+    store.evict(store.size() - 1)
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert len(list((tmp_path / "store" / "objects").glob("*/*"))) == 2
+
+    store.evict(0)
+    assert store.size() == 0
+
+
+def test_put_does_not_scan_below_limit(tmp_path, monkeypatch):
+    store = ContentStore(tmp_path / "store", max_size=10**6)
+    scans = []
+    size = ContentStore.size
+    monkeypatch.setattr(
+        ContentStore, "size", lambda self: scans.append(1) or size(self)
+    )
+    for i in range(10):
+        f = tmp_path / f"f{i}"
+        f.write_bytes(bytes([i]) * 1000)
+        store.put(f"k{i}", {"files": {f.name: store.add_file(f)}})
+    assert len(scans) == 1
+    assert store._size == size(store)
+
+    # Exceeding the limit scans and evicts
+    store.max_size = 5000
+    f = tmp_path / "big"
+    f.write_bytes(b"x" * 1000)
+    store.put("big", {"files": {"big": store.add_file(f)}})
+    assert size(store) <= 5000
+    assert store._size == size(store)
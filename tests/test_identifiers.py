@@ -0,0 +1,70 @@
+import pickle
+
+from scriptengine import identifiers
+from scriptengine.jobs import Job
+from scriptengine.tasks.core import Task
+from scriptengine.yaml.parser import parse_file
+
+SCRIPT = """
+- base.echo:
+    msg: Hello
+- do:
+    - base.echo:
+        msg: Hello
+    - base.echo:
+        msg: World
+  when: "{{ go }}"
+"""
+
+
+def ids(script):
+    for todo in script:
+        yield todo.id
+        if isinstance(todo, Job):
+            yield from ids(todo.todo)
+
+
+def test_counter_ids_are_unique():
+    tasks = [Task({"foo": 1}) for _ in range(1000)]
+    assert len({t.id for t in tasks}) == 1000
+    assert len({t.shortid for t in tasks}) == 1000
+
+
+def test_stable_ids_from_origin():
+    with identifiers.origin("script.yml#/0"):
+        t1 = Task({"foo": 1})
+        t2 = Task({"foo": 1})
+        t3 = Task({"foo": 2})
+    with identifiers.origin("script.yml#/1"):
+        t4 = Task({"foo": 1})
+    assert t1.id == t2.id
+    assert t1.id != t3.id
+    assert t1.id != t4.id
+    assert Task({"foo": 1}).id != t1.id
+
+
+def test_parsed_ids_are_stable_across_parses(tmp_path):
+    script_file = tmp_path / "script.yml"
+    script_file.write_text(SCRIPT)
+    first = list(ids(parse_file(script_file)))
+    second = list(ids(parse_file(script_file)))
+    assert first == second
+    # Equal tasks at different positions have different ids
+    assert len(set(first)) == len(first)
+
+
+def test_parsed_ids_depend_on_arguments(tmp_path):
+    script_file = tmp_path / "script.yml"
+    script_file.write_text(SCRIPT)
+    first = list(ids(parse_file(script_file)))
+    script_file.write_text(SCRIPT.replace("World", "Moon"))
+    second = list(ids(parse_file(script_file)))
+    assert first[0] == second[0]
+    assert first[1:] != second[1:]
+
+
+def test_ids_survive_pickling():
+    job = Job([Task({"foo": 1})])
+    copy = pickle.loads(pickle.dumps(job))
+    assert copy.id == job.id
+    assert copy.todo[0].id == job.todo[0].id
@@ -0,0 +1,230 @@
+from datetime import date
+
+import jinja2
+import pytest
+
+from scriptengine.exceptions import ScriptEngineParseJinjaError
+from scriptengine.jinja import (
+    TemplateCache,
+    expression_cache,
+    is_template,
+    precompile_expression,
+    render,
+    render_stats,
+    template_cache,
+)
+
+
+def test_render_simple():
+    assert render("{{ foo }}", {"foo": "bar"}) == "bar"
+
+
+def test_render_recursive():
+    context = {"foo": "{{ bar }}", "bar": "baz"}
+    assert render("{{ foo }}", context) == "baz"
+    assert render("{{ foo }}", context, recursive=False) == "{{ bar }}"
+
+
+def test_render_boolean():
+    assert render("foo == 1", {"foo": 1}, boolean=True) is True
+    assert render("foo == 1", {"foo": 2}, boolean=True) is False
+
+
+def test_render_syntax_error():
+    with pytest.raises(ScriptEngineParseJinjaError):
+        render("{{ foo ", {})
+
+
+def test_render_uses_template_cache():
+    template_cache.clear()
+    for i in range(3):
+        assert render("{{ foo }}", {"foo": i}, recursive=False) == str(i)
+    info = template_cache.info()
+    assert info.misses == 1
+    assert info.hits >= 2
+
+
+def test_template_cache_hits_and_misses():
+    compiled = []
+
+    def factory(source):
+        compiled.append(source)
+        return source.upper()
+
+    cache = TemplateCache(factory, maxsize=2)
+    assert cache.get("a") == "A"
+    assert cache.get("a") == "A"
+    assert compiled == ["a"]
+    info = cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_template_cache_evicts_least_recently_used():
+    cache = TemplateCache(str.upper, maxsize=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")  # evicts "b"
+    assert cache.info().evictions == 1
+    cache.get("a")
+    assert cache.info().hits == 2
+    cache.get("b")
+    assert cache.info().misses == 4
+
+
+def test_template_cache_resize_and_clear():
+    cache = TemplateCache(str.upper, maxsize=None)
+    for s in "abcde":
+        cache.get(s)
+    assert cache.info().currsize == 5
+    cache.resize(2)
+    assert cache.info().currsize == 2
+    assert cache.info().evictions == 3
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 2, 0)
+
+
+def test_template_cache_disabled():
+    cache = TemplateCache(str.upper, maxsize=0)
+    cache.get("a")
+    cache.get("a")
+    assert cache.info().misses == 2
+    assert cache.info().currsize == 0
+
+
+@pytest.mark.parametrize(
+    "string",
+    ("foo", "foo bar", "foo\n", "foo\nbar", "a\r\nb", "{ not a template }", ""),
+)
+def test_render_literal_like_jinja(string):
+    assert render(string, {}) == jinja2.Environment().from_string(string).render()
+
+
+def test_render_literal_skips_jinja():
+    template_cache.clear()
+    assert render("just/a/file.nc", {}) == "just/a/file.nc"
+    assert template_cache.info().misses == 0
+
+
+@pytest.mark.parametrize(
+    ("string", "expected"),
+    (
+        ("foo", False),
+        ("{{ foo }}", True),
+        ("{% if foo %}{% endif %}", True),
+        ("{# comment #}", True),
+        ("{ foo }", False),
+        ("%}", False),
+    ),
+)
+def test_is_template(string, expected):
+    assert is_template(string) is expected
+
+
+def test_is_template_respects_delimiters():
+    env = jinja2.Environment(
+        variable_start_string="<<",
+        variable_end_string=">>",
+        block_start_string="<%",
+        block_end_string="%>",
+        comment_start_string="<#",
+        comment_end_string="#>",
+    )
+    assert is_template("<< foo >>", env)
+    assert is_template("<% if foo %><% endif %>", env)
+    assert not is_template("{{ foo }}", env)
+
+
+def test_render_recursive_nested_references():
+    context = {
+        "date": "2024-01-01",
+        "exp_id": "exp-{{ date }}",
+        "run_dir": "/scratch/{{ exp_id }}/run",
+    }
+    render_stats.clear()
+    assert render("{{ run_dir }}", context) == "/scratch/exp-2024-01-01/run"
+    # One pass per level of nesting, no extra pass to detect the fixed point
+    assert render_stats.info() == (1, 3, 3)
+
+
+def test_render_recursive_stops_without_template_syntax():
+    render_stats.clear()
+    assert render("{{ foo }}", {"foo": "bar"}) == "bar"
+    assert render_stats.info().passes == 1
+
+
+def test_render_literal_needs_no_pass():
+    render_stats.clear()
+    render("bar", {})
+    assert render_stats.info() == (1, 0, 0)
+
+
+@pytest.mark.parametrize(
+    "context",
+    (
+        {"foo": "{{ foo }}x"},
+        {"foo": "{{ bar }}", "bar": "{{ foo }}"},
+        {"foo": "{{ bar }}", "bar": "{{ baz }}", "baz": "{{ foo }}"},
+    ),
+)
+def test_render_cycle(context):
+    with pytest.raises(ScriptEngineParseJinjaError):
+        render("{{ foo }}", context)
+
+
+@pytest.mark.parametrize(
+    ("expression", "context", "expected"),
+    (
+        ("true", {}, True),
+        ("false", {}, False),
+        ("foo", {}, False),
+        ("foo", {"foo": [1]}, True),
+        ("foo is defined and foo > 1", {"foo": 2}, True),
+        ("{{ foo }} == 1", {"foo": 1}, True),
+        ("'{{ foo }}' == 'bar'", {"foo": "baz"}, False),
+    ),
+)
+def test_render_boolean_expressions(expression, context, expected):
+    assert render(expression, context, boolean=True) is expected
+
+
+def test_render_boolean_uses_expression_cache():
+    expression_cache.clear()
+    for i in range(3):
+        render("foo > 1", {"foo": i}, boolean=True)
+    assert expression_cache.info().misses == 1
+    assert expression_cache.info().hits == 2
+
+
+def test_render_boolean_with_precompiled_expression():
+    expression = precompile_expression("foo == 1")
+    expression_cache.clear()
+    assert render("foo == 1", {"foo": 1}, boolean=True, expression=expression)
+    assert expression_cache.info().misses == 0
+
+
+def test_precompile_expression_syntax_error():
+    with pytest.raises(ScriptEngineParseJinjaError):
+        precompile_expression("foo ==")
+
+
+@pytest.mark.parametrize(
+    ("string", "context", "expected"),
+    (
+        ("{{ foo }}", {"foo": [1, 2, 3]}, [1, 2, 3]),
+        ("{{ foo }}", {"foo": {"a": 1}}, {"a": 1}),
+        ("{{ foo }}", {"foo": date(2024, 1, 1)}, date(2024, 1, 1)),
+        ("{{ foo }}", {"foo": None}, None),
+        ("{{ foo }}", {}, ""),
+        ("{{ foo }}-{{ bar }}", {"foo": 1, "bar": 2}, "1-2"),
+        ("{{ foo }}", {"foo": "{{ bar }}", "bar": [1]}, [1]),
+        ("literal", {}, "literal"),
+    ),
+)
+def test_render_native(string, context, expected):
+    assert render(string, context, native=True) == expected
+
+
+def test_render_native_passes_objects_through():
+    files = ["a.nc", "b.nc"]
+    assert render("{{ files }}", {"files": files}, native=True) is files
@@ -0,0 +1,25 @@
+import threading
+
+from scriptengine import runtime
+
+
+def test_bind_and_get():
+    assert runtime.get("foo") is None
+    with runtime.bind(foo=1, instance="engine"):
+        assert runtime.get("foo") == 1
+        assert runtime.instance() == "engine"
+        with runtime.bind(foo=2):
+            assert runtime.get("foo") == 2
+            assert runtime.instance() == "engine"
+        assert runtime.get("foo") == 1
+    assert runtime.get("foo", "default") == "default"
+    assert runtime.instance() is None
+
+
+def test_bindings_are_thread_local():
+    seen = []
+    with runtime.bind(instance="engine"):
+        thread = threading.Thread(target=lambda: seen.append(runtime.instance()))
+        thread.start()
+        thread.join()
+    assert seen == [None]
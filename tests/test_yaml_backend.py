@@ -0,0 +1,50 @@
+import io
+from datetime import date
+
+import dateutil.rrule
+import pytest
+import yaml
+
+from scriptengine.yaml import backend
+from scriptengine.yaml.noparse_strings import (
+    NoParseJinjaString,
+    NoParseString,
+    NoParseYamlString,
+)
+
+
+@pytest.mark.parametrize(
+    ("tag", "cls"),
+    (
+        ("!noparse", NoParseString),
+        ("!noparse_yaml", NoParseYamlString),
+        ("!noparse_jinja", NoParseJinjaString),
+    ),
+)
+def test_noparse_tags(tag, cls):
+    for loader in (backend.FullLoader, yaml.FullLoader):
+        value = yaml.load(f"{tag} '{{{{ foo }}}}'", Loader=loader)
+        assert type(value) is cls
+        assert value == "{{ foo }}"
+
+
+def test_rrule_tag():
+    value = backend.load("!rrule DTSTART:20000101\nRRULE:FREQ=YEARLY;COUNT=2")
+    assert isinstance(value, dateutil.rrule.rrule)
+
+
+def test_load_derived_string():
+    assert backend.load(NoParseJinjaString("[1, 2]")) == [1, 2]
+
+
+def test_dump_and_safe_load():
+    data = {"foo": [1, 2, 3], "bar": {"baz": date(2000, 1, 1)}}
+    stream = io.StringIO()
+    backend.dump(data, stream)
+    stream.seek(0)
+    assert backend.safe_load(stream) == data
+
+
+def test_safe_load_rejects_python_tags():
+    with pytest.raises(yaml.YAMLError):
+        backend.safe_load("!!python/tuple [1, 2]")